@@ -0,0 +1,299 @@
+# Adder backends:
+# The arithmetic circuits of this package are built from in-place half adders
+# acting on two n-qubit summands a and b, a carry-out qubit and (optionally)
+# some helper ancillas, |a>|b>|c>|0> -> |a>|a+b mod 2^n>|c XOR carry>|0>.
+# AdderStrategy wraps a factory of such adders so the same backend can be passed
+# down from ReductionOracle to every sub-circuit:
+#    * RIPPLE: Cuccaro (CDKM) ripple-carry adder, linear depth, one ancilla
+#    * VEDRAL: Vedral-Barenco-Ekert ripple-carry adder, linear depth, n-1
+#      ancillas
+#    * DRAPER: Draper QFT adder, no ancillas, but not a classical reversible
+#      circuit (it uses controlled phase gates)
+#    * LOOKAHEAD: carry-lookahead adder, logarithmic depth, O(n log n) ancillas
+#
+# Carry-lookahead adder details:
+# The carry into bit i+1 is the group generate G[0:i] of bits 0..i, which is
+# computed as a parallel prefix (Kogge-Stone) over the pairs (g_j, p_j) =
+# (a_j AND b_j, a_j XOR b_j) using
+#     (G, P)[i-2^k+1 .. i] = (G_hi XOR (P_hi AND G_lo), P_hi AND P_lo)
+# where every level is computed out of place on fresh ancillas, copied to the
+# carry register and uncomputed again (log depth). The sum is b_i XOR a_i XOR
+# c_i. The carries are uncomputed with the same circuit, since the carries of
+# a + NOT(a+b) are equal to the carries of a + b.
+# Its controlled version copies the control to n-1 ancillas with a CNOT tree
+# first, so only the sum (Toffoli gates on disjoint qubits) and the NOT(a+b)
+# (CNOT gates) depend on the control, and the depth stays logarithmic. Qiskit
+# instead controls every gate on the same qubit, which makes it linear again.
+r"""
+Adder backends for the arithmetic circuits
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+from qiskit import QuantumCircuit, QuantumRegister, AncillaRegister
+from qiskit.circuit import ControlledGate, Gate, Qubit
+from qiskit.circuit.library import (
+    CDKMRippleCarryAdder,
+    DraperQFTAdder,
+    VBERippleCarryAdder,
+)
+from ..utils.cache import gate_cache
+from ..utils.profiling import profiled
+
+
+@profiled
+def _carries(num_state_qubits: int) -> QuantumCircuit:
+    r"""
+    Returns a circuit XORing the carries :math:`c_1, \ldots, c_n` of
+    :math:`a+b` into a carry register, leaving :math:`a`, :math:`b` and its
+    helper ancillas unchanged
+    """
+    num_bits: int = num_state_qubits
+    a_reg: QuantumRegister = QuantumRegister(num_bits, name="a")
+    b_reg: QuantumRegister = QuantumRegister(num_bits, name="b")
+    carries: QuantumRegister = QuantumRegister(num_bits, name="carries")
+    circuit: QuantumCircuit = QuantumCircuit(a_reg, b_reg, carries, name="Carries")
+
+    # the pairs (G, P) of the current level, starting from (a AND b, a XOR b)
+    # with the propagates computed in place on b
+    generate_reg: AncillaRegister = AncillaRegister(num_bits, name="g")
+    circuit.add_register(generate_reg)
+    generates: list[Qubit] = list(generate_reg)
+    propagates: list[Qubit] = list(b_reg)
+    compute: QuantumCircuit = QuantumCircuit(*circuit.qregs)
+    for i in range(num_bits):
+        compute.ccx(a_reg[i], b_reg[i], generates[i])
+    compute.cx(a_reg, b_reg)
+
+    span: int = 1
+    level: int = 0
+    while span < num_bits:
+        new_generates: AncillaRegister = AncillaRegister(
+            num_bits - span, name=f"G_{level}"
+        )
+        new_propagates: AncillaRegister = AncillaRegister(
+            max(0, num_bits - 2 * span), name=f"P_{level}"
+        )
+        circuit.add_register(new_generates, new_propagates)
+        compute.add_register(new_generates, new_propagates)
+
+        # the gates are emitted in four layers acting on disjoint qubits, the
+        # propagates P[i] with even and odd i // span are combined separately
+        compute.cx(generates[span:], new_generates)
+        for i in range(span, num_bits):
+            compute.ccx(propagates[i], generates[i - span], new_generates[i - span])
+        for parity in range(2):
+            for i in range(2 * span, num_bits):
+                if (i // span) % 2 == parity:
+                    compute.ccx(
+                        propagates[i],
+                        propagates[i - span],
+                        new_propagates[i - 2 * span],
+                    )
+
+        generates = [*generates[:span], *new_generates]
+        propagates = [*propagates[: 2 * span], *new_propagates]
+        span *= 2
+        level += 1
+
+    compute_gate: Gate = compute.to_gate(label="PrefixTree")
+    circuit.append(compute_gate, circuit.qubits)
+    for i in range(num_bits):
+        circuit.cx(generates[i], carries[i])
+    circuit.append(compute_gate.inverse(), circuit.qubits)
+
+    return circuit
+
+
+class CarryLookaheadAdder(QuantumCircuit):
+    r"""
+    In-place carry-lookahead half adder with logarithmic depth:
+
+    .. math::
+
+        |a\rangle|b\rangle|c\rangle|0\rangle\mapsto
+        |a\rangle|a+b \bmod 2^n\rangle|c \oplus c_n\rangle|0\rangle
+
+    where :math:`c_n` is the carry out of :math:`a+b`. Its registers match
+    the ones of the half adders provided by Qiskit.
+
+    :param num_state_qubits: number of qubits of each summand
+    :param kind: only :code:`"half"` is supported
+    """
+
+    @profiled
+    def __init__(
+        self, num_state_qubits: int, kind: str = "half", name: str = "CLAdder"
+    ) -> None:
+        r"""
+        Creates a carry-lookahead adder
+        """
+        if kind != "half":
+            raise ValueError("Only half carry-lookahead adders are supported")
+
+        super().__init__(name=name)
+        num_bits: int = num_state_qubits
+        a_reg: QuantumRegister = QuantumRegister(num_bits, name="a")
+        b_reg: QuantumRegister = QuantumRegister(num_bits, name="b")
+        cout: QuantumRegister = QuantumRegister(1, name="cout")
+        self.add_register(a_reg, b_reg, cout)
+
+        carries_circ: QuantumCircuit = gate_cache.circuit(_carries, num_bits)
+        carries: AncillaRegister = AncillaRegister(num_bits, name="carries")
+        helper: AncillaRegister = AncillaRegister(
+            carries_circ.num_ancillas, name="helper"
+        )
+        self.add_register(carries, helper)
+        carries_gate: Gate = gate_cache.gate(_carries, num_bits)
+
+        circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
+        circuit.append(carries_gate, [*a_reg, *b_reg, *carries, *helper])
+        circuit.cx(carries[-1], cout)
+        circuit.cx(a_reg, b_reg)
+        for i in range(1, num_bits):
+            circuit.cx(carries[i - 1], b_reg[i])
+
+        # the carries of a + NOT(a+b) are the carries of a + b
+        circuit.x(b_reg)
+        circuit.append(carries_gate, [*a_reg, *b_reg, *carries, *helper])
+        circuit.x(b_reg)
+
+        self.append(circuit.to_gate(label=name), self.qubits)
+
+
+@profiled
+def controlled_carry_lookahead(num_state_qubits: int) -> QuantumCircuit:
+    r"""
+    Returns a controlled :class:`CarryLookaheadAdder` with logarithmic depth,
+    acting on a control qubit, the two :code:`num_state_qubits`-qubit
+    summands, the carry-out qubit and its helper ancillas
+    """
+    num_bits: int = num_state_qubits
+    control: QuantumRegister = QuantumRegister(1, name="control")
+    a_reg: QuantumRegister = QuantumRegister(num_bits, name="a")
+    b_reg: QuantumRegister = QuantumRegister(num_bits, name="b")
+    cout: QuantumRegister = QuantumRegister(1, name="cout")
+    carries_circ: QuantumCircuit = gate_cache.circuit(_carries, num_bits)
+    carries: AncillaRegister = AncillaRegister(num_bits, name="carries")
+    helper: AncillaRegister = AncillaRegister(
+        carries_circ.num_ancillas, name="helper"
+    )
+    fanout: AncillaRegister = AncillaRegister(num_bits - 1, name="fanout")
+    circuit: QuantumCircuit = QuantumCircuit(
+        control, a_reg, b_reg, cout, carries, helper, fanout, name="cCLAdder"
+    )
+    carries_gate: Gate = gate_cache.gate(_carries, num_bits)
+
+    # copy the control to the fanout register (doubling the copies per layer)
+    fanout_circ: QuantumCircuit = QuantumCircuit(control, fanout)
+    controls: list[Qubit] = [control[0]]
+    while len(controls) < num_bits:
+        targets: list[Qubit] = fanout[len(controls) - 1 : 2 * len(controls) - 1]
+        for source, target in zip(controls, targets):
+            fanout_circ.cx(source, target)
+        controls.extend(targets)
+    fanout_gate: Gate = fanout_circ.to_gate(label="Fanout")
+
+    circuit.append(fanout_gate, [*control, *fanout])
+    circuit.append(carries_gate, [*a_reg, *b_reg, *carries, *helper])
+    circuit.ccx(controls[-1], carries[-1], cout)
+    for i in range(num_bits):
+        circuit.ccx(controls[i], a_reg[i], b_reg[i])
+    for i in range(1, num_bits):
+        circuit.ccx(controls[i], carries[i - 1], b_reg[i])
+
+    # b is NOT(a+b) if the control is set and b otherwise, in both cases the
+    # carries are the ones of a + b
+    for i in range(num_bits):
+        circuit.cx(controls[i], b_reg[i])
+    circuit.append(carries_gate, [*a_reg, *b_reg, *carries, *helper])
+    for i in range(num_bits):
+        circuit.cx(controls[i], b_reg[i])
+    circuit.append(fanout_gate.inverse(), [*control, *fanout])
+
+    return circuit
+
+
+def _controlled(
+    factory: Callable[..., QuantumCircuit], num_state_qubits: int
+) -> ControlledGate:
+    r"""
+    Returns the adder built by :code:`factory` controlled on one qubit (every
+    gate of the adder gets the same extra control)
+    """
+    return gate_cache.gate(factory, num_state_qubits, kind="half").control(1)
+
+
+@dataclass(frozen=True)
+class AdderStrategy:
+    r"""
+    Adder backend used by the arithmetic circuits. Wraps a factory
+    :code:`factory(num_state_qubits, kind="half")` of in-place half adders
+    acting on the registers :code:`a`, :code:`b`, :code:`cout` followed by
+    their helper ancillas (if any). Circuits are built through
+    :data:`~attacks.utils.cache.gate_cache`.
+
+    :param name: name of the backend
+    :param factory: adder factory
+    :param controlled: factory :code:`controlled(num_state_qubits)` of
+        controlled adders acting on the control qubit, the registers of the
+        adder and helper ancillas. Defaults to controlling every gate of the
+        adder.
+    """
+
+    name: str
+    factory: Callable[..., QuantumCircuit]
+    controlled: Optional[Callable[[int], QuantumCircuit]] = None
+
+    def circuit(self, num_state_qubits: int) -> QuantumCircuit:
+        r"""
+        Returns the (shared) adder circuit for :code:`num_state_qubits`-qubit
+        summands
+        """
+        return gate_cache.circuit(self.factory, num_state_qubits, kind="half")
+
+    def gate(self, num_state_qubits: int) -> Gate:
+        r"""
+        Returns the (shared) adder gate for :code:`num_state_qubits`-qubit
+        summands
+        """
+        return gate_cache.gate(self.factory, num_state_qubits, kind="half")
+
+    def inverse(self, num_state_qubits: int) -> Gate:
+        r"""
+        Returns the (shared) inverse adder gate for
+        :code:`num_state_qubits`-qubit summands
+        """
+        return gate_cache.inverse(self.factory, num_state_qubits, kind="half")
+
+    def num_ancillas(self, num_state_qubits: int) -> int:
+        r"""
+        Returns the number of helper ancillas of the adder for
+        :code:`num_state_qubits`-qubit summands
+        """
+        return self.circuit(num_state_qubits).num_ancillas
+
+    def controlled_gate(self, num_state_qubits: int) -> Gate:
+        r"""
+        Returns the (shared) adder gate for :code:`num_state_qubits`-qubit
+        summands controlled on its first qubit
+        """
+        if self.controlled is None:
+            return gate_cache.gate(_controlled, self.factory, num_state_qubits)
+        return gate_cache.gate(self.controlled, num_state_qubits)
+
+    def num_controlled_ancillas(self, num_state_qubits: int) -> int:
+        r"""
+        Returns the number of helper ancillas of the controlled adder for
+        :code:`num_state_qubits`-qubit summands
+        """
+        return self.controlled_gate(num_state_qubits).num_qubits - (
+            2 * num_state_qubits + 2
+        )
+
+
+RIPPLE: AdderStrategy = AdderStrategy("ripple", CDKMRippleCarryAdder)
+VEDRAL: AdderStrategy = AdderStrategy("vedral", VBERippleCarryAdder)
+DRAPER: AdderStrategy = AdderStrategy("draper", DraperQFTAdder)
+LOOKAHEAD: AdderStrategy = AdderStrategy(
+    "lookahead", CarryLookaheadAdder, controlled_carry_lookahead
+)
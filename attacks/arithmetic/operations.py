@@ -3,27 +3,49 @@ Contains methods to perform arithemtic operations on (signed) integers stored
 on quantum registers
 """
 from qiskit import QuantumCircuit, QuantumRegister, AncillaRegister
-from qiskit.circuit import Gate, ControlledGate
-from qiskit.circuit.library import CDKMRippleCarryAdder
-from ..utils.quantum import controlled_X, controlled_incr
+from qiskit.circuit import ControlledGate, Qubit
+from ..utils.cache import gate_cache
+from ..utils.classical import check_encoding
+from ..utils.layout import RegisterLayout
+from ..utils.profiling import profiled
+from ..utils.quantum import controlled_X, parallel_controlled_incr
+from .adders import AdderStrategy, RIPPLE
 
 
 class SignedAdder(QuantumCircuit):
     r"""
-    Accepts two integers stored in two quantum registers in sign-magnitude
-    representation and computes their (in-place) sum in sign-magnitude
-    representation.
+    Accepts two integers stored in two quantum registers and computes their
+    (in-place) sum. In sign-magnitude representation both numbers are
+    converted to one's complement, added with an end-around carry and
+    converted back. In two's complement representation this is a plain
+    addition.
+
+    The end-around carry is added with the linear-size, log-depth
+    :func:`~attacks.utils.quantum.parallel_controlled_incr`. The adder
+    returns its helper qubits clean, so the incrementer reuses them and the
+    helper register holds as many qubits as the larger of the two needs.
 
     :param bits: number of bits used to store each number
+    :param adder: adder backend, see :mod:`~attacks.arithmetic.adders`
+    :param encoding: signed integer representation, :code:`"sign-magnitude"`
+        or :code:`"twos-complement"`
 
     *Note:* No overflow check is implemented. It is assumed that the result
     will fit in the number of bits specified.
     """
 
-    def __init__(self, bits: int, name: str = "SignedAdder") -> None:
+    @profiled
+    def __init__(
+        self,
+        bits: int,
+        name: str = "SignedAdder",
+        adder: AdderStrategy = RIPPLE,
+        encoding: str = "sign-magnitude",
+    ) -> None:
         r"""
         Creates a signed adder circuit
         """
+        check_encoding(encoding)
         super().__init__(name=name)
         nums: list[QuantumRegister] = [
             QuantumRegister(bits, name="num1"),
@@ -32,23 +54,41 @@ class SignedAdder(QuantumCircuit):
         self.add_register(*nums)
 
         cout: AncillaRegister = AncillaRegister(1, name="cout")
-        helper: AncillaRegister = AncillaRegister(1, name="helper")
+        adder_helpers: int = adder.num_ancillas(bits)
+        incr_helpers: int = 0
+        if encoding == "sign-magnitude":
+            incr_helpers = gate_cache.circuit(
+                parallel_controlled_incr, bits
+            ).num_ancillas
+        helper: AncillaRegister = AncillaRegister(
+            max(adder_helpers, incr_helpers), name="helper"
+        )
         self.add_register(cout, helper)
 
         circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
 
+        if encoding == "twos-complement":
+            circuit.append(
+                adder.gate(bits),
+                [*nums[0], *nums[1], cout, *helper[:adder_helpers]],
+            )
+            self.append(circuit.to_gate(label=name), self.qubits)
+            return
+
         # convert to 1's complement format
-        c_tensor_x: ControlledGate = controlled_X(bits - 1)
+        c_tensor_x: ControlledGate = gate_cache.gate(controlled_X, bits - 1)
         for i in range(2):
             circuit.append(c_tensor_x, [nums[i][-1], *nums[i][:-1]])
 
         # add the two registers
         circuit.append(
-            CDKMRippleCarryAdder(bits, kind="half").to_gate(),
-            [*nums[0], *nums[1], cout, helper],
+            adder.gate(bits), [*nums[0], *nums[1], cout, *helper[:adder_helpers]]
         )
         # if the carry bit is 1 disregard it and add 1 to the result
-        circuit.append(controlled_incr(bits), [cout, *nums[1]])
+        circuit.append(
+            gate_cache.gate(parallel_controlled_incr, bits),
+            [cout, *nums[1], *helper[:incr_helpers]],
+        )
 
         # convert the two registers to sign-magnitude format
         # the second register stores the value of the sum
@@ -58,6 +98,125 @@ class SignedAdder(QuantumCircuit):
         self.append(circuit.to_gate(label=name), self.qubits)
 
 
+class SignedSubtractor(QuantumCircuit):
+    r"""
+    Accepts two integers stored in two quantum registers and computes their
+    (in-place) difference:
+
+    .. math::
+
+        |a\rangle|b\rangle|0\rangle\mapsto |a\rangle|a-b\rangle|c\rangle
+
+    where :math:`c` is the carry of the underlying addition. In
+    sign-magnitude representation :math:`b` is negated by flipping its sign
+    and added with :class:`SignedAdder`. In two's complement representation
+    it uses :math:`a-b = \overline{\bar{a}+b}`.
+
+    The parameters are the same as for :class:`SignedAdder`.
+    """
+
+    @profiled
+    def __init__(
+        self,
+        bits: int,
+        name: str = "SignedSubtractor",
+        adder: AdderStrategy = RIPPLE,
+        encoding: str = "sign-magnitude",
+    ) -> None:
+        r"""
+        Creates a signed subtractor circuit
+        """
+        super().__init__(name=name)
+        add_circ: QuantumCircuit = gate_cache.circuit(
+            SignedAdder, bits, adder=adder, encoding=encoding
+        )
+        self.add_register(*add_circ.qregs)
+        nums: list[QuantumRegister] = self.qregs[:2]
+
+        circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
+        if encoding == "twos-complement":
+            circuit.x(nums[0])
+        else:
+            circuit.x(nums[1][-1])
+        circuit.append(
+            gate_cache.gate(SignedAdder, bits, adder=adder, encoding=encoding),
+            circuit.qubits,
+        )
+        if encoding == "twos-complement":
+            circuit.x(nums[0])
+            circuit.x(nums[1])
+
+        self.append(circuit.to_gate(label=name), self.qubits)
+
+
+@profiled
+def _carry_comparison(bits: int, cmp: str, encoding: str) -> QuantumCircuit:
+    r"""
+    Returns the circuit of :class:`Compare` in :code:`"carry"` mode, which
+    computes :math:`|a\rangle|b\rangle|0\rangle\mapsto |a\rangle|b\rangle
+    |a\gtrless b\rangle` with a single carry chain on a carry-in ancilla.
+
+    Both numbers are mapped to order preserving unsigned keys by flipping
+    their sign bits and, in sign-magnitude representation, flipping both
+    magnitudes if the first number is negative (if the signs differ the
+    sign bits decide the comparison alone). Then :math:`a > b` is the carry
+    of :math:`k_a + \overline{k_b}` and :math:`a \geq b` the carry of
+    :math:`k_a + \overline{k_b} + 1`, computed with the majority gates of the
+    Cuccaro adder and uncomputed right away. Equality is checked bitwise.
+    """
+    magnitude_bits = bits - 1
+    val_1: QuantumRegister = QuantumRegister(magnitude_bits, name="val_1")
+    sgn_1: QuantumRegister = QuantumRegister(1, name="sgn1")
+    val_2: QuantumRegister = QuantumRegister(magnitude_bits, name="val_2")
+    sgn_2: QuantumRegister = QuantumRegister(1, name="sgn2")
+    carry_in: AncillaRegister = AncillaRegister(1, name="carry_in")
+    result: QuantumRegister = QuantumRegister(1, name="result")
+    circuit: QuantumCircuit = QuantumCircuit(
+        val_1, sgn_1, val_2, sgn_2, carry_in, result, name="CarryCompare"
+    )
+    num_1: list[Qubit] = [*val_1, *sgn_1]
+    num_2: list[Qubit] = [*val_2, *sgn_2]
+
+    if cmp == "==":
+        circuit.cx(num_1, num_2)
+        circuit.x(num_2)
+        circuit.mcx(num_2, result)
+        circuit.x(num_2)
+        circuit.cx(num_1, num_2)
+        return circuit
+
+    keys: QuantumCircuit = QuantumCircuit(*circuit.qregs)
+    if encoding == "sign-magnitude":
+        for val in (val_1, val_2):
+            for qubit in val:
+                keys.cx(sgn_1, qubit)
+    keys.x([*sgn_1, *sgn_2])
+
+    # a < b is b > a and a <= b is b >= a
+    first, second = (num_1, num_2) if cmp in (">", ">=") else (num_2, num_1)
+    chain: QuantumCircuit = QuantumCircuit(*circuit.qregs)
+    chain.x(second)
+    carry: Qubit = carry_in[0]
+    for a_i, b_i in zip(first, second):
+        # majority gate, a_i holds the carry out of bit i afterwards
+        chain.cx(a_i, b_i)
+        chain.cx(a_i, carry)
+        chain.ccx(carry, b_i, a_i)
+        carry = a_i
+
+    if cmp in (">=", "<="):
+        circuit.x(carry_in)
+    circuit.compose(keys, inplace=True)
+    circuit.compose(chain, inplace=True)
+    circuit.cx(carry, result)
+    circuit.compose(chain.inverse(), inplace=True)
+    circuit.compose(keys.inverse(), inplace=True)
+    if cmp in (">=", "<="):
+        circuit.x(carry_in)
+
+    return circuit
+
+
 class Compare(QuantumCircuit):
     r"""
     Compares two signed integers stored in quantum registers:
@@ -66,18 +225,55 @@ class Compare(QuantumCircuit):
 
         |a\rangle|b\rangle|0\rangle\mapsto |a\rangle|a-b\rangle|a\gtrless b\rangle
 
-    :param bits: number of bits used to store each number in sign-magnitute
-        format
+    In :code:`"carry"` mode only the comparison bit is computed, with a
+    single carry chain, and both operands are left unchanged:
+
+    .. math::
+
+        |a\rangle|b\rangle|0\rangle\mapsto |a\rangle|b\rangle|a\gtrless b\rangle
+
+    which needs about half of the Toffoli gates of the subtraction and the
+    zero check. In this mode the sign-magnitude pattern of :math:`-0` is not
+    supported.
+
+    :param bits: number of bits used to store each number
     :param cmp: can be any one of ">", "<", "=", ">=", "<="
+    :param adder: adder backend of the subtraction, see
+        :mod:`~attacks.arithmetic.adders` (unused in :code:`"carry"` mode)
+    :param encoding: signed integer representation, :code:`"sign-magnitude"`
+        or :code:`"twos-complement"`
+    :param mode: :code:`"difference"` to compute :math:`a-b` as well or
+        :code:`"carry"` to compute only the comparison bit
     """
 
+    @profiled
     def __init__(
-        self, bits: int, cmp: str = ">", name: str = "Compare"
+        self,
+        bits: int,
+        cmp: str = ">",
+        name: str = "Compare",
+        adder: AdderStrategy = RIPPLE,
+        encoding: str = "sign-magnitude",
+        mode: str = "difference",
     ) -> None:
         r"""
         Creates a comparator circuit
         """
+        check_encoding(encoding)
+        if cmp not in ("==", ">", "<", ">=", "<="):
+            raise ValueError(
+                "Parameter `cmp` should be one of '==', '>', '<', '>=', '<='"
+            )
+        if mode not in ("difference", "carry"):
+            raise ValueError("Parameter `mode` should be one of 'difference', 'carry'")
         super().__init__(name=name)
+        if mode == "carry":
+            carry_circ: QuantumCircuit = _carry_comparison(bits, cmp, encoding)
+            self.add_register(*carry_circ.qregs)
+            self.append(carry_circ.to_gate(label=name), self.qubits)
+            self.register_layout: RegisterLayout = self._register_layout(encoding)
+            return
+
         magnitude_bits = bits - 1
         val_1: QuantumRegister = QuantumRegister(magnitude_bits, name="val_1")
         sgn_1: QuantumRegister = QuantumRegister(1, name="sgn1")
@@ -85,9 +281,12 @@ class Compare(QuantumCircuit):
         sgn_2: QuantumRegister = QuantumRegister(1, name="sgn2")
         self.add_register(val_1, sgn_1, val_2, sgn_2)
 
-        adder: Gate = SignedAdder(bits, name="Subtract")
+        subtract_args: tuple = (bits, "Subtract", adder, encoding)
+        subtract: QuantumCircuit = gate_cache.circuit(
+            SignedSubtractor, *subtract_args
+        )
 
-        anc: AncillaRegister = AncillaRegister(adder.num_ancillas, name="anc")
+        anc: AncillaRegister = AncillaRegister(subtract.num_ancillas, name="anc")
         self.add_register(anc)
 
         is_zero: AncillaRegister = AncillaRegister(1, name="zero_flag")
@@ -97,17 +296,19 @@ class Compare(QuantumCircuit):
         self.add_register(result)
 
         circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
-        circuit.x(sgn_2)
-        circuit.append(adder.to_gate(), [*val_1, *sgn_1, *val_2, *sgn_2, *anc])
-
-        circuit.x(val_2)
-        circuit.mcx(val_2, is_zero)
-        circuit.x(val_2)
+        circuit.append(
+            gate_cache.gate(SignedSubtractor, *subtract_args),
+            [*val_1, *sgn_1, *val_2, *sgn_2, *anc],
+        )
 
-        if cmp not in ("==", ">", "<", ">=", "<="):
-            raise ValueError(
-                "Parameter `cmp` should be one of '==', '>', '<', '>=', '<='"
-            )
+        # in two's complement representation the lower bits of a negative
+        # number can be all zero
+        zero_bits: list = (
+            [*val_2, *sgn_2] if encoding == "twos-complement" else [*val_2]
+        )
+        circuit.x(zero_bits)
+        circuit.mcx(zero_bits, is_zero)
+        circuit.x(zero_bits)
 
         if cmp == "==":
             circuit.cx(is_zero, result)
@@ -124,3 +325,93 @@ class Compare(QuantumCircuit):
             circuit.x(result)
 
         self.append(circuit.to_gate(label=name), self.qubits)
+        self.register_layout = self._register_layout(encoding)
+
+    def _register_layout(self, encoding: str) -> RegisterLayout:
+        r"""
+        Returns the register layout of the comparator, with the signed fields
+        :code:`a` and :code:`b` (which holds :math:`a-b` afterwards in
+        :code:`"difference"` mode)
+        """
+        val_1, sgn_1, val_2, sgn_2 = self.qregs[:4]
+        return RegisterLayout(
+            self,
+            fields={
+                "a": ([*val_1, *sgn_1], encoding),
+                "b": ([*val_2, *sgn_2], encoding),
+            },
+        )
+
+
+class Square(QuantumCircuit):
+    r"""
+    Computes the square of an unsigned integer stored in a quantum register:
+
+    .. math::
+
+        |x\rangle|0\rangle\mapsto |x\rangle|x^2\rangle
+
+    Instead of multiplying :math:`x` with a copy of itself it uses
+
+    .. math::
+
+        x^2 = \sum_i x_i \left(2^{2i} + \sum_{j>i} x_j 2^{i+j+1}\right)
+
+    so row :math:`i` is a single addition controlled on :math:`x_i` of a
+    number formed by the bits of :math:`x` above :math:`i`. The adder of row
+    :math:`i` has :math:`n-i+1` bits instead of :math:`n`, which halves the
+    adder cost of a full multiplier for large :math:`n`, and no copy of
+    :math:`x` is needed.
+
+    :param num_state_qubits: number of qubits of :math:`x`
+    :param adder: adder backend of the rows, see
+        :mod:`~attacks.arithmetic.adders`
+    """
+
+    @profiled
+    def __init__(
+        self,
+        num_state_qubits: int,
+        name: str = "Square",
+        adder: AdderStrategy = RIPPLE,
+    ) -> None:
+        r"""
+        Creates a squaring circuit
+        """
+        super().__init__(name=name)
+        num_bits: int = num_state_qubits
+        x_reg: QuantumRegister = QuantumRegister(num_bits, name="x")
+        out: QuantumRegister = QuantumRegister(2 * num_bits, name="out")
+        self.add_register(x_reg, out)
+
+        # a qubit in |1> and a qubit in |0> for the two lowest bits of the
+        # addends and the helper qubits of the adders
+        widths: list[int] = [
+            num_bits - i + 1 if i < num_bits - 1 else 1 for i in range(num_bits)
+        ]
+        helper: AncillaRegister = AncillaRegister(
+            2 + max(adder.num_controlled_ancillas(width) for width in widths),
+            name="helper",
+        )
+        self.add_register(helper)
+        one, zero, *adder_helper = helper
+
+        circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
+        circuit.x(one)
+        for i in range(num_bits):
+            # x_i * x_i = x_i so the addend of row i is 1 + 4 * (x >> (i+1))
+            addend = [one, zero, *x_reg[i + 1 :]] if i < num_bits - 1 else [one]
+            width: int = widths[i]
+            circuit.append(
+                adder.controlled_gate(width),
+                [
+                    x_reg[i],
+                    *addend,
+                    *out[2 * i : 2 * i + width],
+                    out[2 * i + width],
+                    *adder_helper[: adder.num_controlled_ancillas(width)],
+                ],
+            )
+        circuit.x(one)
+
+        self.append(circuit.to_gate(label=name), self.qubits)
@@ -6,18 +6,56 @@
 #    * Add the multiplication result to the final result layer
 #    * Repeat for next element
 #
-# We use a Cuccaro half-adder for the additions and an HRS Cumulative Multiplier
-# for multiplications, both provided by Qiskit
+# By default we use a Cuccaro half-adder for the additions and a cumulative
+# multiplier (one controlled addition per bit, as in Qiskit's HRS Cumulative
+# Multiplier) for multiplications. Alternatively, the squares can be computed
+# with the dedicated squaring circuit Square, which needs no copy of v[i] and
+# about half of the additions of the multiplier. The adders of all of them can
+# be replaced by any backend of attacks/arithmetic/adders.py
 
 r"""
 Module containing circuits to perform arithmetic operations on vectors
 """
+from typing import Optional
 from qiskit import QuantumCircuit, QuantumRegister, AncillaRegister
 from qiskit.circuit import Gate
-from qiskit.circuit.library import (
-    CDKMRippleCarryAdder,
-    HRSCumulativeMultiplier,
-)
+from ..utils.cache import gate_cache
+from ..utils.classical import check_encoding
+from ..utils.layout import RegisterLayout
+from ..utils.profiling import profiled
+from .adders import AdderStrategy, RIPPLE
+from .operations import Square
+
+
+@profiled
+def _multiplier(
+    num_state_qubits: int, adder: AdderStrategy = RIPPLE
+) -> QuantumCircuit:
+    r"""
+    Returns a cumulative multiplier :math:`|a\rangle|b\rangle|0\rangle\mapsto
+    |a\rangle|b\rangle|a \cdot b\rangle` built from the controlled adders of
+    the given backend. It has the same layout as Qiskit's
+    :code:`HRSCumulativeMultiplier`, which it equals for the default
+    backend, but uses the dedicated controlled adder of the backend if it has
+    one.
+    """
+    num_bits: int = num_state_qubits
+    a_reg: QuantumRegister = QuantumRegister(num_bits, name="a")
+    b_reg: QuantumRegister = QuantumRegister(num_bits, name="b")
+    out: QuantumRegister = QuantumRegister(2 * num_bits, name="out")
+    helper: AncillaRegister = AncillaRegister(
+        adder.num_controlled_ancillas(num_bits), name="helper"
+    )
+    circuit: QuantumCircuit = QuantumCircuit(
+        a_reg, b_reg, out, helper, name="SquareCalc"
+    )
+    for i in range(num_bits):
+        circuit.append(
+            adder.controlled_gate(num_bits),
+            [b_reg[i], *a_reg, *out[i : i + num_bits + 1], *helper],
+        )
+
+    return circuit
 
 
 class Norm2(QuantumCircuit):
@@ -26,18 +64,51 @@ class Norm2(QuantumCircuit):
     stored in a quantum register
 
     :param dimension: Dimension of the vector
-    :param bits: Number of qubits used to store each vector component in sign-
-        magnitute format
+    :param bits: Number of qubits used to store each vector component
+    :param use_squarer: whether to compute the squares with
+        :class:`~attacks.arithmetic.operations.Square` instead of multiplying
+        each component with a copy of itself
+    :param adder: adder backend of the additions, multiplications and
+        squarings, see :mod:`~attacks.arithmetic.adders`
+    :param encoding: signed integer representation of the components,
+        :code:`"sign-magnitude"` or :code:`"twos-complement"`. In two's
+        complement representation the lower :math:`n-1` bits :math:`x'` of a
+        component are squared as an unsigned number and
+        :math:`x^2 = x'^2 - 2^n s x' \bmod 2^{2n-2}` for the sign bit
+        :math:`s` is applied with one controlled subtraction of :math:`n-2`
+        bits (whose carry is left in the :code:`sign carry` register). The
+        component :math:`-2^{n-1}` is not supported.
+    :param norm_bits: number of qubits of the result, defaults to
+        :math:`2(\text{bits}-1)+\text{dimension}`, which fits any vector. With
+        fewer qubits the additions are truncated, so the (squared) norm of
+        the vector, and hence of all its components, should fit in
+        :code:`norm_bits` bits, see :mod:`~attacks.grover.planning`.
     """
 
+    @profiled
     def __init__(
-        self, dimension: int, bits: int, name: str = "NormCalc"
+        self,
+        dimension: int,
+        bits: int,
+        name: str = "NormCalc",
+        use_squarer: bool = False,
+        adder: AdderStrategy = RIPPLE,
+        encoding: str = "sign-magnitude",
+        norm_bits: Optional[int] = None,
     ) -> None:
         r"""
         Creates a norm calcluating circuit
         """
+        check_encoding(encoding)
         super().__init__(name=name)
         magnitude_bits: int = bits - 1
+        max_norm_bits: int = 2 * magnitude_bits + dimension
+        if norm_bits is None:
+            norm_bits = max_norm_bits
+        if not 1 <= norm_bits <= max_norm_bits:
+            raise ValueError(
+                f"Parameter `norm_bits` should be between 1 and {max_norm_bits}"
+            )
         signs: list[QuantumRegister] = [
             QuantumRegister(1, name=f"sgn_{i}") for i in range(dimension)
         ]
@@ -48,59 +119,113 @@ class Norm2(QuantumCircuit):
         for i in range(dimension):
             self.add_register(values[i], signs[i])
 
-        copy: AncillaRegister = AncillaRegister(magnitude_bits, name="copy")
-        self.add_register(copy)
+        if use_squarer:
+            square_circ: QuantumCircuit = gate_cache.circuit(
+                Square, magnitude_bits, adder=adder
+            )
+            square_gate: Gate = gate_cache.gate(Square, magnitude_bits, adder=adder)
+        else:
+            copy: AncillaRegister = AncillaRegister(magnitude_bits, name="copy")
+            self.add_register(copy)
+            square_circ = gate_cache.circuit(_multiplier, magnitude_bits, adder)
+            square_gate = gate_cache.gate(_multiplier, magnitude_bits, adder)
 
-        mult_gate: Gate = HRSCumulativeMultiplier(magnitude_bits).to_gate(
-            label="SquareCalc"
-        )
+        # the additions are truncated to the width of the result
+        add_widths: list[int] = [
+            min(2 * magnitude_bits + i, norm_bits) for i in range(dimension)
+        ]
         mult_outs: list[AncillaRegister] = [
-            AncillaRegister(2 * magnitude_bits + i, name=f"square_{i}")
+            AncillaRegister(
+                max(2 * magnitude_bits, add_widths[i]), name=f"square_{i}"
+            )
             for i in range(dimension)
         ]
+        # width of the sign correction in two's complement representation
+        correction_bits: int = (
+            magnitude_bits - 1 if encoding == "twos-complement" else 0
+        )
         mult_helper: AncillaRegister = AncillaRegister(
-            1, name="multiplication helper"
+            max(
+                square_circ.num_ancillas,
+                adder.num_controlled_ancillas(correction_bits)
+                if correction_bits
+                else 0,
+            ),
+            name="multiplication helper",
         )
         self.add_register(*mult_outs, mult_helper)
+        if correction_bits:
+            sign_carries: AncillaRegister = AncillaRegister(
+                dimension, name="sign carry"
+            )
+            self.add_register(sign_carries)
 
         add_helper: AncillaRegister = AncillaRegister(
-            1, name="addition helper"
+            max(adder.num_ancillas(width) for width in add_widths),
+            name="addition helper",
         )
         couts: list[AncillaRegister] = [
             AncillaRegister(1, name=f"cout_{i}") for i in range(dimension)
         ]
         self.add_register(*couts, add_helper)
 
-        norm: QuantumRegister = QuantumRegister(
-            2 * magnitude_bits + dimension, name="norm"
-        )
+        norm: QuantumRegister = QuantumRegister(norm_bits, name="norm")
         self.add_register(norm)
 
         circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
         for i in range(dimension):
-            circuit.cx(values[i], copy)
+            if use_squarer:
+                circuit.append(
+                    square_gate,
+                    [*values[i], *mult_outs[i][: 2 * magnitude_bits], *mult_helper],
+                )
+            else:
+                circuit.cx(values[i], copy)
+                circuit.append(
+                    square_gate,
+                    [
+                        *values[i],
+                        *copy,
+                        *mult_outs[i][: 2 * magnitude_bits],
+                        *mult_helper,
+                    ],
+                )
+            if correction_bits:
+                # x^2 = x'^2 - 2^(n+1) s (x' mod 2^(n-1)) mod 2^(2n) for the
+                # n = bits-1 lower bits x', using a - b = NOT(NOT(a) + b)
+                target = mult_outs[i][magnitude_bits + 1 : 2 * magnitude_bits]
+                circuit.x(target)
+                circuit.append(
+                    adder.controlled_gate(correction_bits),
+                    [
+                        *signs[i],
+                        *values[i][:correction_bits],
+                        *target,
+                        sign_carries[i],
+                        *mult_helper[: adder.num_controlled_ancillas(correction_bits)],
+                    ],
+                )
+                circuit.x(target)
             circuit.append(
-                mult_gate,
+                adder.gate(add_widths[i]),
                 [
-                    *values[i],
-                    *copy,
-                    *mult_outs[i][: 2 * magnitude_bits],
-                    mult_helper,
-                ],
-            )
-            circuit.append(
-                CDKMRippleCarryAdder(
-                    2 * magnitude_bits + i, kind="half"
-                ).to_gate(),
-                [
-                    *mult_outs[i],
-                    *norm[: 2 * magnitude_bits + i],
+                    *mult_outs[i][: add_widths[i]],
+                    *norm[: add_widths[i]],
                     couts[i],
-                    add_helper,
+                    *add_helper[: adder.num_ancillas(add_widths[i])],
                 ],
             )
-            circuit.cx(couts[i], norm[2 * magnitude_bits + i])
-            circuit.cx(values[i], copy)
+            if add_widths[i] < norm_bits:
+                circuit.cx(couts[i], norm[add_widths[i]])
+            if not use_squarer:
+                circuit.cx(values[i], copy)
 
         self.append(circuit.to_gate(label=name), self.qubits)
         self.result_register: QuantumRegister = norm
+        self.register_layout: RegisterLayout = RegisterLayout(
+            self,
+            fields={
+                f"x_{i}": ([*values[i], *signs[i]], encoding)
+                for i in range(dimension)
+            },
+        )
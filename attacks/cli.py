@@ -0,0 +1,352 @@
+# Command-line interface:
+#    python -m attacks sweep --dimension 2..16 --bits 4..10 --list-size 16,256
+#
+# The sweep builds the GaussReduce marking oracle (and, unless disabled, a qRAM
+# with random vectors) for every point of the grid spanned by the dimensions,
+# bits and list sizes, and records the hierarchical resource estimates of
+# attacks.utils.resources. With --action transpile the phase oracle is also
+# transpiled to BASIS_GATES with transpile_blocks, which is much slower.
+#
+# Configurations are run in worker processes (one per core by default) and
+# every result is appended to the output file as soon as it is done, one CSV
+# row or JSON line per configuration, and flushed. When the output file
+# already exists, the configurations it contains with all their estimates are
+# skipped, so an interrupted sweep is resumed by running the same command again
+# (a row cut off by a killed run is recomputed). Failed
+# configurations are reported on stderr and not recorded, so they are retried
+# on resume.
+r"""
+Command-line tools, currently a parameter sweep of the oracle resources
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from itertools import product
+from pathlib import Path
+from typing import Any, Optional
+import numpy as np
+from .arithmetic.adders import DRAPER, LOOKAHEAD, RIPPLE, VEDRAL, AdderStrategy
+from .grover.oracles import ReductionOracle
+from .memory.qram import qRAM
+from .utils.quantum import transpile_blocks
+from .utils.resources import estimate_resources
+
+ADDERS: dict[str, AdderStrategy] = {
+    adder.name: adder for adder in (RIPPLE, VEDRAL, DRAPER, LOOKAHEAD)
+}
+BASIS_GATES: list[str] = ["cx", "u"]
+RESULT_FIELDS: list[str] = [
+    "num_qubits",
+    "num_ancillas",
+    "toffoli",
+    "t",
+    "cnot",
+    "depth",
+    "qram_qubits",
+    "qram_toffoli",
+    "transpiled_cx",
+    "transpiled_u",
+    "transpiled_depth",
+    "seconds",
+]
+# result fields filled in for every configuration, a row lacking one of them
+# was not written completely
+REQUIRED_FIELDS: list[str] = [
+    "num_qubits",
+    "num_ancillas",
+    "toffoli",
+    "t",
+    "cnot",
+    "depth",
+    "seconds",
+]
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    r"""
+    One configuration of a parameter sweep
+
+    :param dimension: dimension of the vectors
+    :param bits: number of bits of each vector component
+    :param list_size: number of vectors in :math:`L`, which sets the number
+        of address qubits
+    :param action: :code:`"estimate"` or :code:`"transpile"`
+    :param qram_mode: construction mode of the qRAM, see
+        :class:`~attacks.memory.qram.qRAM`, or :code:`"none"` to skip it
+    :param adder: name of the adder backend, a key of :code:`ADDERS`
+    :param encoding: signed integer representation
+    :param comparator: mode of the norm comparisons
+    :param min_width: whether to build the minimum-width oracle
+    :param seed: seed of the random list stored in the qRAM
+    """
+
+    dimension: int
+    bits: int
+    list_size: int
+    action: str = "estimate"
+    qram_mode: str = "unary"
+    adder: str = "ripple"
+    encoding: str = "sign-magnitude"
+    comparator: str = "carry"
+    min_width: bool = False
+    seed: int = 0
+
+    @property
+    def num_address_qubits(self) -> int:
+        r"""
+        Number of address qubits of a qRAM storing :code:`list_size` vectors
+        """
+        return 1 if self.list_size <= 1 else (self.list_size - 1).bit_length()
+
+    def key(self) -> tuple[str, ...]:
+        r"""
+        Identifies the configuration among the rows of an output file
+        """
+        return tuple(str(value) for value in asdict(self).values())
+
+
+CONFIG_FIELDS: list[str] = [field.name for field in fields(SweepConfig)]
+
+
+def parse_range(text: str) -> list[int]:
+    r"""
+    Parses a comma-separated list of integers and inclusive ranges
+    :code:`start..stop` or :code:`start..stop:step`, e.g.
+    :code:`"2..8:2,16"` is :code:`[2, 4, 6, 8, 16]`
+    """
+    values: list[int] = []
+    for item in text.split(","):
+        if ".." not in item:
+            values.append(int(item))
+            continue
+        start, _, stop = item.partition("..")
+        stop, _, step = stop.partition(":")
+        values.extend(range(int(start), int(stop) + 1, int(step or 1)))
+    return values
+
+
+def run_configuration(config: SweepConfig) -> dict[str, Any]:
+    r"""
+    Builds the circuits of one configuration and returns its output row
+    """
+    start: float = time.perf_counter()
+    oracle: ReductionOracle = ReductionOracle(
+        config.num_address_qubits,
+        config.dimension,
+        config.bits,
+        adder=ADDERS[config.adder],
+        encoding=config.encoding,
+        comparator=config.comparator,
+    )
+    report = estimate_resources(oracle._marking_oracle(min_width=config.min_width))
+    row: dict[str, Any] = {
+        **asdict(config),
+        **dict.fromkeys(RESULT_FIELDS),
+        "num_qubits": report.num_qubits,
+        "num_ancillas": report.num_ancillas,
+        "toffoli": report.total.toffoli_count,
+        "t": report.total.t_count,
+        "cnot": report.total.cnot_count,
+        "depth": report.total.depth,
+    }
+
+    if config.qram_mode != "none":
+        # components below 2^(bits-2), so the differences p-v fit as well
+        bound: int = 1 << max(config.bits - 2, 0)
+        rng = np.random.default_rng(config.seed)
+        values = rng.integers(-bound + 1, bound, (config.list_size, config.dimension))
+        qram: qRAM = qRAM(
+            values.tolist(),
+            config.bits,
+            mode=config.qram_mode,
+            encoding=config.encoding,
+        )
+        row.update(qram_qubits=qram.num_qubits, qram_toffoli=qram.toffoli_count)
+
+    if config.action == "transpile":
+        transpiled = transpile_blocks(
+            oracle.phase_oracle(min_width=config.min_width),
+            basis_gates=BASIS_GATES,
+        )
+        counts = transpiled.count_ops()
+        row.update(
+            transpiled_cx=counts.get("cx", 0),
+            transpiled_u=counts.get("u", 0),
+            transpiled_depth=transpiled.depth(),
+        )
+
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+
+def _output_format(path: Path) -> str:
+    return "csv" if path.suffix == ".csv" else "jsonl"
+
+
+def completed_configurations(path: Path) -> set[tuple[str, ...]]:
+    r"""
+    Returns the keys of the configurations recorded in an output file. Lines
+    that cannot be parsed or lack one of the :code:`REQUIRED_FIELDS` (e.g.
+    the last line of an interrupted sweep) are ignored.
+    """
+    if not path.exists():
+        return set()
+    rows: list[dict[str, Any]] = []
+    with open(path, newline="", encoding="utf-8") as file:
+        if _output_format(path) == "csv":
+            rows = list(csv.DictReader(file))
+        else:
+            for line in file:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return {
+        tuple(str(row.get(name)) for name in CONFIG_FIELDS)
+        for row in rows
+        if all(
+            row.get(name) not in (None, "")
+            for name in CONFIG_FIELDS + REQUIRED_FIELDS
+        )
+    }
+
+
+def sweep(
+    configs: list[SweepConfig],
+    output: Path,
+    jobs: Optional[int] = None,
+) -> int:
+    r"""
+    Runs the configurations that are not recorded in :code:`output` yet in
+    :code:`jobs` worker processes (one per core by default) and appends
+    every result to :code:`output` as soon as it is done. Returns the number
+    of configurations that failed.
+
+    :param configs: the configurations
+    :param output: CSV file if it ends with :code:`.csv`, JSON lines
+        otherwise
+    :param jobs: number of worker processes
+    """
+    done: set[tuple[str, ...]] = completed_configurations(output)
+    pending: list[SweepConfig] = [c for c in configs if c.key() not in done]
+    print(
+        f"{len(configs) - len(pending)} configurations done, {len(pending)} to run",
+        file=sys.stderr,
+    )
+    if not pending:
+        return 0
+
+    output_format: str = _output_format(output)
+    new_file: bool = not output.exists() or output.stat().st_size == 0
+    if not new_file:
+        # terminate a line left incomplete by an interrupted sweep
+        with open(output, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read() != b"\n":
+                with open(output, "ab") as append:
+                    append.write(b"\n")
+    failures: int = 0
+    executor: ProcessPoolExecutor = ProcessPoolExecutor(jobs)
+    with open(output, "a", newline="", encoding="utf-8") as file, executor:
+        writer = csv.DictWriter(file, CONFIG_FIELDS + RESULT_FIELDS)
+        if output_format == "csv" and new_file:
+            writer.writeheader()
+        futures: dict[Future, SweepConfig] = {
+            executor.submit(run_configuration, config): config for config in pending
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    row: dict[str, Any] = future.result()
+                except Exception as error:  # pylint: disable=broad-except
+                    # any failure of a single configuration (invalid widths,
+                    # errors raised by Qiskit) must not stop an unattended
+                    # sweep; it is reported and retried on resume
+                    failures += 1
+                    print(f"{futures[future]} failed: {error!r}", file=sys.stderr)
+                    continue
+                if output_format == "csv":
+                    writer.writerow(row)
+                else:
+                    file.write(json.dumps(row) + "\n")
+                file.flush()
+                print(
+                    f"{row['dimension']:3} {row['bits']:3} {row['list_size']:8} "
+                    f"{row['seconds']:8.2f}s",
+                    file=sys.stderr,
+                )
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return failures
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    r"""
+    Runs the command-line interface with the given arguments (those of the
+    process by default) and returns the exit code, :code:`1` if any
+    configuration of a sweep failed
+    """
+    parser = argparse.ArgumentParser(prog="pqc-attacks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    sweep_parser = commands.add_parser(
+        "sweep", help="tabulate the oracle resources over a parameter grid"
+    )
+    sweep_parser.add_argument(
+        "--dimension", type=parse_range, required=True, help="e.g. 2..16"
+    )
+    sweep_parser.add_argument(
+        "--bits", type=parse_range, required=True, help="e.g. 4..10"
+    )
+    sweep_parser.add_argument(
+        "--list-size", type=parse_range, default=[16], help="e.g. 16,256,4096"
+    )
+    sweep_parser.add_argument(
+        "--action", choices=["estimate", "transpile"], default="estimate"
+    )
+    sweep_parser.add_argument(
+        "--qram-mode", choices=["mcx", "unary", "none"], default="unary"
+    )
+    sweep_parser.add_argument("--adder", choices=list(ADDERS), default="ripple")
+    sweep_parser.add_argument(
+        "--encoding",
+        choices=["sign-magnitude", "twos-complement"],
+        default="sign-magnitude",
+    )
+    sweep_parser.add_argument(
+        "--comparator", choices=["carry", "difference"], default="carry"
+    )
+    sweep_parser.add_argument("--min-width", action="store_true")
+    sweep_parser.add_argument("--seed", type=int, default=0)
+    sweep_parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes"
+    )
+    sweep_parser.add_argument(
+        "-o", "--output", default="sweep.csv", help="CSV (.csv) or JSON lines file"
+    )
+    parsed = parser.parse_args(args)
+
+    configs: list[SweepConfig] = [
+        SweepConfig(
+            dimension,
+            bits,
+            list_size,
+            action=parsed.action,
+            qram_mode=parsed.qram_mode,
+            adder=parsed.adder,
+            encoding=parsed.encoding,
+            comparator=parsed.comparator,
+            min_width=parsed.min_width,
+            seed=parsed.seed,
+        )
+        for dimension, bits, list_size in product(
+            parsed.dimension, parsed.bits, parsed.list_size
+        )
+    ]
+    return 1 if sweep(configs, Path(parsed.output), parsed.jobs) else 0
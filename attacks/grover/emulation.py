@@ -0,0 +1,227 @@
+# Analytic Grover emulation:
+# The oracles of attacks/grover/oracles.py mark addresses by a classical
+# predicate on (L[i], p), so the marked set can be computed classically. Grover's
+# algorithm with M marked out of N = 2^num_address_qubits addresses (starting
+# from the uniform superposition) stays in the plane spanned by the uniform
+# superpositions of the marked and the unmarked addresses. With
+# sin(theta) = sqrt(M/N), k iterations rotate the state to
+#    sin((2k+1) theta) |marked> + cos((2k+1) theta) |unmarked>
+# so a measurement yields a marked address with probability sin^2((2k+1)theta),
+# uniformly among the marked ones, and an unmarked one (including the addresses
+# beyond |L|, which hold the zero vector and are never marked) uniformly
+# otherwise. Every iteration queries the oracle once. A round without iterations
+# still measures an address and checks whether it is marked, so every round is
+# charged at least one query.
+#
+# When M is not known the iteration counts are chosen as by Boyer, Brassard,
+# Hoyer and Tapp [1]: in every round k is drawn uniformly from [0, m) and m grows
+# by a factor 6/5 up to sqrt(N), which finds a marked address after
+# O(sqrt(N/M)) queries in expectation.
+#
+# [1] https://arxiv.org/abs/quant-ph/9605034
+r"""
+Emulation of Grover searches from the classically computed marked set
+"""
+from dataclasses import dataclass
+from math import asin, ceil, pi, sqrt
+from typing import Iterable, Optional
+import numpy as np
+
+# growth factor of the BBHT iteration bound, any value in (1, 4/3) works
+BBHT_GROWTH: float = 6 / 5
+# the BBHT search gives up after BBHT_QUERY_FACTOR * sqrt(N) oracle queries.
+# Its expected number of queries is at most 9/4 sqrt(N/M), so a search with
+# marked addresses gives up with probability at most 1/4
+BBHT_QUERY_FACTOR: float = 9.0
+
+
+def reduction_marks(vectors, p, first: bool = True) -> np.ndarray:
+    r"""
+    Returns a boolean array marking the vectors :math:`v` of the list that
+    the phase oracle of :class:`~attacks.grover.oracles.ReductionOracle`
+    marks for the vector :math:`p`, i.e. :math:`\|v\| \leq \|p\|` and
+    :math:`\|p-v\| < \|p\|` if :code:`first` is set to :code:`True` and
+    :math:`\|v\| > \|p\|` and :math:`\|p-v\| \leq \|v\|` otherwise
+    """
+    vectors = np.array(vectors, dtype=np.int64, ndmin=2)
+    p = np.asarray(p, dtype=np.int64)
+    v_norm: np.ndarray = np.sum(vectors**2, axis=1)
+    p_norm: int = int(p @ p)
+    diff_norm: np.ndarray = np.sum((p - vectors) ** 2, axis=1)
+    if first:
+        return (v_norm <= p_norm) & (diff_norm < p_norm)
+    return (v_norm > p_norm) & (diff_norm <= v_norm)
+
+
+@dataclass
+class SearchOutcome:
+    r"""
+    Result of an emulated Grover search
+
+    :param address: the marked address that was measured, or :code:`None` if
+        the search gave up
+    :param queries: number of oracle queries, the Grover iterations with at
+        least one per round
+    :param rounds: number of measurements
+    """
+
+    address: Optional[int]
+    queries: int
+    rounds: int
+
+    @property
+    def found(self) -> bool:
+        r"""
+        Whether a marked address was found
+        """
+        return self.address is not None
+
+
+class GroverEmulator:
+    r"""
+    Emulates Grover searches over :math:`N = 2^n` addresses, given which of
+    them the oracle marks, without building a circuit.
+
+    :param marked: boolean array marking the addresses of the stored list
+        (the remaining addresses up to :math:`N` are unmarked)
+    :param num_address_qubits: number of address qubits :math:`n`, defaults
+        to the fewest that address the list
+    :param seed: seed (or generator) of the random number generator used to
+        sample the measurements
+    """
+
+    def __init__(
+        self,
+        marked,
+        num_address_qubits: Optional[int] = None,
+        seed=None,
+    ) -> None:
+        marked = np.asarray(marked, dtype=bool)
+        if num_address_qubits is None:
+            num_address_qubits = max(1, (len(marked) - 1).bit_length())
+        if len(marked) > 1 << num_address_qubits:
+            raise ValueError(
+                f"{num_address_qubits} address qubits cannot address "
+                f"{len(marked)} elements"
+            )
+
+        self.num_address_qubits: int = num_address_qubits
+        self.num_states: int = 1 << num_address_qubits
+        self.marked_addresses: np.ndarray = np.flatnonzero(marked)
+        self.num_marked: int = len(self.marked_addresses)
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+    @classmethod
+    def from_reduction(
+        cls,
+        vectors,
+        p,
+        first: bool = True,
+        num_address_qubits: Optional[int] = None,
+        seed=None,
+    ) -> "GroverEmulator":
+        r"""
+        Returns the emulator of the GaussReduce search for the list
+        :math:`L` (stored in a qRAM) and the vector :math:`p`, see
+        :func:`reduction_marks`
+        """
+        return cls(reduction_marks(vectors, p, first), num_address_qubits, seed)
+
+    @property
+    def angle(self) -> float:
+        r"""
+        The rotation angle :math:`\theta = \arcsin\sqrt{M/N}` of a Grover
+        iteration
+        """
+        return asin(sqrt(self.num_marked / self.num_states))
+
+    def success_probability(self, iterations):
+        r"""
+        Returns the probability :math:`\sin^2((2k+1)\theta)` of measuring a
+        marked address after :math:`k` iterations (an integer or an array of
+        integers)
+        """
+        return np.sin((2 * np.asarray(iterations) + 1) * self.angle) ** 2
+
+    def optimal_iterations(self) -> int:
+        r"""
+        Returns the number of iterations maximizing the success probability
+        when the number of marked addresses is known, the integer closest to
+        :math:`\pi / (4\theta) - 1/2`, or 0 if no address is marked
+        """
+        if not self.num_marked:
+            return 0
+        return max(0, round(pi / (4 * self.angle) - 0.5))
+
+    def measure(self, iterations: int, shots: int = 1) -> np.ndarray:
+        r"""
+        Samples the addresses measured after :code:`iterations` Grover
+        iterations in :code:`shots` independent runs
+        """
+        success: np.ndarray = self.rng.random(shots) < self.success_probability(
+            iterations
+        )
+        addresses: np.ndarray = np.empty(shots, dtype=np.int64)
+        num_success: int = int(success.sum())
+        if self.num_marked:
+            addresses[success] = self.rng.choice(self.marked_addresses, num_success)
+        if num_success < shots:
+            # the r-th unmarked address is r plus the number of marked
+            # addresses with at most r unmarked addresses before them
+            ranks = self.rng.integers(
+                0, self.num_states - self.num_marked, shots - num_success
+            )
+            before = self.marked_addresses - np.arange(self.num_marked)
+            addresses[~success] = ranks + np.searchsorted(before, ranks, "right")
+        return addresses
+
+    def is_marked(self, address: int) -> bool:
+        r"""
+        Checks (classically) whether an address is marked
+        """
+        index: int = int(np.searchsorted(self.marked_addresses, address))
+        return (
+            index < self.num_marked and int(self.marked_addresses[index]) == address
+        )
+
+    def _bbht_schedule(self) -> Iterable[int]:
+        bound: float = 1.0
+        while True:
+            yield int(self.rng.integers(0, ceil(bound)))
+            bound = min(BBHT_GROWTH * bound, sqrt(self.num_states))
+
+    def search(
+        self,
+        iterations: Optional[Iterable[int]] = None,
+        max_queries: Optional[int] = None,
+    ) -> SearchOutcome:
+        r"""
+        Emulates a search that runs Grover's algorithm with the given numbers
+        of iterations in turn, measuring after each, until a marked address
+        is measured. Without :code:`iterations` the numbers of iterations
+        are chosen by the BBHT strategy for an unknown number of marked
+        addresses, which gives up after
+        :math:`\lceil \text{BBHT\_QUERY\_FACTOR} \sqrt{N} \rceil` queries
+        unless :code:`max_queries` is given. For a known number of marked
+        addresses pass e.g. :code:`[emulator.optimal_iterations()] * rounds`.
+
+        :param iterations: numbers of iterations of the rounds
+        :param max_queries: number of queries after which the search gives up
+        """
+        if iterations is None:
+            iterations = self._bbht_schedule()
+            if max_queries is None:
+                max_queries = ceil(BBHT_QUERY_FACTOR * sqrt(self.num_states))
+
+        queries: int = 0
+        rounds: int = 0
+        for count in iterations:
+            cost: int = max(count, 1)
+            if max_queries is not None and queries + cost > max_queries:
+                break
+            queries += cost
+            rounds += 1
+            address: int = int(self.measure(count)[0])
+            if self.is_marked(address):
+                return SearchOutcome(address, queries, rounds)
+        return SearchOutcome(None, queries, rounds)
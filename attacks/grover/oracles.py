@@ -10,18 +10,30 @@
 # introduce Gauss Siveve
 # The oracle assumes that the list L is stored in a qRAM while the fixed vector
 # p is stored in a separate register. It first copies the qRAM memory register
-# to a separate register, negates it and adds p so it holds p-v. It then
+# to a separate register and subtracts it from p so it holds p-v. It then
 # computes the norms of p, v and p-v and depending on whether the first or the
 # seond oracle is computed performs the appropriate comparisons. Finally, it
 # uncomputes everything
 #
+# Since the two conditions on ||v|| are complementary, the combined oracle
+# computes the three norms once, evaluates the three distinct comparisons and
+# marks the vectors satisfying either (or each) of the two conditions.
+#
 # [1] https://epubs.siam.org/doi/pdf/10.1137/1.9781611973075.119
 r"""
 Implements oracles for Grover's algorithm
 """
+from typing import Optional
 from qiskit import QuantumRegister, AncillaRegister, QuantumCircuit
+from qiskit.circuit import Gate
+from ..arithmetic.adders import AdderStrategy, RIPPLE
 from ..arithmetic.vectors import Norm2
-from ..arithmetic.operations import Compare, SignedAdder
+from ..arithmetic.operations import Compare, SignedSubtractor
+from ..utils.ancillas import AncillaAllocator
+from ..utils.cache import gate_cache
+from ..utils.classical import check_encoding
+from ..utils.layout import RegisterLayout
+from ..utils.profiling import profiled
 
 
 class ReductionOracle:
@@ -43,6 +55,19 @@ class ReductionOracle:
     :param dimension: dimension of lattice
     :param bits: number of bits used to store each vector element in
         sign-magnitude format
+    :param adder: adder backend used by all arithmetic sub-circuits, e.g.
+        :code:`LOOKAHEAD` for minimum depth or :code:`RIPPLE` (the default)
+        for fewer qubits, see :mod:`~attacks.arithmetic.adders`
+    :param encoding: signed integer representation of the vectors,
+        :code:`"sign-magnitude"` (the default) or :code:`"twos-complement"`,
+        in which the differences :math:`p-v` need no sign conversions
+    :param norm_bits: number of qubits of the norms, defaults to the width
+        that fits any vector, see :class:`~attacks.arithmetic.vectors.Norm2`
+        and :func:`~attacks.grover.planning.plan_widths`
+    :param comparator: mode of the norm comparisons, :code:`"difference"`
+        (the default) to compute the full differences or :code:`"carry"` to
+        compute only the comparison bits, see
+        :class:`~attacks.arithmetic.operations.Compare`
 
     References:
     ===========
@@ -55,19 +80,69 @@ class ReductionOracle:
     .. _[1]: https://epubs.siam.org/doi/pdf/10.1137/1.9781611973075.119
     """
 
-    def __init__(self, num_address_qubits: int, dimension: int, bits: int) -> None:
+    def __init__(
+        self,
+        num_address_qubits: int,
+        dimension: int,
+        bits: int,
+        adder: AdderStrategy = RIPPLE,
+        encoding: str = "sign-magnitude",
+        comparator: str = "difference",
+        norm_bits: Optional[int] = None,
+    ) -> None:
+        check_encoding(encoding)
         self.num_address_qubits = num_address_qubits
         self.dimension = dimension
         self.bits = bits
+        self.adder = adder
+        self.encoding = encoding
+        self._arithmetic: dict = {"adder": adder, "encoding": encoding}
+        self._comparison: dict = {"mode": comparator, **self._arithmetic}
+        self._norm: dict = {"norm_bits": norm_bits, **self._arithmetic}
+
+    @property
+    def _subtractor_helpers(self) -> int:
+        r"""
+        Number of helper ancillas of a :class:`SignedSubtractor` besides its
+        carry qubit
+        """
+        return (
+            gate_cache.circuit(
+                SignedSubtractor, self.bits, **self._arithmetic
+            ).num_ancillas
+            - 1
+        )
+
+    def _with_layout(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        r"""
+        Stores the :class:`~attacks.utils.layout.RegisterLayout` of an oracle
+        circuit, in which the vectors :math:`v` and :math:`p` are signed, in
+        its :code:`register_layout` attribute and returns the circuit
+        """
+        encodings: dict[str, str] = {}
+        for i in range(self.dimension):
+            encodings[f"v_{i}"] = encodings[f"p_{i}"] = self.encoding
+        circuit.register_layout = RegisterLayout(circuit, encodings)
+        return circuit
 
-    def _marking_oracle(self, first: bool = True) -> QuantumCircuit:
+    @profiled
+    def _marking_oracle(
+        self, first: bool = True, min_width: bool = False
+    ) -> QuantumCircuit:
         r"""
         Marking oracle for GaussReduce algorithm. If :code:`first` is set to
         :code:`True` it marks all vectors :math:`v` in qRAM such that
         :math:`\|v\| \leq \|p\|` and :math:`\|p-v\| < \|p\|`. Otherwise, it
         marks all vectors :math:`v` in qRAM such that :math:`\|v\| > \|p\|`
         and :math:`\|p-v\| \leq \|p\|`.
+
+        If :code:`min_width` is set to :code:`True` the oracle is built with
+        as few qubits as possible instead (see
+        :meth:`_min_width_marking_oracle`).
         """
+        if min_width:
+            return self._min_width_marking_oracle(first=first)
+
         circuit: QuantumCircuit = QuantumCircuit(name="GaussReduce")
         addr_reg: QuantumRegister = QuantumRegister(
             self.num_address_qubits, name="addr"
@@ -93,7 +168,15 @@ class ReductionOracle:
         for i in range(self.dimension):
             circuit.cx(mem_regs[i], mem_regs_copy[i])
 
-        norm_circ: QuantumCircuit = Norm2(self.dimension, self.bits)
+        norm_circ: QuantumCircuit = gate_cache.circuit(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_gate: Gate = gate_cache.gate(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_inv: Gate = gate_cache.inverse(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
 
         v_norm_anc: AncillaRegister = AncillaRegister(
             norm_circ.num_ancillas, name="anc1"
@@ -119,15 +202,31 @@ class ReductionOracle:
         )
         circuit.add_register(diff_norm_anc, diff_norm)
 
-        comp_p_v: QuantumCircuit = Compare(len(v_norm), cmp=">=" if first else ">")
+        comp_p_v_args: tuple = (len(v_norm), ">=" if first else ">")
+        comp_p_v: QuantumCircuit = gate_cache.circuit(
+            Compare, *comp_p_v_args, **self._comparison
+        )
+        comp_p_v_gate: Gate = gate_cache.gate(
+            Compare, *comp_p_v_args, **self._comparison
+        )
+        comp_p_v_inv: Gate = gate_cache.inverse(
+            Compare, *comp_p_v_args, **self._comparison
+        )
         comp_p_v_anc: AncillaRegister = AncillaRegister(
             comp_p_v.num_ancillas, name="cmp(p,v)_anc"
         )
         comp_p_v_res: AncillaRegister = AncillaRegister(1, name=r"cmp(\|v\|, \|p\|)")
         circuit.add_register(comp_p_v_anc, comp_p_v_res)
 
-        comp_diff_p_v: QuantumCircuit = Compare(
-            len(diff_norm), cmp="<" if first else "<="
+        comp_diff_p_v_args: tuple = (len(diff_norm), "<" if first else "<=")
+        comp_diff_p_v: QuantumCircuit = gate_cache.circuit(
+            Compare, *comp_diff_p_v_args, **self._comparison
+        )
+        comp_diff_p_v_gate: Gate = gate_cache.gate(
+            Compare, *comp_diff_p_v_args, **self._comparison
+        )
+        comp_diff_p_v_inv: Gate = gate_cache.inverse(
+            Compare, *comp_diff_p_v_args, **self._comparison
         )
         comp_diff_p_v_anc: AncillaRegister = AncillaRegister(
             comp_diff_p_v.num_ancillas, name="cmp(p-v, p/v)_anc"
@@ -149,52 +248,54 @@ class ReductionOracle:
         for reg in mem_regs_copy:
             mem_copy_qubits.extend([*reg])
 
-        for reg in mem_regs_copy:
-            circuit.x(reg[-1])
-
-        adder: QuantumCircuit = SignedAdder(self.bits)
+        subtractor: Gate = gate_cache.gate(
+            SignedSubtractor, self.bits, **self._arithmetic
+        )
+        subtractor_inv: Gate = gate_cache.inverse(
+            SignedSubtractor, self.bits, **self._arithmetic
+        )
         couts = [AncillaRegister(1, name=f"cout_{i}") for i in range(self.dimension)]
-        add_helper = AncillaRegister(1, name="add_helper")
+        add_helper = AncillaRegister(self._subtractor_helpers, name="add_helper")
         circuit.add_register(*couts, add_helper)
 
         for i in range(self.dimension):
             circuit.append(
-                adder,
+                subtractor,
                 [
                     *p_value_regs[i],
                     *mem_regs_copy[i],
                     couts[i],
-                    add_helper,
+                    *add_helper,
                 ],
             )
 
-        circuit.append(norm_circ, [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
-        circuit.append(norm_circ, [*p_qubits, *p_norm_anc, *p_norm[:-1]])
+        circuit.append(norm_gate, [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
+        circuit.append(norm_gate, [*p_qubits, *p_norm_anc, *p_norm[:-1]])
 
         # For the first oracle we need p to be unchanged for the second
         # comparison whereas for the second we need v. Since comparison
         # circuit alters the second argument we have to accound for that
         if first:
             circuit.append(
-                comp_p_v,
+                comp_p_v_gate,
                 [*p_norm, *v_norm, *comp_p_v_anc, *comp_p_v_res],
             )
         else:
             circuit.append(
-                comp_p_v,
+                comp_p_v_gate,
                 [*v_norm, *p_norm, *comp_p_v_anc, *comp_p_v_res],
             )
 
-        circuit.append(norm_circ, [*mem_copy_qubits, *diff_norm_anc, *diff_norm[:-1]])
+        circuit.append(norm_gate, [*mem_copy_qubits, *diff_norm_anc, *diff_norm[:-1]])
 
         if first:
             circuit.append(
-                comp_diff_p_v,
+                comp_diff_p_v_gate,
                 [*diff_norm, *p_norm, *comp_diff_p_v_anc, *comp_diff_p_v_res],
             )
         else:
             circuit.append(
-                comp_diff_p_v,
+                comp_diff_p_v_gate,
                 [*diff_norm, *v_norm, *comp_diff_p_v_anc, *comp_diff_p_v_res],
             )
 
@@ -207,62 +308,384 @@ class ReductionOracle:
 
         if first:
             circuit.append(
-                comp_diff_p_v.inverse(),
+                comp_diff_p_v_inv,
                 [*diff_norm, *p_norm, *comp_diff_p_v_anc, *comp_diff_p_v_res],
             )
         else:
             circuit.append(
-                comp_diff_p_v.inverse(),
+                comp_diff_p_v_inv,
                 [*diff_norm, *v_norm, *comp_diff_p_v_anc, *comp_diff_p_v_res],
             )
 
         circuit.append(
-            norm_circ.inverse(),
+            norm_inv,
             [*mem_copy_qubits, *diff_norm_anc, *diff_norm[:-1]],
         )
 
         if first:
             circuit.append(
-                comp_p_v.inverse(),
+                comp_p_v_inv,
                 [*p_norm, *v_norm, *comp_p_v_anc, *comp_p_v_res],
             )
         else:
             circuit.append(
-                comp_p_v.inverse(),
+                comp_p_v_inv,
                 [*v_norm, *p_norm, *comp_p_v_anc, *comp_p_v_res],
             )
 
-        circuit.append(norm_circ.inverse(), [*p_qubits, *p_norm_anc, *p_norm[:-1]])
-        circuit.append(norm_circ.inverse(), [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
+        circuit.append(norm_inv, [*p_qubits, *p_norm_anc, *p_norm[:-1]])
+        circuit.append(norm_inv, [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
 
         for i in range(self.dimension):
             circuit.append(
-                adder.inverse(),
+                subtractor_inv,
                 [
                     *p_value_regs[i],
                     *mem_regs_copy[i],
                     couts[i],
-                    add_helper,
+                    *add_helper,
                 ],
             )
 
-        for reg in mem_regs_copy:
-            circuit.x(reg[-1])
+        for i in range(self.dimension):
+            circuit.cx(mem_regs[i], mem_regs_copy[i])
+
+        return self._with_layout(circuit)
+
+    @profiled
+    def _min_width_marking_oracle(self, first: bool = True) -> QuantumCircuit:
+        r"""
+        Marking oracle for GaussReduce algorithm marking the same vectors as
+        :meth:`_marking_oracle` with fewer qubits. Every norm and comparison
+        is computed on ancillas leased from an
+        :class:`~attacks.utils.ancillas.AncillaAllocator`, its result is
+        copied out and it is uncomputed right away, so the ancillas of the
+        three norms and the two comparisons are shared. The difference
+        :math:`p-v` is computed in place on the register of :math:`v` only
+        while its norm is computed. This doubles the number of norm and
+        comparison circuits.
+        """
+        circuit: QuantumCircuit = QuantumCircuit(name="GaussReduce")
+        addr_reg: QuantumRegister = QuantumRegister(
+            self.num_address_qubits, name="addr"
+        )
+        circuit.add_register(addr_reg)
+
+        mem_regs: list[QuantumRegister] = [
+            QuantumRegister(self.bits, name=f"v_{i}") for i in range(self.dimension)
+        ]
+        circuit.add_register(*mem_regs)
+
+        p_value_regs: list[QuantumRegister] = [
+            QuantumRegister(self.bits, name=f"p_{i}") for i in range(self.dimension)
+        ]
+        circuit.add_register(*p_value_regs)
+
+        mem_qubits = [qubit for reg in mem_regs for qubit in reg]
+        p_qubits = [qubit for reg in p_value_regs for qubit in reg]
+
+        allocator: AncillaAllocator = AncillaAllocator(circuit)
+        norm_circ: QuantumCircuit = gate_cache.circuit(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_gate: Gate = gate_cache.gate(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_inv: Gate = gate_cache.inverse(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_size: int = len(norm_circ.result_register) + 1
+        v_norm, p_norm, diff_norm = (allocator.lease(norm_size) for _ in range(3))
+        comp_results = allocator.lease(2)
+
+        def norm(values: list, result: list) -> None:
+            scratch = allocator.lease(norm_circ.num_qubits - len(values))
+            circuit.append(norm_gate, [*values, *scratch])
+            circuit.cx(scratch[norm_circ.num_ancillas :], result[:-1])
+            circuit.append(norm_inv, [*values, *scratch])
+            allocator.release(scratch)
+
+        def diff_norm_block() -> None:
+            # v is replaced by p-v while the norm is computed
+            subtractor: Gate = gate_cache.gate(
+                SignedSubtractor, self.bits, **self._arithmetic
+            )
+            subtractor_inv: Gate = gate_cache.inverse(
+                SignedSubtractor, self.bits, **self._arithmetic
+            )
+            carries = allocator.lease(
+                self.dimension + self._subtractor_helpers
+            )
+            helper = carries[self.dimension :]
+            for i in range(self.dimension):
+                circuit.append(
+                    subtractor, [*p_value_regs[i], *mem_regs[i], carries[i], *helper]
+                )
+            norm(mem_qubits, diff_norm)
+            for i in range(self.dimension):
+                circuit.append(
+                    subtractor_inv,
+                    [*p_value_regs[i], *mem_regs[i], carries[i], *helper],
+                )
+            allocator.release(carries)
+
+        def compare(first_arg: list, second_arg: list, cmp: str, result) -> None:
+            comp: QuantumCircuit = gate_cache.circuit(
+                Compare, norm_size, cmp, **self._comparison
+            )
+            qubits = [*first_arg, *second_arg, *allocator.lease(comp.num_ancillas + 1)]
+            circuit.append(
+                gate_cache.gate(Compare, norm_size, cmp, **self._comparison), qubits
+            )
+            circuit.cx(qubits[-1], result)
+            circuit.append(
+                gate_cache.inverse(Compare, norm_size, cmp, **self._comparison), qubits
+            )
+            allocator.release(qubits[2 * norm_size :])
+
+        if first:
+            comparisons = [(p_norm, v_norm, ">="), (diff_norm, p_norm, "<")]
+        else:
+            comparisons = [(v_norm, p_norm, ">"), (diff_norm, v_norm, "<=")]
+
+        # every block XORs its result into its target and leaves everything
+        # else unchanged, so applying it again uncomputes the result
+        blocks = [
+            lambda: norm(mem_qubits, v_norm),
+            lambda: norm(p_qubits, p_norm),
+            diff_norm_block,
+            *(
+                lambda args=args, result=result: compare(*args, result)
+                for args, result in zip(comparisons, comp_results)
+            ),
+        ]
+        for block in blocks:
+            block()
+
+        final_res: AncillaRegister = AncillaRegister(1, name="final_result")
+        circuit.add_register(final_res)
+        circuit.mcx(comp_results, final_res)
+
+        # Uncompute
+
+        for block in reversed(blocks):
+            block()
+
+        return self._with_layout(circuit)
+
+    @profiled
+    def _combined_marking_oracle(self, mark: str = "either") -> QuantumCircuit:
+        r"""
+        Marking oracle evaluating both GaussReduce conditions with a single
+        computation of :math:`\|v\|`, :math:`\|p\|` and :math:`\|p-v\|`.
+        Since :math:`\|v\| > \|p\|` is the negation of
+        :math:`\|v\| \leq \|p\|` only three comparisons are needed. Both
+        comparisons against :math:`\|v\|` alter their second argument, so
+        one of them acts on a (CNOT) copy of :math:`\|v\|`.
+
+        :param mark: :code:`"first"` or :code:`"second"` marks the vectors of
+            the corresponding search on the last qubit, :code:`"either"`
+            marks the vectors of both searches on the last qubit and
+            :code:`"both"` marks them on the last two qubits (first and
+            second search respectively)
+        """
+        if mark not in ("first", "second", "either", "both"):
+            raise ValueError(
+                "Parameter `mark` should be one of 'first', 'second', 'either', "
+                "'both'"
+            )
+
+        circuit: QuantumCircuit = QuantumCircuit(name="GaussReduce")
+        addr_reg: QuantumRegister = QuantumRegister(
+            self.num_address_qubits, name="addr"
+        )
+        circuit.add_register(addr_reg)
+
+        mem_regs: list[QuantumRegister] = [
+            QuantumRegister(self.bits, name=f"v_{i}") for i in range(self.dimension)
+        ]
+        circuit.add_register(*mem_regs)
+
+        p_value_regs: list[QuantumRegister] = [
+            QuantumRegister(self.bits, name=f"p_{i}") for i in range(self.dimension)
+        ]
+        circuit.add_register(*p_value_regs)
+
+        mem_regs_copy: list[AncillaRegister] = [
+            AncillaRegister(self.bits, name=f"v_{i}_copy")
+            for i in range(self.dimension)
+        ]
+        circuit.add_register(*mem_regs_copy)
+
+        norm_circ: QuantumCircuit = gate_cache.circuit(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_gate: Gate = gate_cache.gate(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_inv: Gate = gate_cache.inverse(
+            Norm2, self.dimension, self.bits, **self._norm
+        )
+        norm_size: int = len(norm_circ.result_register) + 1
+
+        norm_regs: dict[str, tuple[AncillaRegister, AncillaRegister]] = {}
+        for i, norm_name in enumerate((r"\|v\|", r"\|p\|", r"\|p-v\|")):
+            norm_anc: AncillaRegister = AncillaRegister(
+                norm_circ.num_ancillas, name=f"anc{i + 1}"
+            )
+            norm: AncillaRegister = AncillaRegister(norm_size, name=norm_name)
+            circuit.add_register(norm_anc, norm)
+            norm_regs[norm_name] = (norm_anc, norm)
+
+        v_norm_anc, v_norm = norm_regs[r"\|v\|"]
+        p_norm_anc, p_norm = norm_regs[r"\|p\|"]
+        diff_norm_anc, diff_norm = norm_regs[r"\|p-v\|"]
+        # the difference comparator overwrites its second argument, so the
+        # first comparison gets a copy of ||v||; the carry comparator does not
+        copy_v_norm: bool = self._comparison["mode"] == "difference"
+        v_norm_copy: AncillaRegister = v_norm
+        if copy_v_norm:
+            v_norm_copy = AncillaRegister(norm_size, name=r"\|v\|_copy")
+            circuit.add_register(v_norm_copy)
+
+        couts = [AncillaRegister(1, name=f"cout_{i}") for i in range(self.dimension)]
+        add_helper = AncillaRegister(self._subtractor_helpers, name="add_helper")
+        circuit.add_register(*couts, add_helper)
+
+        # (first argument, second argument, comparison) for the predicates
+        # ||v|| <= ||p||, ||p-v|| < ||p|| and ||p-v|| <= ||v||
+        predicates: list[tuple[AncillaRegister, AncillaRegister, str]] = [
+            (p_norm, v_norm_copy, ">="),
+            (diff_norm, p_norm, "<"),
+            (diff_norm, v_norm, "<="),
+        ]
+        comparisons: list[tuple[list, Gate, Gate]] = []
+        results: list[AncillaRegister] = []
+        for i, (first_arg, second_arg, cmp) in enumerate(predicates):
+            comp: QuantumCircuit = gate_cache.circuit(
+                Compare, norm_size, cmp, **self._comparison
+            )
+            comp_anc: AncillaRegister = AncillaRegister(
+                comp.num_ancillas, name=f"cmp_{i}_anc"
+            )
+            comp_res: AncillaRegister = AncillaRegister(1, name=f"cmp_{i}")
+            circuit.add_register(comp_anc, comp_res)
+            comparisons.append(
+                (
+                    [*first_arg, *second_arg, *comp_anc, *comp_res],
+                    gate_cache.gate(Compare, norm_size, cmp, **self._comparison),
+                    gate_cache.inverse(Compare, norm_size, cmp, **self._comparison),
+                )
+            )
+            results.append(comp_res)
+
+        if mark == "both":
+            final_res: list[AncillaRegister] = [
+                AncillaRegister(1, name="first_result"),
+                AncillaRegister(1, name="second_result"),
+            ]
+            circuit.add_register(*final_res)
+        else:
+            final_reg: AncillaRegister = AncillaRegister(1, name="final_result")
+            circuit.add_register(final_reg)
+            final_res = [final_reg, final_reg]
+
+        mem_qubits = [qubit for reg in mem_regs for qubit in reg]
+        p_qubits = [qubit for reg in p_value_regs for qubit in reg]
+        mem_copy_qubits = [qubit for reg in mem_regs_copy for qubit in reg]
 
+        subtractor: Gate = gate_cache.gate(
+            SignedSubtractor, self.bits, **self._arithmetic
+        )
+        subtractor_inv: Gate = gate_cache.inverse(
+            SignedSubtractor, self.bits, **self._arithmetic
+        )
+
+        # compute p-v and the three norms
         for i in range(self.dimension):
             circuit.cx(mem_regs[i], mem_regs_copy[i])
+        for i in range(self.dimension):
+            circuit.append(
+                subtractor,
+                [*p_value_regs[i], *mem_regs_copy[i], couts[i], *add_helper],
+            )
 
-        return circuit
+        circuit.append(norm_gate, [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
+        circuit.append(norm_gate, [*p_qubits, *p_norm_anc, *p_norm[:-1]])
+        circuit.append(norm_gate, [*mem_copy_qubits, *diff_norm_anc, *diff_norm[:-1]])
+        if copy_v_norm:
+            circuit.cx(v_norm, v_norm_copy)
+
+        for qubits, comp_gate, _ in comparisons:
+            circuit.append(comp_gate, qubits)
+
+        v_smaller, diff_smaller_p, diff_smaller_v = results
+        if mark in ("first", "either", "both"):
+            circuit.mcx([v_smaller, diff_smaller_p], final_res[0])
+        if mark in ("second", "either", "both"):
+            circuit.x(v_smaller)
+            circuit.mcx([v_smaller, diff_smaller_v], final_res[1])
+            circuit.x(v_smaller)
+
+        # Uncompute
+
+        for qubits, _, comp_inv in reversed(comparisons):
+            circuit.append(comp_inv, qubits)
+
+        if copy_v_norm:
+            circuit.cx(v_norm, v_norm_copy)
+        circuit.append(norm_inv, [*mem_copy_qubits, *diff_norm_anc, *diff_norm[:-1]])
+        circuit.append(norm_inv, [*p_qubits, *p_norm_anc, *p_norm[:-1]])
+        circuit.append(norm_inv, [*mem_qubits, *v_norm_anc, *v_norm[:-1]])
+
+        for i in range(self.dimension):
+            circuit.append(
+                subtractor_inv,
+                [*p_value_regs[i], *mem_regs_copy[i], couts[i], *add_helper],
+            )
+        for i in range(self.dimension):
+            circuit.cx(mem_regs[i], mem_regs_copy[i])
+
+        return self._with_layout(circuit)
+
+    @profiled
+    def combined_phase_oracle(self, mark: str = "either") -> QuantumCircuit:
+        r"""
+        Phase oracle corresponding to the combined marking oracle, which
+        computes the norms only once for both GaussReduce conditions. The
+        oracle marks the vectors of the first search if :code:`mark` is
+        :code:`"first"`, of the second search if it is :code:`"second"` and
+        of either search if it is :code:`"either"`.
+        """
+        if mark == "both":
+            raise ValueError("A phase oracle can only use a single marking qubit")
+
+        marking_oracle: QuantumCircuit = self._combined_marking_oracle(mark=mark)
+        circuit: QuantumCircuit = QuantumCircuit(*marking_oracle.qregs)
+        circuit.x(circuit.qubits[-1])
+        circuit.h(circuit.qubits[-1])
+        circuit.append(marking_oracle, circuit.qubits)
+        circuit.h(circuit.qubits[-1])
+        circuit.x(circuit.qubits[-1])
+
+        return self._with_layout(circuit)
 
-    def phase_oracle(self, first: bool = True) -> QuantumCircuit:
+    @profiled
+    def phase_oracle(
+        self, first: bool = True, min_width: bool = False
+    ) -> QuantumCircuit:
         r"""
         Phase oracle corresponding to the marking oracle for GaussReduce
         algorithm. If :code:`first` is set to :code:`True` the marking orcale
         marks all vectors :math:`v` in qRAM such that  :math:`\|v\| \leq \|p\|`
         and :math:`\|p-v\| < \|p\|`. Otherwise, it marks all vectors :math:`v`
         in qRAM such that :math:`\|v\| > \|p\|` and :math:`\|p-v\| \leq \|v\|`.
+        If :code:`min_width` is set to :code:`True` the marking oracle is built
+        with as few qubits as possible.
         """
-        marking_oracle: QuantumCircuit = self._marking_oracle(first=first)
+        marking_oracle: QuantumCircuit = self._marking_oracle(
+            first=first, min_width=min_width
+        )
         circuit: QuantumCircuit = QuantumCircuit(*marking_oracle.qregs)
         circuit.x(circuit.qubits[-1])
         circuit.h(circuit.qubits[-1])
@@ -270,4 +693,4 @@ class ReductionOracle:
         circuit.h(circuit.qubits[-1])
         circuit.x(circuit.qubits[-1])
 
-        return circuit
+        return self._with_layout(circuit)
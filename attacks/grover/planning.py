@@ -0,0 +1,134 @@
+# Bit-width planning:
+# The widths of the registers of the oracles only depend on the largest values
+# they have to hold, so for a given list L and vector p they can be read off
+# the data instead of being passed by hand:
+#    * components: every component x of L and p needs |x| < 2^(bits-1), in
+#      both signed integer representations
+#    * differences: p-v is computed in place on the (copied) register of v, so
+#      the components of p-v need the same bound, and the component register
+#      is as wide as the larger of the two
+#    * norms: Norm2 only needs enough qubits for the largest of the squared
+#      norms of v, p and p-v, instead of the 2(bits-1)+dimension qubits that
+#      fit any vector. Comparisons add one sign qubit on top of that.
+r"""
+Infers the minimal register widths of the GaussReduce oracles from the data
+"""
+from dataclasses import dataclass
+import numpy as np
+from ..memory.qram import qRAM
+from .oracles import ReductionOracle
+
+
+def signed_bits(values) -> int:
+    r"""
+    Returns the smallest number of bits :math:`b` such that every value
+    satisfies :math:`|v| < 2^{b-1}`, the range of the signed integer
+    representations of :func:`~attacks.utils.classical.to_bit_patterns`. At
+    least one sign and one magnitude bit are used.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    largest: int = int(np.max(np.abs(values), initial=0))
+    return max(largest.bit_length(), 1) + 1
+
+
+def unsigned_bits(values) -> int:
+    r"""
+    Returns the smallest (positive) number of bits needed to store every one
+    of the given non-negative integers
+    """
+    values = np.asarray(values, dtype=np.int64)
+    return max(int(np.max(values, initial=0)).bit_length(), 1)
+
+
+@dataclass(frozen=True)
+class WidthPlan:
+    r"""
+    Register widths of the qRAM and the oracles for a list :math:`L` and a
+    vector :math:`p`, as computed by :func:`plan_widths`
+
+    :param num_vectors: number of vectors in :math:`L`
+    :param dimension: dimension of the vectors
+    :param component_bits: bits needed by the components of :math:`L` and
+        :math:`p`
+    :param difference_bits: bits needed by the components of :math:`p-v`
+    :param norm_bits: bits needed by the largest squared norm of :math:`v`,
+        :math:`p` and :math:`p-v`
+    """
+
+    num_vectors: int
+    dimension: int
+    component_bits: int
+    difference_bits: int
+    norm_bits: int
+
+    @property
+    def bits(self) -> int:
+        r"""
+        Width of the vector component registers, which hold both the
+        components and the differences
+        """
+        return max(self.component_bits, self.difference_bits)
+
+    @property
+    def num_address_qubits(self) -> int:
+        r"""
+        Number of address qubits of the qRAM storing :math:`L`
+        """
+        return 1 if self.num_vectors <= 1 else (self.num_vectors - 1).bit_length()
+
+    def qram(self, vectors, **kwargs) -> qRAM:
+        r"""
+        Returns the qRAM storing the given list at the planned width. The
+        keyword arguments are passed to :class:`~attacks.memory.qram.qRAM`.
+        """
+        values: list[list[int]] = np.asarray(vectors, dtype=np.int64).tolist()
+        return qRAM(values, self.bits, **kwargs)
+
+    def oracle(self, comparator: str = "carry", **kwargs) -> ReductionOracle:
+        r"""
+        Returns the GaussReduce oracles at the planned widths, comparing the
+        norms with the carry-only comparator unless :code:`comparator` is
+        given. The keyword arguments are passed to
+        :class:`~attacks.grover.oracles.ReductionOracle`.
+        """
+        return ReductionOracle(
+            self.num_address_qubits,
+            self.dimension,
+            self.bits,
+            comparator=comparator,
+            norm_bits=self.norm_bits,
+            **kwargs,
+        )
+
+
+def plan_widths(vectors, p) -> WidthPlan:
+    r"""
+    Computes the tightest register widths of the qRAM storing the list
+    :math:`L` and of the GaussReduce oracles for the vector :math:`p`
+
+    :param vectors: the list :math:`L` (or a lattice basis), one vector per
+        row
+    :param p: the vector :math:`p`
+    """
+    vectors = np.array(vectors, dtype=np.int64, ndmin=2)
+    p = np.asarray(p, dtype=np.int64)
+    if vectors.shape[0] == 0:
+        raise ValueError("The list should contain at least one vector")
+    if p.shape != vectors.shape[1:]:
+        raise ValueError("The vector p should have the dimension of the list")
+
+    differences: np.ndarray = p - vectors
+    norms: np.ndarray = np.concatenate(
+        [
+            np.sum(vectors**2, axis=1),
+            [np.sum(p**2)],
+            np.sum(differences**2, axis=1),
+        ]
+    )
+    return WidthPlan(
+        num_vectors=vectors.shape[0],
+        dimension=vectors.shape[1],
+        component_bits=signed_bits(np.append(vectors, p)),
+        difference_bits=signed_bits(differences),
+        norm_bits=unsigned_bits(norms),
+    )
@@ -0,0 +1,185 @@
+# GroverGaussReduce assembles one GaussReduce search as an AmplificationProblem:
+#    * state_preparation: Hadamard gates on the address register, the qRAM
+#      loading L into the memory registers (its unary iteration ancillas, if
+#      any, are borrowed from the clean ancillas of the oracle) and the encoding
+#      of p
+#    * oracle: the phase oracle of ReductionOracle
+#    * objective qubits: the address, memory and p registers, so a measurement
+#      yields i, L[i] and p
+#
+# is_good_state decodes the measured bitstrings in batch with the register
+# layout of the oracle (see attacks/utils/layout.py) and computes the norms with
+# NumPy, so whole count dictionaries are checked at once instead of parsing
+# every bitstring in Python.
+r"""
+Driver assembling the GaussReduce searches as amplitude amplification problems
+"""
+from typing import Optional
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.algorithms import AmplificationProblem
+from ..memory.qram import qRAM
+from ..utils.quantum import encode_vector
+from .oracles import ReductionOracle
+from .planning import plan_widths
+
+
+class GroverGaussReduce:
+    r"""
+    Builds the :code:`AmplificationProblem` of one of the two GaussReduce
+    searches (see :class:`~attacks.grover.oracles.ReductionOracle`) for the
+    list :math:`L` and the vector :math:`p`, ready to be passed to Qiskit's
+    :code:`Grover`.
+
+    :param vectors: the list :math:`L`, one vector per row
+    :param p: the vector :math:`p`
+    :param bits: number of bits used to store each vector component, defaults
+        to the widths inferred by :func:`~attacks.grover.planning.plan_widths`
+    :param first: whether to search for the vectors of the first
+        (:math:`\|v\| \leq \|p\|` and :math:`\|p-v\| < \|p\|`) or the second
+        (:math:`\|v\| > \|p\|` and :math:`\|p-v\| \leq \|v\|`) search
+    :param min_width: whether to build the oracle with as few qubits as
+        possible
+    :param qram_mode: construction mode of the qRAM, see
+        :class:`~attacks.memory.qram.qRAM`
+    :param comparator: mode of the norm comparisons of the oracle, see
+        :class:`~attacks.grover.oracles.ReductionOracle`
+    :param kwargs: passed to :class:`~attacks.grover.oracles.ReductionOracle`
+        (e.g. :code:`adder` or :code:`encoding`)
+    """
+
+    def __init__(
+        self,
+        vectors,
+        p,
+        bits: Optional[int] = None,
+        first: bool = True,
+        min_width: bool = False,
+        qram_mode: str = "mcx",
+        comparator: str = "carry",
+        **kwargs,
+    ) -> None:
+        self.vectors: np.ndarray = np.array(vectors, dtype=np.int64, ndmin=2)
+        self.p: np.ndarray = np.asarray(p, dtype=np.int64)
+        plan = plan_widths(self.vectors, self.p)
+        if bits is None:
+            reduction: ReductionOracle = plan.oracle(comparator, **kwargs)
+        elif bits < plan.bits:
+            raise ValueError(
+                f"{bits} bits are not enough bits to encode the vectors and "
+                "their differences"
+            )
+        else:
+            reduction = ReductionOracle(
+                plan.num_address_qubits,
+                plan.dimension,
+                bits,
+                comparator=comparator,
+                **kwargs,
+            )
+        self.bits: int = reduction.bits
+        self.dimension: int = reduction.dimension
+        self.encoding: str = reduction.encoding
+        self.first: bool = first
+
+        self.oracle: QuantumCircuit = reduction.phase_oracle(
+            first=first, min_width=min_width
+        )
+        registers: dict[str, QuantumRegister] = {
+            reg.name: reg for reg in self.oracle.qregs
+        }
+        self.address_register: QuantumRegister = registers["addr"]
+        self.memory_register: list[QuantumRegister] = [
+            registers[f"v_{i}"] for i in range(self.dimension)
+        ]
+        self.p_register: list[QuantumRegister] = [
+            registers[f"p_{i}"] for i in range(self.dimension)
+        ]
+        memory_qubits: list = [qubit for reg in self.memory_register for qubit in reg]
+        p_qubits: list = [qubit for reg in self.p_register for qubit in reg]
+        self.objective_qubits: list[int] = [
+            self.oracle.find_bit(qubit).index
+            for qubit in [*self.address_register, *memory_qubits, *p_qubits]
+        ]
+
+        self.state_preparation: QuantumCircuit = QuantumCircuit(
+            *self.oracle.qregs, name="StatePreparation"
+        )
+        qram: qRAM = qRAM(
+            self.vectors.tolist(), self.bits, mode=qram_mode, encoding=self.encoding
+        )
+        self.state_preparation.h(self.address_register)
+        self.state_preparation.append(
+            qram,
+            [
+                *self.address_register,
+                *memory_qubits,
+                *self.state_preparation.ancillas[: qram.num_ancillas],
+            ],
+        )
+        self.state_preparation.append(
+            encode_vector(self.p.tolist(), self.bits, self.encoding), p_qubits
+        )
+
+    @property
+    def problem(self) -> AmplificationProblem:
+        r"""
+        The amplification problem of the search
+        """
+        return AmplificationProblem(
+            self.oracle,
+            state_preparation=self.state_preparation,
+            post_processing=self.post_processing,
+            objective_qubits=self.objective_qubits,
+            is_good_state=self.is_good_state,
+        )
+
+    def decode(self, bitstrings) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r"""
+        Decodes measured bitstrings of the objective qubits (in Qiskit's
+        order, the first objective qubit is the last character) and returns
+        the addresses, the vectors :math:`v` and the vectors :math:`p` as
+        arrays with one row per bitstring
+        """
+        memory: list[str] = [f"v_{i}" for i in range(self.dimension)]
+        p_names: list[str] = [f"p_{i}" for i in range(self.dimension)]
+        values: dict[str, np.ndarray] = self.oracle.register_layout.decode(
+            bitstrings, self.objective_qubits, ["addr", *memory, *p_names]
+        )
+        return (
+            values["addr"].astype(np.int64),
+            np.column_stack([values[name] for name in memory]),
+            np.column_stack([values[name] for name in p_names]),
+        )
+
+    def good_states(self, bitstrings) -> np.ndarray:
+        r"""
+        Returns a boolean array marking which of the measured bitstrings
+        satisfy the condition of the search
+        """
+        _, vectors, p = self.decode(bitstrings)
+        v_norm: np.ndarray = np.sum(vectors**2, axis=1)
+        p_norm: np.ndarray = np.sum(p**2, axis=1)
+        diff_norm: np.ndarray = np.sum((p - vectors) ** 2, axis=1)
+        if self.first:
+            return (v_norm <= p_norm) & (diff_norm < p_norm)
+        return (v_norm > p_norm) & (diff_norm <= v_norm)
+
+    def check_counts(self, counts: dict[str, int]) -> dict[str, bool]:
+        r"""
+        Checks all the bitstrings of a count dictionary at once
+        """
+        bitstrings: list[str] = list(counts)
+        return dict(zip(bitstrings, self.good_states(bitstrings).tolist()))
+
+    def is_good_state(self, bitstring: str) -> bool:
+        r"""
+        Checks if a measured bitstring satisfies the condition of the search
+        """
+        return bool(self.good_states([bitstring])[0])
+
+    def post_processing(self, bitstring: str) -> list[int]:
+        r"""
+        Returns the vector :math:`v` of a measured bitstring
+        """
+        return self.decode([bitstring])[1][0].tolist()
@@ -1,10 +1,158 @@
+# qRAM construction modes:
+#  * "mcx": for every list element the address is compared with its index by
+#    conjugating the address qubits with X gates and the element is loaded with
+#    a gate encoding it, controlled on all address qubits. Every set bit of the
+#    list becomes its own multi-controlled X gate.
+#  * "unary": unary iteration [1]. The address is decoded by walking the binary
+#    tree of the address bits, keeping the AND of the address bits seen so far
+#    in one ancilla per level. Moving from a left child to its sibling costs a
+#    single CNOT and every internal node costs two Toffoli gates in total, so
+#    the whole tree costs about 2|L| Toffoli gates. At every leaf the element
+#    is loaded with CNOTs fanning out from the single flag qubit of the leaf.
+#    Subtrees without list elements are skipped.
+#
+# In "mcx" mode the elements are loaded independently of each other, so the
+# circuit is built in segments of consecutive addresses, which an executor can
+# build (and synthesize the controlled gates of) in parallel processes. The
+# segments are appended in address order, so the circuit is identical to the
+# serial one.
+#
+# BucketqRAM only loads the vectors of L colliding with a vector p in one of
+# the tables of a HashSieve bucket index (the candidates), at consecutive
+# addresses, so the Grover search over them only needs ceil(log2(#candidates))
+# address qubits.
+#
+# MutableqRAM keeps the "mcx" layout but builds one gate (segment) per address
+# that loads the element stored there. Segments act on disjoint sets of
+# address states, so they commute and list updates only patch single entries
+# of the circuit data: replacing an element swaps its segment, appending adds
+# one and deleting moves the last element to the freed address. Only when the
+# number of address qubits changes are all segments rebuilt: the register grows
+# when |L| exceeds 2^k and shrinks only once |L| <= 2^(k-2), so at least
+# |L|/2 updates separate two rebuilds (even when appends and deletes alternate
+# around a power of two) and an update costs amortized O(dimension x bits).
+#
+# [1] https://arxiv.org/abs/1805.03662
 r"""
 Implements methods needed for quantum memory
 """
+from concurrent.futures import Executor
+from itertools import repeat
 from math import ceil, log2
-from qiskit import QuantumCircuit, QuantumRegister
-from qiskit.circuit import ControlledGate
+from typing import Optional
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister, AncillaRegister
+from qiskit.circuit import CircuitInstruction, ControlledGate, Gate, Qubit
+from ..utils.classical import check_encoding, to_bit_patterns
+from ..utils.layout import RegisterLayout
+from ..utils.profiling import call, profiled
 from ..utils.quantum import encode_vector
+from ..utils.resources import toffoli_cost
+
+# number of list elements per task of a parallel "mcx" qRAM construction
+PARALLEL_CHUNK_SIZE: int = 64
+
+
+def _num_address_qubits(n_values: int) -> int:
+    r"""
+    Returns the number of address qubits used for a list of
+    :code:`n_values` elements
+    """
+    return 1 if n_values <= 1 else ceil(log2(n_values))
+
+
+def load_element(
+    value: list[int],
+    bits: int,
+    address: int,
+    num_addr_qubits: int,
+    encoding: str = "sign-magnitude",
+) -> Gate:
+    r"""
+    Returns a gate acting on an address register followed by the memory
+    registers that loads :code:`value` to the memory registers if the address
+    register holds :code:`address`. Every set bit of the encoded value is
+    loaded with its own :math:`X` gate controlled on the address register.
+
+    :param value: vector to load
+    :param bits: number of bits used to store each element
+    :param address: address of the element
+    :param num_addr_qubits: number of address qubits
+    :param encoding: signed integer representation, :code:`"sign-magnitude"`
+        or :code:`"twos-complement"`
+    """
+    addr_reg: QuantumRegister = QuantumRegister(num_addr_qubits, name="addr")
+    value_regs: list[QuantumRegister] = [
+        QuantumRegister(bits, name=f"v_{i}") for i in range(len(value))
+    ]
+    circuit: QuantumCircuit = QuantumCircuit(
+        addr_reg, *value_regs, name=f"load_{address}"
+    )
+
+    targets: list[Qubit] = [
+        reg[j]
+        for reg, pattern in zip(
+            value_regs, to_bit_patterns(value, bits, encoding)
+        )
+        for j in range(bits)
+        if (int(pattern) >> j) & 1
+    ]
+    x_gates: list[Qubit] = [
+        addr_reg[j] for j in range(num_addr_qubits) if not (address >> j) & 1
+    ]
+    if targets and x_gates:
+        circuit.x(x_gates)
+    for target in targets:
+        circuit.mcx(addr_reg, target)
+    if targets and x_gates:
+        circuit.x(x_gates)
+
+    return circuit.to_gate(label=f"load[{address}]")
+
+
+def _mcx_segment(
+    values: list[list[int]],
+    start: int,
+    bits: int,
+    num_addr_qubits: int,
+    encoding: str,
+) -> tuple[QuantumCircuit, int]:
+    r"""
+    Returns the part of an :code:`"mcx"` qRAM loading the elements
+    :code:`values`, stored from the address :code:`start` on, together with
+    its number of Toffoli gates
+    """
+    addr_reg: QuantumRegister = QuantumRegister(num_addr_qubits, name="addr")
+    circuit: QuantumCircuit = QuantumCircuit(
+        addr_reg,
+        *[QuantumRegister(bits, name=f"v_{i}") for i in range(len(values[0]))],
+    )
+    toffolis: int = 0
+    for i, value in enumerate(values, start):
+        x_gates: list[QuantumRegister] = []
+        for j, bit in enumerate(bin(i)[2:].zfill(num_addr_qubits)[::-1]):
+            if bit == "0":
+                x_gates.append(addr_reg[j])
+        if x_gates:
+            circuit.x(x_gates)
+
+        controlled_encode: ControlledGate = call(
+            "control(encode_vector)",
+            encode_vector(value, bits, encoding).control,
+            num_addr_qubits,
+        )
+        circuit.append(controlled_encode, circuit.qubits)
+
+        if x_gates:
+            circuit.x(x_gates)
+
+        set_bits: int = sum(
+            bin(int(pattern)).count("1")
+            for pattern in to_bit_patterns(value, bits, encoding)
+        )
+        toffolis += set_bits * toffoli_cost(num_addr_qubits)
+
+    return circuit, toffolis
 
 
 class qRAM(QuantumCircuit):
@@ -15,20 +163,42 @@ class qRAM(QuantumCircuit):
     address memory to the corresponding list element.
 
     :param values: list of integers
-    :param bits: number of bits used to store each element in sign-magnitude
-        format
+    :param bits: number of bits used to store each element
+    :param mode: construction mode, either :code:`"mcx"` (one
+        multi-controlled :math:`X` gate per set bit of the list) or
+        :code:`"unary"` (unary iteration over the address, which needs
+        :code:`num_addr_qubits-1` ancillas but only about :math:`2|L|`
+        Toffoli gates)
+    :param encoding: signed integer representation, :code:`"sign-magnitude"`
+        or :code:`"twos-complement"`
+    :param executor: executor (e.g. a :code:`ProcessPoolExecutor`) building
+        the :code:`"mcx"` circuit in segments of :code:`PARALLEL_CHUNK_SIZE`
+        elements in parallel. The circuit does not depend on it.
+
+    The number of Toffoli gates of the circuit (counted as in
+    :mod:`attacks.utils.resources`) is stored in :code:`toffoli_count`.
     """
 
+    @profiled
     def __init__(
-        self, values: list[list[int]], bits: int, name: str = "qRAM"
+        self,
+        values: list[list[int]],
+        bits: int,
+        name: str = "qRAM",
+        mode: str = "mcx",
+        encoding: str = "sign-magnitude",
+        executor: Optional[Executor] = None,
     ) -> None:
         super().__init__(name=name)
+        check_encoding(encoding)
         if not values:
             raise IndexError("No values to store in qRAM")
+        if mode not in ("mcx", "unary"):
+            raise ValueError("Parameter `mode` should be one of 'mcx', 'unary'")
 
         dimension: int = len(values[0])
         n_values: int = len(values)
-        num_addr_qubits: int = 1 if n_values == 1 else ceil(log2(n_values))
+        num_addr_qubits: int = _num_address_qubits(n_values)
 
         addr_reg: QuantumRegister = QuantumRegister(
             num_addr_qubits, name="addr"
@@ -40,23 +210,345 @@ class qRAM(QuantumCircuit):
         ]
         self.add_register(*value_regs)
 
+        if mode == "unary" and num_addr_qubits > 1:
+            self.add_register(
+                AncillaRegister(num_addr_qubits - 1, name="unary")
+            )
+
         circuit: QuantumCircuit = QuantumCircuit(*self.qregs)
-        for i in range(n_values):
-            x_gates: list[QuantumRegister] = []
-            for j, bit in enumerate(bin(i)[2:].zfill(num_addr_qubits)[::-1]):
-                if bit == "0":
-                    x_gates.append(addr_reg[j])
-            if x_gates:
-                circuit.x(x_gates)
-
-            controlled_encode: ControlledGate = encode_vector(
-                values[i], bits
-            ).control(num_addr_qubits)
-            circuit.append(controlled_encode, circuit.qubits)
-
-            if x_gates:
-                circuit.x(x_gates)
+        if mode == "unary":
+            self.toffoli_count: int = self._unary_iteration(
+                circuit, values, bits, encoding
+            )
+        else:
+            # the segments only depend on their elements and start address
+            starts: range = range(0, n_values, PARALLEL_CHUNK_SIZE)
+            chunks: list[list[list[int]]] = [
+                values[start : start + PARALLEL_CHUNK_SIZE] for start in starts
+            ]
+            segments = (map if executor is None else executor.map)(
+                _mcx_segment,
+                chunks,
+                starts,
+                repeat(bits),
+                repeat(num_addr_qubits),
+                repeat(encoding),
+            )
+            self.toffoli_count = 0
+            for segment, toffolis in segments:
+                circuit.compose(segment, circuit.qubits, inplace=True)
+                self.toffoli_count += toffolis
 
         self.append(circuit.to_gate(label=name), self.qubits)
         self.address_register: QuantumRegister = addr_reg
         self.memory_register: QuantumRegister = value_regs
+        self.register_layout: RegisterLayout = RegisterLayout(
+            self, {reg.name: encoding for reg in value_regs}
+        )
+
+    def _unary_iteration(
+        self,
+        circuit: QuantumCircuit,
+        values: list[list[int]],
+        bits: int,
+        encoding: str = "sign-magnitude",
+    ) -> int:
+        r"""
+        Appends the unary iteration loading :code:`values` to
+        :code:`circuit` and returns the number of Toffoli gates used
+        """
+        addr_reg: QuantumRegister = circuit.qregs[0]
+        value_qubits: list[Qubit] = [
+            qubit for reg in circuit.qregs[1 : len(values[0]) + 1] for qubit in reg
+        ]
+        anc: list[Qubit] = circuit.qregs[-1] if len(addr_reg) > 1 else []
+        patterns: list[int] = [
+            sum(
+                int(pattern) << (i * bits)
+                for i, pattern in enumerate(to_bit_patterns(value, bits, encoding))
+            )
+            for value in values
+        ]
+        toffolis: int = 0
+
+        def load(flag: Qubit, index: int) -> None:
+            targets = [
+                qubit for j, qubit in enumerate(value_qubits)
+                if (patterns[index] >> j) & 1
+            ]
+            if targets:
+                circuit.cx(flag, targets)
+
+        def visit(flag: Qubit, level: int, start: int) -> None:
+            # `flag` is set iff the address bits above `level` match `start`
+            nonlocal toffolis
+            if level < 0:
+                load(flag, start)
+                return
+
+            address_bit, target = addr_reg[level], anc[level]
+            circuit.x(address_bit)
+            circuit.ccx(flag, address_bit, target)
+            circuit.x(address_bit)
+            visit(target, level - 1, start)
+
+            if start + (1 << level) < len(values):
+                # flip from the left to the right child with a single CNOT
+                circuit.cx(flag, target)
+                visit(target, level - 1, start + (1 << level))
+                circuit.ccx(flag, address_bit, target)
+            else:
+                circuit.x(address_bit)
+                circuit.ccx(flag, address_bit, target)
+                circuit.x(address_bit)
+            toffolis += 2
+
+        top: int = len(addr_reg) - 1
+        circuit.x(addr_reg[top])
+        visit(addr_reg[top], top - 1, 0)
+        circuit.x(addr_reg[top])
+        if 1 << top < len(values):
+            visit(addr_reg[top], top - 1, 1 << top)
+
+        return toffolis
+
+
+class BucketqRAM(qRAM):
+    r"""
+    qRAM storing only the vectors of the list :math:`L` at the given
+    positions, e.g. the ones colliding with :math:`p` in a bucket index (see
+    :meth:`from_tables`), so its address register is sized to the number of
+    candidates instead of :math:`|L|`. Address :math:`i` holds
+    :code:`vectors[indices[i]]`.
+
+    :param vectors: the list :math:`L`, one vector per row
+    :param indices: the positions in :math:`L` of the vectors to store
+    :param bits: number of bits used to store each element
+
+    The remaining keyword arguments are passed to :class:`qRAM`.
+    """
+
+    def __init__(
+        self,
+        vectors,
+        indices,
+        bits: int,
+        name: str = "BucketqRAM",
+        **kwargs,
+    ) -> None:
+        self.indices: np.ndarray = np.asarray(indices, dtype=np.int64)
+        if not len(self.indices):
+            raise IndexError("No vectors of the list collide with p")
+
+        values: list[list[int]] = np.asarray(vectors, dtype=np.int64)[
+            self.indices
+        ].tolist()
+        super().__init__(values, bits, name=name, **kwargs)
+
+    @classmethod
+    def from_tables(
+        cls, vectors, tables, p, bits: int, antipodal: bool = False, **kwargs
+    ) -> "BucketqRAM":
+        r"""
+        Returns the qRAM storing the vectors of :code:`vectors` colliding
+        with :code:`p` in a bucket index, any object whose
+        :code:`collisions(p, antipodal)` returns their positions without
+        side effects, e.g. the :code:`tables` of a
+        :class:`~attacks.sieve.hashing.HashSieve`. With :code:`antipodal`
+        set to :code:`True` the buckets of :math:`-p` are included, as in a
+        symmetric sieve.
+        """
+        return cls(vectors, tables.collisions(p, antipodal), bits, **kwargs)
+
+    def list_indices(self, addresses) -> np.ndarray:
+        r"""
+        Maps measured addresses to the positions of their vectors in
+        :math:`L`. Addresses beyond the candidates hold the zero vector and
+        are mapped to :code:`-1`.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        positions: np.ndarray = np.append(self.indices, -1)
+        return positions[np.minimum(addresses, len(self.indices))]
+
+
+class MutableqRAM:
+    r"""
+    qRAM that can be updated without rebuilding its circuit. It stores one
+    segment (see :func:`load_element`) per address in :code:`circuit`, so
+    appending, replacing and deleting elements only emits or patches the
+    affected segments. The address register grows (and all segments are
+    rebuilt) only when the number of elements crosses a power of two.
+
+    :code:`circuit`, :code:`address_register` and :code:`memory_register`
+    have the same layout as in :class:`qRAM` and are replaced whenever the
+    address register changes size.
+
+    :param values: initial list of vectors
+    :param bits: number of bits used to store each element
+    :param dimension: dimension of the vectors, only needed if
+        :code:`values` is empty
+    :param encoding: signed integer representation, :code:`"sign-magnitude"`
+        or :code:`"twos-complement"`
+    """
+
+    def __init__(
+        self,
+        values: list[list[int]],
+        bits: int,
+        dimension: Optional[int] = None,
+        name: str = "qRAM",
+        encoding: str = "sign-magnitude",
+    ) -> None:
+        check_encoding(encoding)
+        if dimension is None:
+            if not values:
+                raise IndexError("No values to infer the dimension from")
+            dimension = len(values[0])
+
+        self.bits: int = bits
+        self.encoding: str = encoding
+        self.dimension: int = dimension
+        self.name: str = name
+        self.values: list[tuple[int, ...]] = [
+            tuple(int(x) for x in value) for value in values
+        ]
+        self.num_addr_qubits: int = _num_address_qubits(len(values))
+        self._segments: list[Gate] = [
+            self._segment(address, value)
+            for address, value in enumerate(self.values)
+        ]
+        self._inverses: list[Optional[Gate]] = [None] * len(self._segments)
+        self._build_circuit()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _segment(self, address: int, value: tuple[int, ...]) -> Gate:
+        r"""
+        Builds the segment loading :code:`value` at :code:`address`
+        """
+        if len(value) != self.dimension:
+            raise ValueError(
+                f"Expected a vector of dimension {self.dimension}, got {len(value)}"
+            )
+        return load_element(
+            list(value), self.bits, address, self.num_addr_qubits, self.encoding
+        )
+
+    def _build_circuit(self) -> None:
+        r"""
+        Creates the circuit holding the segments for the current number of
+        address qubits
+        """
+        self.address_register: QuantumRegister = QuantumRegister(
+            self.num_addr_qubits, name="addr"
+        )
+        self.memory_register: list[QuantumRegister] = [
+            QuantumRegister(self.bits, name=f"v_{i}")
+            for i in range(self.dimension)
+        ]
+        self.circuit: QuantumCircuit = QuantumCircuit(
+            self.address_register, *self.memory_register, name=self.name
+        )
+        for segment in self._segments:
+            self.circuit.append(segment, self.circuit.qubits)
+
+    def _resize(self) -> None:
+        r"""
+        Rebuilds all segments with the number of address qubits needed for
+        the current list
+        """
+        self.num_addr_qubits = _num_address_qubits(len(self.values))
+        self._segments = [
+            self._segment(address, value)
+            for address, value in enumerate(self.values)
+        ]
+        self._inverses = [None] * len(self._segments)
+        self._build_circuit()
+
+    def append(self, value: list[int]) -> int:
+        r"""
+        Stores :code:`value` at the next free address and returns the address
+        """
+        value = tuple(int(x) for x in value)
+        address: int = len(self.values)
+        self.values.append(value)
+        if _num_address_qubits(len(self.values)) > self.num_addr_qubits:
+            self._resize()
+            return address
+
+        segment: Gate = self._segment(address, value)
+        self._segments.append(segment)
+        self._inverses.append(None)
+        self.circuit.append(segment, self.circuit.qubits)
+        return address
+
+    def replace(self, address: int, value: list[int]) -> None:
+        r"""
+        Stores :code:`value` at :code:`address`, replacing the element stored
+        there
+        """
+        if not 0 <= address < len(self.values):
+            raise IndexError(f"Address {address} is out of range")
+
+        value = tuple(int(x) for x in value)
+        if value == self.values[address]:
+            return
+
+        segment: Gate = self._segment(address, value)
+        self.values[address] = value
+        self._segments[address] = segment
+        self._inverses[address] = None
+        self.circuit.data[address] = CircuitInstruction(
+            segment, self.circuit.qubits
+        )
+
+    def delete(self, address: int) -> None:
+        r"""
+        Deletes the element at :code:`address` by moving the last element of
+        the list to :code:`address`, matching the way
+        :class:`~attacks.sieve.gauss.GaussSieve` removes list vectors. The
+        address register only shrinks once the list fits into a quarter of
+        the addresses.
+        """
+        if not 0 <= address < len(self.values):
+            raise IndexError(f"Address {address} is out of range")
+
+        last: tuple[int, ...] = self.values[-1]
+        if address != len(self.values) - 1:
+            self.replace(address, last)
+
+        self.values.pop()
+        self._segments.pop()
+        self._inverses.pop()
+        if _num_address_qubits(len(self.values)) + 2 <= self.num_addr_qubits:
+            self._resize()
+        else:
+            del self.circuit.data[-1]
+
+    def inverse(self) -> QuantumCircuit:
+        r"""
+        Returns the inverse of :code:`circuit`, reusing the inverses of the
+        segments that did not change since the last call
+        """
+        circuit: QuantumCircuit = QuantumCircuit(
+            *self.circuit.qregs, name=f"{self.name}_dg"
+        )
+        for address in range(len(self._segments) - 1, -1, -1):
+            if self._inverses[address] is None:
+                self._inverses[address] = self._segments[address].inverse()
+            circuit.append(self._inverses[address], circuit.qubits)
+
+        return circuit
+
+    @property
+    def toffoli_count(self) -> int:
+        r"""
+        Number of Toffoli gates of :code:`circuit`, counted as in
+        :mod:`attacks.utils.resources`
+        """
+        return toffoli_cost(self.num_addr_qubits) * sum(
+            bin(int(pattern)).count("1")
+            for value in self.values
+            for pattern in to_bit_patterns(value, self.bits, self.encoding)
+        )
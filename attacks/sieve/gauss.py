@@ -0,0 +1,291 @@
+# Classical reference implementation of GaussSieve [1]:
+#    L = {}, S = {}, K = 0
+#    while K < c:
+#        v = S.pop() if S is not empty else a freshly sampled lattice vector
+#        v = GaussReduce(v, L, S)
+#        if v == 0: K = K + 1 else: L = L + {v}
+#
+# GaussReduce performs the two searches the oracles in attacks/grover/oracles.py
+# implement:
+#  1. while some v in L has ||v|| <= ||p|| and ||p-v|| < ||p||, set p = p-v
+#  2. move every v in L with ||v|| > ||p|| and ||p-v|| <= ||v|| to S as v-p
+#
+# Both conditions only depend on the squared norms and the inner product <p, v>
+# (||p-v|| < ||p|| iff ||v||^2 < 2<p, v> and ||p-v|| <= ||v|| iff
+# ||p||^2 <= 2<p, v>), so every pass is a single matrix-vector product against
+# L. L is stored as a contiguous integer array (with amortized growth) together
+# with the squared norms of its vectors.
+#
+# [1] https://epubs.siam.org/doi/pdf/10.1137/1.9781611973075.119
+r"""
+Classical GaussSieve algorithm
+"""
+from typing import Optional
+import numpy as np
+
+
+class GaussSieve:
+    r"""
+    Classical GaussSieve algorithm of Micciancio and Voulgaris [1]. The list
+    :math:`L` is kept in a contiguous :code:`int64` array together with the
+    squared norms of its vectors and every GaussReduce pass is computed with a
+    single batched inner product instead of a loop over :math:`L`.
+
+    The reduction conditions are the ones marked by
+    :class:`~attacks.grover.oracles.ReductionOracle`. If :code:`symmetric` is
+    set to :code:`True` a vector :math:`p` is also reduced with :math:`-v`,
+    which is what practical sieves do.
+
+    :param basis: lattice basis, one basis vector per row
+    :param max_collisions: number of collisions :math:`c` after which the
+        sieve stops
+    :param deviation: standard deviation of the Klein sampler, defaults to
+        the largest Gram-Schmidt norm of the basis
+    :param symmetric: whether to also reduce with the negated list vectors
+    :param seed: seed of the random number generator
+
+    *Note:* All arithmetic is done with :code:`int64`, so the squared norms of
+    the sampled vectors should fit in 63 bits.
+
+    References:
+    ===========
+
+    `[1]`_ Daniele Micciancio and Panagiotis Voulgaris. **Faster exponential
+    time algorithms for the shortest vector problem**. In Proceedings of the
+    twenty-first annual ACM-SIAM symposium on Discrete Algorithms, pages
+    1468–1480. SIAM, 2010
+
+    .. _[1]: https://epubs.siam.org/doi/pdf/10.1137/1.9781611973075.119
+    """
+
+    def __init__(
+        self,
+        basis,
+        max_collisions: int = 500,
+        deviation: Optional[float] = None,
+        symmetric: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.basis: np.ndarray = np.array(basis, dtype=np.int64, ndmin=2)
+        if self.basis.shape[0] == 0:
+            raise ValueError("The basis should contain at least one vector")
+
+        self.dimension: int = self.basis.shape[1]
+        self.max_collisions: int = max_collisions
+        self.symmetric: bool = symmetric
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        # Gram-Schmidt data for the Klein sampler
+        basis_float = self.basis.astype(float)
+        orthogonal = np.zeros_like(basis_float)
+        self._mu: np.ndarray = np.eye(len(basis_float))
+        for i, vector in enumerate(basis_float):
+            orthogonal[i] = vector
+            for j in range(i):
+                self._mu[i, j] = vector @ orthogonal[j] / (
+                    orthogonal[j] @ orthogonal[j]
+                )
+                orthogonal[i] -= self._mu[i, j] * orthogonal[j]
+        self._gs_norms: np.ndarray = np.linalg.norm(orthogonal, axis=1)
+        if np.any(self._gs_norms < 1e-9):
+            raise ValueError("The basis vectors should be linearly independent")
+        self.deviation: float = (
+            float(self._gs_norms.max()) if deviation is None else deviation
+        )
+
+        self._vectors: np.ndarray = np.empty((16, self.dimension), dtype=np.int64)
+        self._norms: np.ndarray = np.empty(16, dtype=np.int64)
+        self.size: int = 0
+        self.stack: list[np.ndarray] = []
+
+        self.samples: int = 0
+        self.collisions: int = 0
+        self.reductions: int = 0
+        self.inner_products: int = 0
+
+    @property
+    def vectors(self) -> np.ndarray:
+        r"""
+        The vectors of the list :math:`L`, one per row
+        """
+        return self._vectors[: self.size]
+
+    @property
+    def norms(self) -> np.ndarray:
+        r"""
+        The squared norms of the vectors of the list :math:`L`
+        """
+        return self._norms[: self.size]
+
+    def _sample_integer(self, center: float, deviation: float) -> int:
+        r"""
+        Samples an integer from the discrete Gaussian distribution with the
+        given center and standard deviation by rejection sampling
+        """
+        radius: int = int(np.ceil(6 * deviation)) + 1
+        low: int = int(np.floor(center)) - radius
+        high: int = int(np.ceil(center)) + radius
+        while True:
+            value = int(self.rng.integers(low, high + 1))
+            if self.rng.random() < np.exp(
+                -((value - center) ** 2) / (2 * deviation**2)
+            ):
+                return value
+
+    def sample(self) -> np.ndarray:
+        r"""
+        Samples a lattice vector with Klein's algorithm
+        """
+        self.samples += 1
+        coefficients = np.zeros(len(self.basis), dtype=np.int64)
+        for i in range(len(self.basis) - 1, -1, -1):
+            center = -float(coefficients[i + 1 :] @ self._mu[i + 1 :, i])
+            coefficients[i] = self._sample_integer(
+                center, self.deviation / self._gs_norms[i]
+            )
+        return coefficients @ self.basis
+
+    def _candidates(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        r"""
+        Returns the indices of the list vectors :code:`vector` should be
+        compared against, or :code:`None` to compare against the whole list
+        """
+        return None
+
+    def _insert(self, vector: np.ndarray, norm: int) -> int:
+        r"""
+        Appends a vector to the list and returns its index
+        """
+        if self.size == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+            self._norms = np.concatenate([self._norms, np.empty_like(self._norms)])
+
+        self._vectors[self.size] = vector
+        self._norms[self.size] = norm
+        self.size += 1
+        return self.size - 1
+
+    def _remove(self, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        r"""
+        Removes the vectors at :code:`indices` from the list by moving vectors
+        from the end of the list into the freed positions.
+
+        :return: the positions :code:`targets` that were filled and the
+            positions :code:`sources` the vectors were moved from
+        """
+        indices = np.unique(indices)
+        new_size: int = self.size - len(indices)
+        targets = indices[indices < new_size]
+        sources = np.setdiff1d(np.arange(new_size, self.size), indices)
+        self._vectors[targets] = self._vectors[sources]
+        self._norms[targets] = self._norms[sources]
+        self.size = new_size
+        return targets, sources
+
+    def gauss_reduce(self, vector) -> np.ndarray:
+        r"""
+        Reduces :code:`vector` against the list, moving the list vectors that
+        can be reduced by it to the stack, and returns the reduced vector
+        """
+        p = np.array(vector, dtype=np.int64)
+        p_norm = int(p @ p)
+
+        # first search: reduce p with the list vectors
+        while self.size:
+            candidates = self._candidates(p)
+            if candidates is None:
+                vectors, norms = self.vectors, self.norms
+            else:
+                vectors, norms = self._vectors[candidates], self._norms[candidates]
+            if not len(norms):
+                break
+
+            products = 2 * (vectors @ p)
+            self.inner_products += len(norms)
+            if self.symmetric:
+                signs = np.where(products < 0, -1, 1)
+                products = np.abs(products)
+            marked = (norms <= p_norm) & (norms < products)
+            if not marked.any():
+                break
+
+            # subtract the vector reducing p the most
+            best = int(np.argmax(np.where(marked, products - norms, -1)))
+            p -= signs[best] * vectors[best] if self.symmetric else vectors[best]
+            p_norm = int(p @ p)
+            self.reductions += 1
+
+        if not p_norm:
+            return p
+
+        # second search: move the list vectors that p reduces to the stack
+        candidates = self._candidates(p)
+        if candidates is None:
+            candidates = np.arange(self.size)
+        if len(candidates):
+            vectors, norms = self._vectors[candidates], self._norms[candidates]
+            products = 2 * (vectors @ p)
+            self.inner_products += len(norms)
+            if self.symmetric:
+                signs = np.where(products < 0, -1, 1)
+                products = np.abs(products)
+            marked = (norms > p_norm) & (p_norm <= products)
+            if marked.any():
+                reduced = vectors[marked] - (
+                    signs[marked, None] * p if self.symmetric else p
+                )
+                self.stack.extend(reduced)
+                self._remove(candidates[marked])
+
+        return p
+
+    def step(self) -> None:
+        r"""
+        Performs one iteration of the sieve: takes a vector from the stack (or
+        samples a new one), reduces it and adds it to the list or records a
+        collision
+        """
+        vector = self.stack.pop() if self.stack else self.sample()
+        vector = self.gauss_reduce(vector)
+        if vector.any():
+            self._insert(vector, int(vector @ vector))
+        else:
+            self.collisions += 1
+
+    def run(self, max_iterations: Optional[int] = None) -> np.ndarray:
+        r"""
+        Runs the sieve until :code:`max_collisions` collisions have occurred
+        (or :code:`max_iterations` iterations have been performed) and
+        returns the shortest vector found
+        """
+        iterations: int = 0
+        while self.collisions < self.max_collisions:
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            self.step()
+            iterations += 1
+
+        return self.shortest_vector()
+
+    def shortest_vector(self) -> np.ndarray:
+        r"""
+        Returns the shortest vector in the list
+        """
+        if not self.size:
+            raise IndexError("The list is empty")
+        return self.vectors[int(np.argmin(self.norms))].copy()
+
+    def info(self) -> dict[str, int]:
+        r"""
+        Returns the number of sampled vectors, collisions, reductions and
+        inner products computed so far together with the sizes of the list
+        and the stack
+        """
+        return {
+            "samples": self.samples,
+            "collisions": self.collisions,
+            "reductions": self.reductions,
+            "inner_products": self.inner_products,
+            "list_size": self.size,
+            "stack_size": len(self.stack),
+        }
@@ -0,0 +1,198 @@
+# Angular locality-sensitive hashing for GaussSieve (HashSieve) [1]:
+# Every vector is hashed by t independent hash functions, each the
+# concatenation of k random hyperplane hashes h_a(v) = sign(<a, v>) packed into
+# one integer. Vectors pointing in similar directions (the only ones that can
+# reduce each other) collide in at least one of the t tables with high
+# probability, so GaussReduce only has to scan the union of the buckets p falls
+# in instead of the whole list L.
+#
+# With symmetric reductions a vector can also be reduced by -v, so the buckets
+# of -p are probed as well, which finds the vectors pointing opposite to p.
+#
+# The bucket index maps list positions, which change when GaussSieve removes
+# vectors (vectors are never modified in place: reduced vectors are removed and
+# pushed to the stack), so the index is updated on every insertion, removal and
+# move.
+#
+# [1] Thijs Laarhoven. Sieving for shortest vectors in lattices using angular
+#     locality-sensitive hashing. CRYPTO 2015.
+r"""
+Locality-sensitive hashing for GaussSieve
+"""
+from typing import Optional
+import numpy as np
+from .gauss import GaussSieve
+
+
+class HashTables:
+    r"""
+    :math:`t` hash tables, each keyed by the concatenation of :math:`k`
+    random hyperplane hashes, storing the positions of the list vectors
+    falling in every bucket.
+
+    :param dimension: dimension of the hashed vectors
+    :param k: number of hyperplane hashes per table
+    :param t: number of tables
+    :param rng: random number generator used to draw the hyperplanes
+    """
+
+    def __init__(
+        self, dimension: int, k: int, t: int, rng: np.random.Generator
+    ) -> None:
+        if not 1 <= k <= 62:
+            raise ValueError("Parameter `k` should be between 1 and 62")
+        if t < 1:
+            raise ValueError("Parameter `t` should be positive")
+
+        self.k: int = k
+        self.t: int = t
+        self.hyperplanes: np.ndarray = rng.standard_normal((dimension, t * k))
+        self._weights: np.ndarray = 1 << np.arange(k, dtype=np.int64)
+        self.buckets: list[dict[int, set[int]]] = [{} for _ in range(t)]
+        self.codes: np.ndarray = np.empty((16, t), dtype=np.int64)
+
+        self.lookups: int = 0
+        self.candidates: int = 0
+
+    def hash(self, vectors) -> np.ndarray:
+        r"""
+        Hashes a batch of vectors (one per row, or a single vector) and
+        returns their codes, one row of :math:`t` codes per vector
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        signs = (np.atleast_2d(vectors) @ self.hyperplanes) > 0
+        codes = signs.reshape(-1, self.t, self.k) @ self._weights
+        return codes[0] if vectors.ndim == 1 else codes
+
+    def insert(self, index: int, codes: np.ndarray) -> None:
+        r"""
+        Adds the list position :code:`index` with the given codes to the
+        buckets
+        """
+        if index >= len(self.codes):
+            self.codes = np.concatenate([self.codes, np.empty_like(self.codes)])
+
+        self.codes[index] = codes
+        for table, code in zip(self.buckets, codes.tolist()):
+            table.setdefault(code, set()).add(index)
+
+    def _discard(self, index: int) -> None:
+        r"""
+        Removes the list position :code:`index` from its buckets
+        """
+        for table, code in zip(self.buckets, self.codes[index].tolist()):
+            bucket = table[code]
+            bucket.discard(index)
+            if not bucket:
+                del table[code]
+
+    def remove(
+        self, indices: np.ndarray, targets: np.ndarray, sources: np.ndarray
+    ) -> None:
+        r"""
+        Removes the list positions :code:`indices` and moves the vectors at
+        positions :code:`sources` to positions :code:`targets`, matching
+        :meth:`GaussSieve._remove <attacks.sieve.gauss.GaussSieve._remove>`
+        """
+        for index in indices.tolist():
+            self._discard(index)
+        for target, source in zip(targets.tolist(), sources.tolist()):
+            self._discard(source)
+            self.insert(target, self.codes[source])
+
+    def collisions(self, vector, antipodal: bool = False) -> np.ndarray:
+        r"""
+        Returns the sorted list positions colliding with :code:`vector` in at
+        least one table. If :code:`antipodal` is set to :code:`True` the
+        positions colliding with :code:`-vector` are included as well.
+        Unlike :meth:`lookup` the statistics are not updated.
+        """
+        vector = np.asarray(vector)
+        codes: np.ndarray = self.hash([vector, -vector] if antipodal else [vector])
+        candidates: set[int] = set()
+        for row in codes.tolist():
+            for table, code in zip(self.buckets, row):
+                candidates.update(table.get(code, ()))
+
+        return np.array(sorted(candidates), dtype=np.int64)
+
+    def lookup(self, vector, antipodal: bool = False) -> np.ndarray:
+        r"""
+        Returns the :meth:`collisions` of :code:`vector` and counts them in
+        :code:`lookups` and :code:`candidates`
+        """
+        candidates: np.ndarray = self.collisions(vector, antipodal)
+        self.lookups += 1
+        self.candidates += len(candidates)
+        return candidates
+
+
+class HashSieve(GaussSieve):
+    r"""
+    GaussSieve with angular locality-sensitive hashing as proposed by
+    Laarhoven [1]. Both searches of GaussReduce only scan the list vectors
+    colliding with :math:`p` in one of the :math:`t` hash tables
+    (see :class:`HashTables`), so the shortest vectors found are not
+    guaranteed to be pairwise reduced.
+
+    :param basis: lattice basis, one basis vector per row
+    :param k: number of hyperplane hashes per table, defaults to
+        :math:`0.2206n` for dimension :math:`n`
+    :param t: number of hash tables, defaults to :math:`2^{0.1290n}`
+
+    The remaining parameters are the same as for
+    :class:`~attacks.sieve.gauss.GaussSieve`.
+
+    References:
+    ===========
+
+    `[1]`_ Thijs Laarhoven. **Sieving for shortest vectors in lattices using
+    angular locality-sensitive hashing**. In Advances in Cryptology - CRYPTO
+    2015, pages 3–22. Springer, 2015
+
+    .. _[1]: https://doi.org/10.1007/978-3-662-47989-6_1
+    """
+
+    def __init__(
+        self,
+        basis,
+        k: Optional[int] = None,
+        t: Optional[int] = None,
+        max_collisions: int = 500,
+        deviation: Optional[float] = None,
+        symmetric: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(basis, max_collisions, deviation, symmetric, seed)
+        if k is None:
+            k = max(1, round(0.2206 * self.dimension))
+        if t is None:
+            t = max(1, round(2 ** (0.1290 * self.dimension)))
+        self.tables: HashTables = HashTables(self.dimension, k, t, self.rng)
+
+    def _candidates(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        # the symmetric sieve also reduces with -v, which hashes like -p
+        return self.tables.lookup(vector, antipodal=self.symmetric)
+
+    def _insert(self, vector: np.ndarray, norm: int) -> int:
+        index: int = super()._insert(vector, norm)
+        self.tables.insert(index, self.tables.hash(vector))
+        return index
+
+    def _remove(self, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        indices = np.unique(indices)
+        targets, sources = super()._remove(indices)
+        self.tables.remove(indices, targets, sources)
+        return targets, sources
+
+    def info(self) -> dict[str, int]:
+        r"""
+        Returns the counters of :meth:`GaussSieve.info
+        <attacks.sieve.gauss.GaussSieve.info>` together with the number of
+        bucket lookups and the total number of candidates they returned
+        """
+        return {
+            **super().info(),
+            "lookups": self.tables.lookups,
+            "candidates": self.tables.candidates,
+        }
@@ -0,0 +1,243 @@
+# GaussSieve with emulated Grover searches:
+# Both searches of GaussReduce are replaced by Grover searches over a qRAM
+# holding the list (or, with hashing, the candidates colliding with p), emulated
+# with attacks/grover/emulation.py:
+#  1. while a search with ReductionOracle(first=True) finds some v, set p = p-v.
+#     Unlike the classical sieve, which subtracts the vector reducing p the
+#     most, the measured v is a uniformly random marked one
+#  2. while a search with ReductionOracle(first=False) finds some v, move it to
+#     the stack as v-p and remove it from the list, so every vector is found
+#     by its own search
+# Every search uses the BBHT strategy, since the number of marked vectors is
+# not known. A search that gives up is repeated up to `retries` times before
+# the (possibly wrong) conclusion that nothing is marked. The emulator knows the
+# marked set, so such false negatives are counted as missed searches.
+#
+# QuantumHashSieve searches only the candidates of the bucket index of
+# HashSieve: every search loads them into a BucketqRAM (attacks/memory/qram.py),
+# built by unary iteration, whose address register sets the width of the search.
+# The Toffoli gates of these qRAMs are counted too.
+#
+# The oracle queries are counted per sieve iteration and per number of address
+# qubits, so weighting them with the cost of one query at that width (e.g. the
+# Toffoli count of the oracle and two qRAM loads) gives the total cost.
+r"""
+GaussSieve with emulated Grover searches and oracle-query accounting
+"""
+from collections import Counter
+from typing import Callable, Optional
+import numpy as np
+from ..grover.emulation import GroverEmulator, reduction_marks
+from ..grover.planning import signed_bits
+from ..memory.qram import BucketqRAM
+from .gauss import GaussSieve
+from .hashing import HashSieve
+
+
+class QuantumGaussSieve(GaussSieve):
+    r"""
+    GaussSieve whose GaussReduce searches are emulated Grover searches with
+    the semantics of :class:`~attacks.grover.oracles.ReductionOracle`, see
+    :class:`~attacks.grover.emulation.GroverEmulator`. Only the number of
+    oracle queries is simulated, no circuit is built.
+
+    :param basis: lattice basis, one basis vector per row
+    :param max_collisions: number of collisions :math:`c` after which the
+        sieve stops
+    :param deviation: standard deviation of the Klein sampler, defaults to
+        the largest Gram-Schmidt norm of the basis
+    :param retries: number of times a search that found nothing is repeated
+    :param seed: seed of the random number generator, which also samples
+        the measurements
+    :param kwargs: passed to the base sieve, e.g. :code:`k` and :code:`t`
+        of :class:`QuantumHashSieve`. Symmetric reductions with :math:`-v`
+        are not supported, since the oracles do not mark them.
+
+    Besides the counters of :class:`~attacks.sieve.gauss.GaussSieve`, the
+    sieve records the oracle queries of every iteration in
+    :code:`iteration_queries`, the total queries per number of address
+    qubits in :code:`queries_by_width` and the number of searches per
+    number of vectors loaded into the qRAM in :code:`qram_sizes`.
+    """
+
+    def __init__(
+        self,
+        basis,
+        max_collisions: int = 500,
+        deviation: Optional[float] = None,
+        retries: int = 0,
+        seed: Optional[int] = None,
+        **kwargs,
+    ) -> None:
+        if kwargs.get("symmetric"):
+            raise ValueError(
+                "The GaussReduce oracles do not reduce with -v, so the sieve "
+                "cannot be symmetric"
+            )
+        super().__init__(
+            basis,
+            max_collisions=max_collisions,
+            deviation=deviation,
+            seed=seed,
+            **kwargs,
+        )
+        self.retries: int = retries
+
+        self.searches: int = 0
+        self.rounds: int = 0
+        self.failed_searches: int = 0
+        self.missed_searches: int = 0
+        self.queries: int = 0
+        self.iteration_queries: list[int] = []
+        self.queries_by_width: Counter = Counter()
+        self.qram_sizes: Counter = Counter()
+
+    def _load(self, p: np.ndarray) -> tuple[np.ndarray, Optional[int]]:
+        r"""
+        Returns the list positions of the vectors searched for :code:`p`, in
+        address order, and the number of address qubits of the qRAM holding
+        them (:code:`None` for the fewest that address them)
+        """
+        candidates = self._candidates(p)
+        if candidates is None:
+            candidates = np.arange(self.size)
+        return candidates, None
+
+    def _search(self, p: np.ndarray, first: bool) -> Optional[int]:
+        r"""
+        Emulates the search of the given GaussReduce oracle over the
+        candidates of :code:`p` and returns the list position of the found
+        vector, or :code:`None` if the search (and its retries) found nothing
+        """
+        candidates, num_address_qubits = self._load(p)
+        if not len(candidates):
+            return None
+
+        emulator: GroverEmulator = GroverEmulator(
+            reduction_marks(self._vectors[candidates], p, first),
+            num_address_qubits,
+            seed=self.rng,
+        )
+        self.qram_sizes[len(candidates)] += 1
+        for _ in range(self.retries + 1):
+            outcome = emulator.search()
+            self.searches += 1
+            self.rounds += outcome.rounds
+            self.queries += outcome.queries
+            self.queries_by_width[emulator.num_address_qubits] += outcome.queries
+            if outcome.found:
+                return int(candidates[outcome.address])
+            self.failed_searches += 1
+            self.missed_searches += int(emulator.num_marked > 0)
+        return None
+
+    def gauss_reduce(self, vector) -> np.ndarray:
+        r"""
+        Reduces :code:`vector` against the list with emulated Grover
+        searches, moving the list vectors that can be reduced by it to the
+        stack, and returns the reduced vector
+        """
+        p = np.array(vector, dtype=np.int64)
+
+        # first search: reduce p with the list vectors
+        while self.size:
+            found: Optional[int] = self._search(p, first=True)
+            if found is None:
+                break
+            p -= self._vectors[found]
+            self.reductions += 1
+
+        if not p.any():
+            return p
+
+        # second search: move the list vectors that p reduces to the stack
+        while self.size:
+            found = self._search(p, first=False)
+            if found is None:
+                break
+            self.stack.append(self._vectors[found] - p)
+            self._remove(np.array([found]))
+
+        return p
+
+    def step(self) -> None:
+        r"""
+        Performs one iteration of the sieve, see :meth:`GaussSieve.step
+        <attacks.sieve.gauss.GaussSieve.step>`, and records its oracle
+        queries in :code:`iteration_queries`
+        """
+        queries: int = self.queries
+        super().step()
+        self.iteration_queries.append(self.queries - queries)
+
+    def quantum_cost(self, query_cost: Callable[[int], float]) -> float:
+        r"""
+        Returns the total cost of the oracle queries so far, given the cost
+        :code:`query_cost(num_address_qubits)` of a single query
+        """
+        return sum(
+            queries * query_cost(width)
+            for width, queries in self.queries_by_width.items()
+        )
+
+    def info(self) -> dict[str, int]:
+        r"""
+        Returns the counters of :meth:`GaussSieve.info
+        <attacks.sieve.gauss.GaussSieve.info>` together with the number of
+        searches, of their measurements (rounds), of searches that found
+        nothing (in total and while some vector was marked) and of oracle
+        queries
+        """
+        return {
+            **super().info(),
+            "searches": self.searches,
+            "rounds": self.rounds,
+            "failed_searches": self.failed_searches,
+            "missed_searches": self.missed_searches,
+            "queries": self.queries,
+        }
+
+
+class QuantumHashSieve(QuantumGaussSieve, HashSieve):
+    r"""
+    :class:`QuantumGaussSieve` whose searches only load the list vectors
+    colliding with :math:`p` in one of the hash tables of
+    :class:`~attacks.sieve.hashing.HashSieve` into a
+    :class:`~attacks.memory.qram.BucketqRAM`, so every search has fewer
+    address qubits and needs fewer oracle queries.
+
+    :param basis: lattice basis, one basis vector per row
+    :param k: number of hyperplane hashes per table
+    :param t: number of hash tables
+
+    The remaining parameters are the same as for :class:`QuantumGaussSieve`.
+    The total number of Toffoli gates of the loaded qRAMs is stored in
+    :code:`qram_toffolis`.
+    """
+
+    def __init__(
+        self,
+        basis,
+        k: Optional[int] = None,
+        t: Optional[int] = None,
+        max_collisions: int = 500,
+        deviation: Optional[float] = None,
+        retries: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(basis, max_collisions, deviation, retries, seed, k=k, t=t)
+        self.qram_toffolis: int = 0
+
+    def _load(self, p: np.ndarray) -> tuple[np.ndarray, Optional[int]]:
+        candidates: np.ndarray = self._candidates(p)
+        if not len(candidates):
+            return candidates, None
+
+        qram: BucketqRAM = BucketqRAM(
+            self._vectors[: self.size],
+            candidates,
+            signed_bits(self._vectors[candidates]),
+            mode="unary",
+        )
+        self.qram_toffolis += qram.toffoli_count
+        return qram.indices, len(qram.address_register)
@@ -0,0 +1,72 @@
+r"""
+Allocation of reusable ancilla qubits
+"""
+from qiskit import QuantumCircuit
+from qiskit.circuit import AncillaRegister, Qubit
+
+
+class AncillaAllocator:
+    r"""
+    Leases clean ancillas of a circuit to sub-circuits. Released ancillas are
+    handed out again by later leases and new ancilla registers are only added
+    to the circuit when there are not enough free ancillas, so the circuit
+    only grows to the peak number of ancillas in use at the same time.
+
+    The caller is responsible for releasing ancillas only once they have been
+    returned to :math:`|0\rangle`.
+
+    :param circuit: circuit the ancillas are added to
+    :param name: prefix of the names of the added ancilla registers
+    """
+
+    def __init__(self, circuit: QuantumCircuit, name: str = "pool") -> None:
+        self.circuit: QuantumCircuit = circuit
+        self.name: str = name
+        self.registers: list[AncillaRegister] = []
+        self._free: list[Qubit] = []
+        self._leased: set[Qubit] = set()
+
+    @property
+    def num_qubits(self) -> int:
+        r"""
+        Number of ancillas added to the circuit
+        """
+        return sum(len(register) for register in self.registers)
+
+    @property
+    def num_leased(self) -> int:
+        r"""
+        Number of ancillas currently leased
+        """
+        return len(self._leased)
+
+    def lease(self, num_qubits: int) -> list[Qubit]:
+        r"""
+        Returns :code:`num_qubits` clean ancillas, preferring the ones that
+        were added to the circuit first
+        """
+        missing: int = num_qubits - len(self._free)
+        if missing > 0:
+            register = AncillaRegister(
+                missing, name=f"{self.name}_{len(self.registers)}"
+            )
+            self.circuit.add_register(register)
+            self.registers.append(register)
+            self._free.extend(register)
+
+        qubits: list[Qubit] = self._free[:num_qubits]
+        del self._free[:num_qubits]
+        self._leased.update(qubits)
+        return qubits
+
+    def release(self, qubits: list[Qubit]) -> None:
+        r"""
+        Returns leased ancillas (which must be clean again) to the pool
+        """
+        for qubit in qubits:
+            if qubit not in self._leased:
+                raise ValueError("Only leased ancillas can be released")
+            self._leased.remove(qubit)
+
+        self._free.extend(qubits)
+        self._free.sort(key=lambda qubit: self.circuit.find_bit(qubit).index)
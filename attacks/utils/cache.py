@@ -0,0 +1,153 @@
+r"""
+Process-wide cache of the sub-circuits used to build the oracles
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from qiskit import QuantumCircuit
+from qiskit.circuit import Instruction
+from . import profiling
+
+
+def _freeze(value: Any) -> Hashable:
+    r"""
+    Converts (nested) lists and dictionaries to tuples so they can be used as
+    part of a cache key
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def _build(factory: Callable[..., Any], *args, **kwargs) -> Any:
+    r"""
+    Calls the factory, inside a profiler block unless it opens its own
+    """
+    if profiling.is_profiled(factory):
+        return factory(*args, **kwargs)
+    return profiling.call(factory.__qualname__, factory, *args, **kwargs)
+
+
+class GateCache:
+    r"""
+    Size-bounded LRU cache of gate definitions. Entries are keyed by the
+    factory (a class such as :class:`~attacks.arithmetic.vectors.Norm2` or a
+    function such as :func:`~attacks.utils.quantum.controlled_X`) together
+    with the arguments it is called with, so every distinct sub-circuit and
+    its inverse is only synthesized once per process.
+
+    The returned objects are shared between all callers and must be treated
+    as immutable.
+
+    :param maxsize: maximum number of entries kept in the cache
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError("Parameter `maxsize` should be positive")
+
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        r"""
+        Returns the entry stored under :code:`key`, building (and storing) it
+        first if it is missing
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def circuit(self, factory: Callable[..., Any], *args, **kwargs) -> Any:
+        r"""
+        Returns the (shared) object built by :code:`factory(*args, **kwargs)`
+        """
+        key = ("circuit", factory, _freeze(args), _freeze(kwargs))
+        return self._lookup(key, lambda: _build(factory, *args, **kwargs))
+
+    def gate(self, factory: Callable[..., Any], *args, **kwargs) -> Instruction:
+        r"""
+        Returns the (shared) gate built by :code:`factory(*args, **kwargs)`.
+        Circuits are converted to gates once, when first requested, reusing
+        the cached circuit if there is one.
+        """
+
+        def build() -> Instruction:
+            circuit_key = ("circuit", factory, _freeze(args), _freeze(kwargs))
+            if circuit_key in self._entries:
+                built = self._entries[circuit_key]
+            else:
+                built = _build(factory, *args, **kwargs)
+            if isinstance(built, QuantumCircuit):
+                label: str = f"to_gate({factory.__qualname__})"
+                return profiling.call(label, built.to_gate)
+            return built
+
+        key = ("gate", factory, _freeze(args), _freeze(kwargs))
+        return self._lookup(key, build)
+
+    def inverse(
+        self, factory: Callable[..., Any], *args, **kwargs
+    ) -> Instruction:
+        r"""
+        Returns the (shared) inverse of the gate built by
+        :code:`factory(*args, **kwargs)`
+        """
+        key = ("inverse", factory, _freeze(args), _freeze(kwargs))
+        return self._lookup(
+            key,
+            lambda: profiling.call(
+                f"inverse({factory.__qualname__})",
+                lambda: self.gate(factory, *args, **kwargs).inverse(),
+            ),
+        )
+
+    def resize(self, maxsize: int) -> None:
+        r"""
+        Changes the maximum number of entries, evicting the least recently used
+        ones if needed
+        """
+        if maxsize < 1:
+            raise ValueError("Parameter `maxsize` should be positive")
+
+        self.maxsize = maxsize
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        r"""
+        Removes all entries and resets the hit/miss counters
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        r"""
+        Returns the hit/miss counters together with the current and maximum
+        size of the cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+gate_cache: GateCache = GateCache()
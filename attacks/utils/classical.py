@@ -0,0 +1,75 @@
+r"""
+Utility classical functions
+"""
+import numpy as np
+
+
+ENCODINGS: tuple[str, ...] = ("sign-magnitude", "twos-complement")
+
+
+def check_encoding(encoding: str) -> None:
+    r"""
+    Raises a :code:`ValueError` if :code:`encoding` is not one of the
+    supported signed integer representations, :code:`"sign-magnitude"` and
+    :code:`"twos-complement"`
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            "Parameter `encoding` should be one of 'sign-magnitude', "
+            "'twos-complement'"
+        )
+
+
+def to_bit_patterns(
+    values, bits: int, encoding: str = "sign-magnitude"
+) -> np.ndarray:
+    r"""
+    Returns the bit patterns (as unsigned integers) of the given signed
+    integers, matching the layout produced by
+    :func:`~attacks.utils.quantum.encode_signed_int`. In sign-magnitude
+    representation the magnitude is stored in the lower :code:`bits-1` bits
+    and the sign in the top bit. In two's complement representation the
+    pattern is the value modulo :math:`2^{\text{bits}}`.
+
+    Both representations accept the same (symmetric) range of values,
+    :math:`|v| < 2^{\text{bits}-1}`.
+
+    :param values: array-like of signed integers
+    :param bits: number of bits used to store each integer
+    :param encoding: :code:`"sign-magnitude"` or :code:`"twos-complement"`
+    """
+    check_encoding(encoding)
+    values = np.asarray(values, dtype=np.int64)
+    magnitudes = np.abs(values)
+    if np.any(magnitudes >= 1 << (bits - 1)):
+        raise ValueError(f"{bits} bits are not enough bits to encode values")
+
+    if encoding == "twos-complement":
+        return (values % (1 << bits)).astype(np.uint64)
+
+    patterns = magnitudes.astype(np.uint64)
+    patterns[values < 0] |= np.uint64(1 << (bits - 1))
+    return patterns
+
+
+def from_bit_patterns(
+    patterns, bits: int, encoding: str = "sign-magnitude"
+) -> np.ndarray:
+    r"""
+    Inverse of :func:`to_bit_patterns`. Returns the signed integers encoded by
+    the given bit patterns.
+
+    :param patterns: array-like of unsigned integers
+    :param bits: number of bits used to store each integer
+    :param encoding: :code:`"sign-magnitude"` or :code:`"twos-complement"`
+    """
+    check_encoding(encoding)
+    patterns = np.asarray(patterns, dtype=np.uint64)
+    sign_mask = np.uint64(1 << (bits - 1))
+    values = (patterns & (sign_mask - np.uint64(1))).astype(np.int64)
+    negative = (patterns & sign_mask) != 0
+    if encoding == "twos-complement":
+        values[negative] -= 1 << (bits - 1)
+    else:
+        values[negative] *= -1
+    return values
@@ -0,0 +1,274 @@
+# Persistent circuit cache:
+# Circuits are stored as pickle files in a directory shared by all processes.
+# The file name is the SHA-256 of a canonical JSON description of
+#    * the factory (module and qualified name, for bound methods such as
+#      ReductionOracle(...).phase_oracle also the attributes of the instance)
+#    * its arguments, including the list data of qRAM
+#    * the transpiler options, for transpiled circuits
+#    * a fingerprint of the source files of the package (it has no version
+#      number, and this also invalidates the entries whenever the code changes)
+#      and the Qiskit version
+# so entries never have to be invalidated by hand.
+#
+# Writers build the file under a temporary name and atomically rename it, so
+# readers see either no entry or a complete one and concurrent workers need no
+# locks (two workers missing the same key both build it, the last rename wins).
+# Hits refresh the modification time and, once the directory grows beyond
+# max_bytes, the least recently used entries are deleted.
+#
+# QPY, the portable format of Qiskit, is not used: Terra 0.24 cannot load
+# circuits with ancilla registers or with several custom gates of the same name,
+# as built here, and it loads large circuits an order of magnitude slower. Pickle
+# keeps the circuit classes and their attributes (register_layout, toffoli_count),
+# and is safe here since the key pins both the package source and Qiskit.
+r"""
+Persistent on-disk cache of built and transpiled circuits
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional
+import numpy as np
+import qiskit
+from qiskit import QuantumCircuit, transpile
+
+_fingerprint: Optional[str] = None
+
+
+def source_fingerprint() -> str:
+    r"""
+    Returns a hash of the source files of the :code:`attacks` package
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        package: Path = Path(__file__).resolve().parents[1]
+        for path in sorted(package.rglob("*.py")):
+            digest.update(str(path.relative_to(package)).encode())
+            digest.update(path.read_bytes())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+def _canonical(value: Any) -> Any:
+    r"""
+    Converts a value to a JSON-serializable description that does not depend
+    on the process, e.g. functions and classes are described by their names
+    """
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return sorted([str(key), _canonical(item)] for key, item in value.items())
+    if hasattr(value, "__self__") and hasattr(value, "__func__"):
+        return [_canonical(value.__func__), _canonical(value.__self__)]
+    if isinstance(value, type) or (callable(value) and hasattr(value, "__qualname__")):
+        return f"{value.__module__}.{value.__qualname__}"
+    if dataclasses.is_dataclass(value):
+        return [
+            _canonical(type(value)),
+            _canonical(
+                {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+            ),
+        ]
+    if hasattr(value, "__dict__"):
+        return [_canonical(type(value)), _canonical(vars(value))]
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+class DiskCache:
+    r"""
+    Content-addressed cache of pickled circuits, shared between processes
+    and runs. Entries are keyed by the factory (e.g.
+    :class:`~attacks.memory.qram.qRAM` or the bound method
+    :code:`ReductionOracle(2, 2, 4).phase_oracle`), its arguments, the
+    transpiler options, the source of the package and the Qiskit version.
+
+    Only point it to directories written by trusted processes, since loading
+    an entry unpickles it.
+
+    :param directory: cache directory, defaults to the
+        :code:`ATTACKS_CACHE_DIR` environment variable or
+        :code:`~/.cache/pqc-attacks`
+    :param max_bytes: size above which the least recently used entries are
+        deleted
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: int = 1 << 30
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("Parameter `max_bytes` should be positive")
+        if directory is None:
+            directory = os.environ.get(
+                "ATTACKS_CACHE_DIR", str(Path.home() / ".cache" / "pqc-attacks")
+            )
+
+        self.directory: Path = Path(directory).expanduser()
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(
+        self,
+        factory: Callable[..., QuantumCircuit],
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        transpile_options: Optional[dict] = None,
+    ) -> str:
+        r"""
+        Returns the key of the circuit built by :code:`factory(*args,
+        **kwargs)`, transpiled with :code:`transpile_options` if given
+        """
+        description: str = json.dumps(
+            [
+                source_fingerprint(),
+                qiskit.__version__,
+                _canonical(factory),
+                _canonical(args),
+                _canonical(kwargs or {}),
+                _canonical(transpile_options),
+            ]
+        )
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
+
+    def _load(self, key: str) -> Optional[QuantumCircuit]:
+        r"""
+        Returns the circuit stored under :code:`key` or :code:`None`
+        """
+        path: Path = self._path(key)
+        try:
+            data: bytes = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            # unreadable entry, e.g. written by an older version of Python
+            path.unlink(missing_ok=True)
+            return None
+
+    def _store(self, key: str, circuit: QuantumCircuit) -> None:
+        r"""
+        Atomically writes a circuit under :code:`key` and evicts old entries.
+        If the circuit cannot be written (e.g. it cannot be pickled or the
+        disk is full) the temporary file is deleted and the error is raised.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as file:
+            try:
+                pickle.dump(circuit, file, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, self._path(key))
+        self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        r"""
+        Returns the modification time, size and path of every entry. Entries
+        deleted by another process in the meantime are skipped.
+        """
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*.pickle"):
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        r"""
+        Deletes the least recently used entries until the cache fits in
+        :code:`max_bytes`
+        """
+        entries: list[tuple[float, int, Path]] = self._entries()
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _get(self, key: str, build: Callable[[], QuantumCircuit]) -> QuantumCircuit:
+        circuit: Optional[QuantumCircuit] = self._load(key)
+        if circuit is not None:
+            self.hits += 1
+            return circuit
+
+        self.misses += 1
+        circuit = build()
+        self._store(key, circuit)
+        return circuit
+
+    def circuit(
+        self, factory: Callable[..., QuantumCircuit], *args, **kwargs
+    ) -> QuantumCircuit:
+        r"""
+        Returns the circuit built by :code:`factory(*args, **kwargs)`,
+        loading it from the cache if possible
+        """
+        return self._get(
+            self.key(factory, args, kwargs), lambda: factory(*args, **kwargs)
+        )
+
+    def transpiled(
+        self,
+        factory: Callable[..., QuantumCircuit],
+        *args,
+        transpile_options: Optional[dict] = None,
+        **kwargs,
+    ) -> QuantumCircuit:
+        r"""
+        Returns the circuit built by :code:`factory(*args, **kwargs)` and
+        transpiled with :code:`qiskit.transpile(circuit, **transpile_options)`,
+        loading it (or the circuit before transpilation) from the cache if
+        possible
+        """
+        transpile_options = transpile_options or {}
+        return self._get(
+            self.key(factory, args, kwargs, transpile_options),
+            lambda: transpile(
+                self.circuit(factory, *args, **kwargs), **transpile_options
+            ),
+        )
+
+    def clear(self) -> None:
+        r"""
+        Deletes all entries and resets the hit/miss counters
+        """
+        for path in self.directory.glob("*.pickle"):
+            path.unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        r"""
+        Returns the hit/miss counters together with the number of entries and
+        the current and maximum size of the cache in bytes
+        """
+        sizes: list[int] = [size for _, size, _ in self._entries()]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+        }
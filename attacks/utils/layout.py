@@ -0,0 +1,162 @@
+# Register layouts:
+# The circuits of this package expose a RegisterLayout mapping the name of every
+# register (and of a few derived fields, e.g. a signed component spread over a
+# magnitude and a sign register) to the indices of its qubits in the circuit
+# and the encoding of its value, so measurement results can be decoded without
+# hard-coded positions.
+#
+# Decoding is vectorized over the shots: all bitstrings are joined into a single
+# string, viewed as one (#bitstrings x #clbits) uint8 array, and every field is
+# a column gather followed by one matrix product with its bit weights. Signed
+# fields are converted with from_bit_patterns. Qiskit prints clbit 0 last, so
+# the clbit of a measured qubit at position i is the column #clbits-1-i.
+r"""
+Register layouts of circuits and vectorized decoding of measurement results
+"""
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from qiskit import QuantumCircuit
+from .classical import check_encoding, from_bit_patterns
+
+
+@dataclass(frozen=True)
+class RegisterField:
+    r"""
+    A value stored on some qubits of a circuit
+
+    :param name: name of the field
+    :param offsets: indices of the qubits of the field in the circuit, least
+        significant first
+    :param encoding: signed integer representation of the value,
+        :code:`"sign-magnitude"` or :code:`"twos-complement"`, or
+        :code:`None` for unsigned values
+    """
+
+    name: str
+    offsets: tuple[int, ...]
+    encoding: Optional[str] = None
+
+    @property
+    def width(self) -> int:
+        r"""
+        Number of qubits of the field
+        """
+        return len(self.offsets)
+
+
+class RegisterLayout:
+    r"""
+    Layout of the registers of a circuit, computed once when the circuit is
+    built. Every register is a field of the layout (unsigned unless an
+    encoding is given for it) and further fields can be defined on any
+    qubits of the circuit.
+
+    :param circuit: the circuit
+    :param encodings: signed integer representation of the registers holding
+        signed values, by register name
+    :param fields: further fields, by name, as pairs of the qubits of the
+        field (least significant first) and its encoding
+    """
+
+    def __init__(
+        self,
+        circuit: QuantumCircuit,
+        encodings: Optional[dict[str, str]] = None,
+        fields: Optional[dict[str, tuple[list, Optional[str]]]] = None,
+    ) -> None:
+        encodings = encodings or {}
+        self.num_qubits: int = circuit.num_qubits
+        self.fields: dict[str, RegisterField] = {}
+        definitions: list[tuple[str, list, Optional[str]]] = [
+            (reg.name, list(reg), encodings.get(reg.name)) for reg in circuit.qregs
+        ]
+        definitions += [
+            (name, qubits, encoding)
+            for name, (qubits, encoding) in (fields or {}).items()
+        ]
+        for name, qubits, encoding in definitions:
+            if encoding is not None:
+                check_encoding(encoding)
+            self.fields[name] = RegisterField(
+                name,
+                tuple(circuit.find_bit(qubit).index for qubit in qubits),
+                encoding,
+            )
+
+    def __getitem__(self, name: str) -> RegisterField:
+        return self.fields[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def __iter__(self):
+        return iter(self.fields.values())
+
+    def decode(
+        self,
+        bitstrings,
+        qubits: Optional[list[int]] = None,
+        names: Optional[list[str]] = None,
+    ) -> dict[str, np.ndarray]:
+        r"""
+        Decodes measured bitstrings, e.g. the memory of a job, and returns an
+        integer array with one entry per bitstring for every field
+
+        :param bitstrings: iterable of bitstrings, spaces between classical
+            registers are ignored
+        :param qubits: the measured qubits in the order of the classical bits,
+            defaults to all qubits of the circuit (as with
+            :code:`measure_all`)
+        :param names: fields to decode, defaults to every field whose qubits
+            were all measured
+        """
+        bitstrings = list(bitstrings)
+        if qubits is None:
+            qubits = list(range(self.num_qubits))
+        num_clbits: int = len(qubits)
+        column: dict[int, int] = {
+            qubit: num_clbits - 1 - i for i, qubit in enumerate(qubits)
+        }
+        if names is None:
+            names = [
+                field.name
+                for field in self
+                if all(offset in column for offset in field.offsets)
+            ]
+
+        characters: np.ndarray = np.frombuffer(
+            "".join(bitstrings).replace(" ", "").encode(), dtype=np.uint8
+        ).reshape(len(bitstrings), num_clbits)
+
+        values: dict[str, np.ndarray] = {}
+        for name in names:
+            field: RegisterField = self.fields[name]
+            if field.width > 64:
+                raise ValueError(f"Field {name} is too wide to be decoded")
+            columns: list[int] = [column[offset] for offset in field.offsets]
+            measured: np.ndarray = (characters[:, columns] - ord("0")).astype(
+                np.uint64
+            )
+            weights: np.ndarray = np.uint64(1) << np.arange(
+                field.width, dtype=np.uint64
+            )
+            patterns: np.ndarray = measured @ weights
+            if field.encoding is not None:
+                patterns = from_bit_patterns(patterns, field.width, field.encoding)
+            values[name] = patterns
+
+        return values
+
+    def decode_counts(
+        self,
+        counts: dict[str, int],
+        qubits: Optional[list[int]] = None,
+        names: Optional[list[str]] = None,
+    ) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        r"""
+        Decodes the bitstrings of a count dictionary (see :meth:`decode`) and
+        returns the values of the fields together with the array of counts
+        """
+        values: dict[str, np.ndarray] = self.decode(counts, qubits, names)
+        return values, np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
@@ -0,0 +1,265 @@
+# Construction profiling:
+# Profiling is opt-in. While a Profiler is active (inside `with profile():` or
+# for the whole process if the ATTACKS_PROFILE environment variable is set to
+# an output file), every factory decorated with @profiled and every sub-circuit
+# built, converted to a gate or inverted by gate_cache opens a block of a
+# nested profile tree, which records
+#    * the wall time (total and self, i.e. without the nested blocks)
+#    * the net memory allocated by Python if memory tracing is enabled (with
+#      tracemalloc, which slows construction down)
+#    * the number of qubits and of top-level instructions of the built object
+# Repeated blocks with the same name under the same parent are merged and
+# counted, so the tree stays small even if a factory is called for every list
+# element. When no profiler is active the hooks only check a module attribute.
+#
+# Processes started by a profiled process (e.g. the workers of a process pool)
+# inherit ATTACKS_PROFILE, so the PID of the process that first saw it is kept
+# in ATTACKS_PROFILE_PID and only that process profiles and writes the file.
+#
+# The tree can be written as JSON or as folded stacks ("a;b;c <self time in
+# microseconds>" per line), the input format of flamegraph.pl and speedscope.
+r"""
+Opt-in profiling of the construction of the circuits of this package
+"""
+import atexit
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+from qiskit import QuantumCircuit
+from qiskit.circuit import Instruction
+
+
+@dataclass
+class ProfileNode:
+    r"""
+    A block of the profile tree
+
+    :param name: name of the block
+    :param calls: number of times the block was entered
+    :param seconds: total wall time of all calls
+    :param allocated: net memory allocated by all calls (bytes), if traced
+    :param num_qubits: number of qubits of the object built by the last call
+    :param size: number of top-level instructions of that object
+    :param children: nested blocks
+    """
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    allocated: Optional[int] = None
+    num_qubits: Optional[int] = None
+    size: Optional[int] = None
+    children: dict[str, "ProfileNode"] = field(default_factory=dict)
+
+    @property
+    def self_seconds(self) -> float:
+        r"""
+        Wall time spent in the block itself, without its nested blocks
+        """
+        return self.seconds - sum(child.seconds for child in self.children.values())
+
+    def record(self, value: Any) -> None:
+        r"""
+        Records the qubit and instruction counts of a built circuit or gate
+        """
+        if isinstance(value, QuantumCircuit):
+            self.num_qubits, self.size = value.num_qubits, len(value.data)
+        elif isinstance(value, Instruction):
+            definition: Optional[QuantumCircuit] = value.definition
+            self.num_qubits = value.num_qubits
+            self.size = None if definition is None else len(definition.data)
+
+    def to_dict(self) -> dict[str, Any]:
+        r"""
+        Returns the subtree as nested dictionaries
+        """
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "self_seconds": self.self_seconds,
+            "allocated": self.allocated,
+            "num_qubits": self.num_qubits,
+            "size": self.size,
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+
+class Profiler:
+    r"""
+    Records the nested profile tree of the blocks entered while it is active,
+    see :func:`profile`
+
+    :param memory: whether to trace the memory allocated by every block
+    """
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory: bool = memory
+        self.root: ProfileNode = ProfileNode("root", calls=1)
+        self._stack: list[ProfileNode] = [self.root]
+        self._start: float = time.perf_counter()
+
+    @contextmanager
+    def block(self, name: str) -> Iterator[ProfileNode]:
+        r"""
+        Context manager entering the block :code:`name` nested in the current
+        block
+        """
+        parent: ProfileNode = self._stack[-1]
+        node: ProfileNode = parent.children.setdefault(name, ProfileNode(name))
+        node.calls += 1
+        self._stack.append(node)
+        allocated: int = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        start: float = time.perf_counter()
+        try:
+            yield node
+        finally:
+            node.seconds += time.perf_counter() - start
+            if self.memory:
+                node.allocated = (node.allocated or 0) + (
+                    tracemalloc.get_traced_memory()[0] - allocated
+                )
+            self._stack.pop()
+
+    def stop(self) -> None:
+        r"""
+        Sets the time of the root block to the time since the profiler was
+        created
+        """
+        self.root.seconds = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict[str, Any]:
+        r"""
+        Returns the profile tree as nested dictionaries
+        """
+        return self.root.to_dict()
+
+    def folded(self) -> str:
+        r"""
+        Returns the profile tree as folded stacks, one line with the self
+        time in microseconds per block
+        """
+        lines: list[str] = []
+
+        def visit(node: ProfileNode, stack: str) -> None:
+            for child in node.children.values():
+                path: str = f"{stack};{child.name}" if stack else child.name
+                lines.append(f"{path} {max(round(child.self_seconds * 1e6), 0)}")
+                visit(child, path)
+
+        visit(self.root, "")
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        r"""
+        Writes the profile tree to :code:`path`, as folded stacks if the path
+        ends with :code:`.folded` and as JSON otherwise
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".folded"):
+                file.write(self.folded() + "\n")
+            else:
+                json.dump(self.to_dict(), file, indent=2)
+
+
+@dataclass
+class _ActiveProfiler:
+    r"""
+    Holds the profiler the hooks record into, if any
+    """
+
+    profiler: Optional[Profiler] = None
+
+
+_active: _ActiveProfiler = _ActiveProfiler()
+
+
+@contextmanager
+def profile(memory: bool = False) -> Iterator[Profiler]:
+    r"""
+    Context manager profiling the construction of every sub-circuit built
+    inside it:
+
+    .. code-block:: python
+
+        with profile() as profiler:
+            ReductionOracle(2, 2, 4)._marking_oracle()
+        profiler.write("oracle.json")
+
+    :param memory: whether to trace the memory allocated by every block (with
+        :code:`tracemalloc`)
+    """
+    previous: Optional[Profiler] = _active.profiler
+    profiler: Profiler = Profiler(memory)
+    started_tracing: bool = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active.profiler = previous
+        profiler.stop()
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def call(name: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+    r"""
+    Calls :code:`function(*args, **kwargs)` inside the block :code:`name` of
+    the active profiler (if any) and records the object it returns
+    """
+    if _active.profiler is None:
+        return function(*args, **kwargs)
+    with _active.profiler.block(name) as node:
+        value: Any = function(*args, **kwargs)
+        node.record(value)
+    return value
+
+
+def is_profiled(factory: Callable[..., Any]) -> bool:
+    r"""
+    Returns whether a function (or the constructor of a class) is decorated
+    with :func:`profiled`
+    """
+    target: Any = factory.__init__ if isinstance(factory, type) else factory
+    return getattr(target, "__profiled__", False)
+
+
+def profiled(function: Callable[..., Any]) -> Callable[..., Any]:
+    r"""
+    Decorator opening a profiler block named after the function (or after
+    the class, for constructors) on every call
+    """
+    name: str = function.__qualname__
+    if name.endswith(".__init__"):
+        name = name[: -len(".__init__")]
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs) -> Any:
+        if _active.profiler is None:
+            return function(*args, **kwargs)
+        with _active.profiler.block(name) as node:
+            value: Any = function(*args, **kwargs)
+            # constructors record the circuit they initialized
+            node.record(args[0] if value is None and args else value)
+        return value
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+if os.environ.get("ATTACKS_PROFILE") and os.environ.setdefault(
+    "ATTACKS_PROFILE_PID", str(os.getpid())
+) == str(os.getpid()):
+    _active.profiler = Profiler()
+
+    @atexit.register
+    def _write_profile() -> None:
+        _active.profiler.stop()
+        _active.profiler.write(os.environ["ATTACKS_PROFILE"])
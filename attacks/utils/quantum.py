@@ -1,25 +1,33 @@
 r"""
 Utility quantum functions
 """
+from concurrent.futures import Executor
+from functools import partial
 from math import ceil, log2
-from qiskit import QuantumCircuit, QuantumRegister
-from qiskit.circuit import Gate, ControlledGate
+from typing import Optional
+from qiskit import QuantumCircuit, QuantumRegister, AncillaRegister, transpile
+from qiskit.circuit import Gate, ControlledGate, Instruction, Qubit
+from qiskit.circuit.library.standard_gates import get_standard_gate_name_mapping
+from .classical import check_encoding
+from .profiling import profiled
 
 
+@profiled
 def controlled_X(n: int) -> ControlledGate:
     r"""
     Returns a controlled :math:`X^{\otimes n}` gate
     """
-    circuit: QuantumCircuit = QuantumCircuit(n)
+    circuit: QuantumCircuit = QuantumCircuit(n, name="X^(⊗n)")
     circuit.x(range(n))
     return circuit.to_gate(label="c-X^(⊗n)").control(1)
 
 
+@profiled
 def controlled_incr(num_qubits: int) -> ControlledGate:
     r"""
     Returns a controlled increment gate.
     """
-    incr_circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    incr_circuit: QuantumCircuit = QuantumCircuit(num_qubits, name="Incr")
     for i in range(num_qubits - 1, 0, -1):
         incr_circuit.mcx(list(range(i)), i)
     incr_circuit.x(0)
@@ -27,20 +35,122 @@ def controlled_incr(num_qubits: int) -> ControlledGate:
     return incr_circuit.to_gate(label="c-Incr").control(1)
 
 
-def encode_signed_int(value: int, bits: int) -> Gate:
+@profiled
+def prefix_and(num_qubits: int) -> QuantumCircuit:
+    r"""
+    Returns a circuit XORing the prefix ANDs :math:`x_0 \wedge \ldots \wedge
+    x_i`, :math:`i = 1, \ldots, n-1` of its :math:`n` input qubits into an
+    output register, leaving the inputs and its helper ancillas unchanged.
+    The prefixes are computed with a Brent-Kung parallel prefix tree, which
+    uses about :math:`4n` Toffoli gates, :math:`2n` helper ancillas and has
+    logarithmic depth.
+    """
+    inputs: QuantumRegister = QuantumRegister(num_qubits, name="x")
+    prefix: QuantumRegister = QuantumRegister(num_qubits - 1, name="prefix")
+    circuit: QuantumCircuit = QuantumCircuit(inputs, prefix, name="PrefixAnd")
+    compute: QuantumCircuit = QuantumCircuit(inputs)
+
+    def prefixes(qubits: list[Qubit]) -> list[Qubit]:
+        # AND adjacent pairs, recurse on the pairs and fill in the prefixes
+        # ending at even positions
+        if len(qubits) == 1:
+            return qubits
+        level: int = len(compute.qregs) // 2
+        pairs: AncillaRegister = AncillaRegister(
+            len(qubits) // 2, name=f"pairs_{level}"
+        )
+        evens: AncillaRegister = AncillaRegister(
+            (len(qubits) - 1) // 2, name=f"evens_{level}"
+        )
+        compute.add_register(pairs, evens)
+        for j, target in enumerate(pairs):
+            compute.ccx(qubits[2 * j], qubits[2 * j + 1], target)
+
+        pair_prefixes: list[Qubit] = prefixes(list(pairs))
+        result: list[Qubit] = [qubits[0]]
+        for i in range(1, len(qubits)):
+            if i % 2:
+                result.append(pair_prefixes[i // 2])
+            else:
+                target = evens[i // 2 - 1]
+                compute.ccx(pair_prefixes[i // 2 - 1], qubits[i], target)
+                result.append(target)
+        return result
+
+    result: list[Qubit] = prefixes(list(inputs))
+    circuit.add_register(*compute.qregs[1:])
+    compute_gate: Gate = compute.to_gate(label="PrefixTree")
+    tree: list[Qubit] = compute.qubits[num_qubits:]
+    circuit.append(compute_gate, [*inputs, *tree])
+    for i in range(1, num_qubits):
+        circuit.cx(result[i], prefix[i - 1])
+    circuit.append(compute_gate.inverse(), [*inputs, *tree])
+
+    return circuit
+
+
+@profiled
+def parallel_controlled_incr(num_qubits: int) -> QuantumCircuit:
+    r"""
+    Returns a controlled increment circuit with linear size and logarithmic
+    depth, acting on a control qubit, the :code:`num_qubits`-qubit target
+    register and clean helper ancillas (about :math:`3n`). The carries
+    :math:`c \wedge t_0 \wedge \ldots \wedge t_{i-1}` are computed with
+    :func:`prefix_and`, XORed into the target and uncomputed from the
+    incremented target :math:`t'`, since they are equal to
+    :math:`c \wedge \bar{t}'_0 \wedge \ldots \wedge \bar{t}'_{i-1}`.
+    """
+    control: QuantumRegister = QuantumRegister(1, name="control")
+    target: QuantumRegister = QuantumRegister(num_qubits, name="target")
+    circuit: QuantumCircuit = QuantumCircuit(control, target, name="Incr")
+    if num_qubits == 1:
+        circuit.cx(control, target)
+        return circuit
+
+    carries_circ: QuantumCircuit = prefix_and(num_qubits)
+    helper: AncillaRegister = AncillaRegister(
+        carries_circ.num_qubits - num_qubits, name="helper"
+    )
+    circuit.add_register(helper)
+    carries: Gate = carries_circ.to_gate(label="Carries")
+
+    circuit.append(carries, [*control, *target[:-1], *helper])
+    for i in range(1, num_qubits):
+        circuit.cx(helper[i - 1], target[i])
+    circuit.cx(control, target[0])
+
+    circuit.x(target[:-1])
+    circuit.append(carries, [*control, *target[:-1], *helper])
+    circuit.x(target[:-1])
+
+    return circuit
+
+
+def encode_signed_int(
+    value: int, bits: int, encoding: str = "sign-magnitude"
+) -> Gate:
     r"""
     Returns a gate encoding a signed integer in a quantum register in sign-
-    magnitude representation
+    magnitude (default) or two's complement representation. In both cases
+    the lower :code:`bits-1` qubits are followed by the sign qubit.
     """
+    check_encoding(encoding)
     magnitude_bits: int = bits - 1
     if abs(value) > 0 and ceil(log2(abs(value))) > magnitude_bits:
         raise ValueError(f"{bits} bits are not enough bits to encode {value}")
 
-    circuit: QuantumCircuit = QuantumCircuit()
+    circuit: QuantumCircuit = QuantumCircuit(name="encode_int")
     value_reg: QuantumRegister = QuantumRegister(magnitude_bits, name="value")
     sign_reg: QuantumRegister = QuantumRegister(1, name="sgn")
     circuit.add_register(value_reg, sign_reg)
 
+    if encoding == "twos-complement":
+        pattern: int = value % (1 << bits)
+        for i in range(bits):
+            if (pattern >> i) & 1:
+                circuit.x(circuit.qubits[i])
+        return circuit.to_gate(label="encode_int")
+
     if value < 0:
         circuit.x(sign_reg)
 
@@ -52,18 +162,124 @@ def encode_signed_int(value: int, bits: int) -> Gate:
     return circuit.to_gate(label="encode_int")
 
 
-def encode_vector(values: list[int], bits: int) -> Gate:
+@profiled
+def encode_vector(
+    values: list[int], bits: int, encoding: str = "sign-magnitude"
+) -> Gate:
     r"""
-    Returns a gate encoding a vector to a quantum register
+    Returns a gate encoding a vector to a quantum register, see
+    :func:`encode_signed_int`
     """
     dimension = len(values)
-    circuit: QuantumCircuit = QuantumCircuit()
+    circuit: QuantumCircuit = QuantumCircuit(name="encode_vec")
     values_reg: list[QuantumRegister] = [
         QuantumRegister(bits, name=f"v_{i}") for i in range(dimension)
     ]
     circuit.add_register(*values_reg)
 
     for i, val in enumerate(values):
-        circuit.append(encode_signed_int(val, bits), values_reg[i])
+        circuit.append(encode_signed_int(val, bits, encoding), values_reg[i])
 
     return circuit.to_gate(label="encode_vec")
+
+
+# transpiler options that place a circuit on a device, so they can only be
+# applied to the whole circuit
+LAYOUT_OPTIONS: tuple[str, ...] = (
+    "backend",
+    "coupling_map",
+    "initial_layout",
+    "layout_method",
+    "routing_method",
+)
+
+
+def _transpile_block(
+    operation: Instruction, transpile_options: dict
+) -> QuantumCircuit:
+    r"""
+    Returns the transpiled circuit of a single composite operation. The
+    operation itself is passed, so gates whose definition is synthesized
+    lazily are synthesized by the worker
+    """
+    circuit: QuantumCircuit = QuantumCircuit(operation.num_qubits)
+    circuit.append(operation, circuit.qubits)
+    return transpile(circuit, **transpile_options)
+
+
+def transpile_blocks(
+    circuit: QuantumCircuit,
+    executor: Optional[Executor] = None,
+    reps: int = 1,
+    **transpile_options,
+) -> QuantumCircuit:
+    r"""
+    Transpiles a circuit block by block. The gate hierarchy is unrolled
+    :code:`reps` levels (e.g. :code:`reps=1` turns a phase oracle into the
+    norm, comparison and subtraction gates of its marking oracle) and every
+    distinct composite gate at that level is transpiled once, in parallel
+    processes if an :code:`executor` is given. The transpiled blocks are
+    composed in circuit order and the result is transpiled again with
+    :code:`transpile_options`, which translates the remaining gates, maps
+    the circuit to the device for the options in :code:`LAYOUT_OPTIONS`
+    (which are not applied to the blocks) and optimizes across the block
+    boundaries. The circuit does not depend on the executor.
+    """
+    standard_gates = get_standard_gate_name_mapping()
+    block_options: dict = {
+        option: value
+        for option, value in transpile_options.items()
+        if option not in LAYOUT_OPTIONS
+    }
+
+    # (operation, qubit indices, clbits) in circuit order, where the
+    # operations of the blocks are kept by identity, so every gate shared
+    # through gate_cache is transpiled once
+    instructions: list[tuple[Instruction, list[int], list]] = []
+    blocks: dict[int, Instruction] = {}
+    global_phase = circuit.global_phase
+
+    def unroll(block: QuantumCircuit, qubits: list[int], level: int) -> None:
+        nonlocal global_phase
+        for instruction in block.data:
+            operation: Instruction = instruction.operation
+            indices: list[int] = [
+                qubits[block.find_bit(qubit).index] for qubit in instruction.qubits
+            ]
+            if (
+                instruction.clbits
+                or operation.name in standard_gates
+                or operation.definition is None
+            ):
+                instructions.append((operation, indices, instruction.clbits))
+            elif level < reps:
+                global_phase += operation.definition.global_phase
+                unroll(operation.definition, indices, level + 1)
+            else:
+                blocks.setdefault(id(operation), operation)
+                instructions.append((operation, indices, []))
+
+    unroll(circuit, list(range(circuit.num_qubits)), 0)
+
+    operations: list[Instruction] = list(blocks.values())
+    transpiled: dict[int, QuantumCircuit] = dict(
+        zip(
+            blocks,
+            (map if executor is None else executor.map)(
+                partial(_transpile_block, transpile_options=block_options),
+                operations,
+            ),
+        )
+    )
+
+    result: QuantumCircuit = QuantumCircuit(
+        *circuit.qregs, *circuit.cregs, name=circuit.name, global_phase=global_phase
+    )
+    for operation, indices, clbits in instructions:
+        qubits: list[Qubit] = [result.qubits[index] for index in indices]
+        if id(operation) in transpiled:
+            result.compose(transpiled[id(operation)], qubits, inplace=True)
+        else:
+            result.append(operation, qubits, clbits)
+
+    return transpile(result, **transpile_options)
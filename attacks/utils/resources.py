@@ -0,0 +1,346 @@
+# Hierarchical resource estimation:
+# The circuits in this package are deeply nested (an oracle contains norm
+# calculations, which contain multipliers, which contain controlled adders, ...)
+# and the same sub-gate is used many times. Instead of decomposing the whole
+# circuit we walk the gate hierarchy, count every distinct gate definition once
+# and multiply its counts by the number of times it is used.
+#
+# Counting conventions:
+#    * Gates are counted at the level of (multi-)controlled X gates. An X gate
+#      with k controls and k >= 3 is counted as 2k-3 Toffoli gates (the
+#      standard ladder using k-2 clean ancillas) and every Toffoli gate as 7
+#      T gates.
+#    * Controlled composite gates are counted by adding their controls to every
+#      gate of the base gate, i.e. no control synthesis is performed.
+#    * Depth is measured in (multi-)controlled X layers. Sub-gates are
+#      scheduled as rigid blocks, so the reported depth is an upper bound.
+r"""
+Resource estimation for the circuits in this package
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+from qiskit import QuantumCircuit
+from qiskit.circuit import ControlledGate, Instruction
+from qiskit.circuit.library.standard_gates import get_standard_gate_name_mapping
+
+
+_IGNORED = ("barrier", "id", "delay", "global_phase")
+_LEAVES = set(get_standard_gate_name_mapping()) - {"swap", "dcx", "cswap"}
+T_PER_TOFFOLI: int = 7
+
+
+def toffoli_cost(num_controls: int) -> int:
+    r"""
+    Returns the number of Toffoli gates an :math:`X` gate with
+    :code:`num_controls` controls is counted as
+    """
+    if num_controls < 2:
+        return 0
+    return 2 * num_controls - 3
+
+
+@dataclass
+class GateCounts:
+    r"""
+    Gate counts of a circuit.
+
+    :param controls: number of (multi-)controlled :math:`X` gates indexed by
+        their number of controls
+    :param other: number of any other gates indexed by name
+    :param depth: depth in (multi-)controlled :math:`X` layers
+    """
+
+    controls: Counter = field(default_factory=Counter)
+    other: Counter = field(default_factory=Counter)
+    depth: int = 0
+
+    @property
+    def x_count(self) -> int:
+        r"""
+        Number of uncontrolled :math:`X` gates
+        """
+        return self.controls[0]
+
+    @property
+    def cnot_count(self) -> int:
+        r"""
+        Number of CNOT gates
+        """
+        return self.controls[1]
+
+    @property
+    def mcx_count(self) -> int:
+        r"""
+        Number of :math:`X` gates with three or more controls
+        """
+        return sum(count for k, count in self.controls.items() if k >= 3)
+
+    @property
+    def toffoli_count(self) -> int:
+        r"""
+        Number of Toffoli gates, counting :math:`X` gates with more controls
+        according to :func:`toffoli_cost`
+        """
+        return sum(toffoli_cost(k) * count for k, count in self.controls.items())
+
+    @property
+    def t_count(self) -> int:
+        r"""
+        Number of :math:`T` gates needed for the Toffoli gates
+        """
+        return T_PER_TOFFOLI * self.toffoli_count
+
+    @property
+    def size(self) -> int:
+        r"""
+        Total number of gates
+        """
+        return sum(self.controls.values()) + sum(self.other.values())
+
+    def to_dict(self) -> dict:
+        r"""
+        Returns the counts as a JSON-serializable dictionary
+        """
+        return {
+            "x": self.x_count,
+            "cnot": self.cnot_count,
+            "toffoli": self.toffoli_count,
+            "t": self.t_count,
+            "mcx": self.mcx_count,
+            "depth": self.depth,
+            "controls": {str(k): count for k, count in sorted(self.controls.items())},
+            "other": dict(self.other),
+        }
+
+
+@dataclass
+class BlockResources:
+    r"""
+    Resources of a sub-gate (block) of a circuit.
+
+    :param name: name of the block
+    :param num_qubits: number of qubits the block acts on
+    :param num_ancillas: number of those qubits that are ancillas of the
+        estimated circuit (as seen at the first use of the block)
+    :param count: number of times the block is used in the estimated circuit
+    :param counts: gate counts of a single instance of the block
+    """
+
+    name: str
+    num_qubits: int
+    num_ancillas: int
+    count: int
+    counts: GateCounts
+
+    def to_dict(self) -> dict:
+        r"""
+        Returns the resources as a JSON-serializable dictionary
+        """
+        return {
+            "name": self.name,
+            "num_qubits": self.num_qubits,
+            "num_ancillas": self.num_ancillas,
+            "count": self.count,
+            **self.counts.to_dict(),
+        }
+
+
+@dataclass
+class ResourceReport:
+    r"""
+    Result of :func:`estimate_resources`.
+
+    :param num_qubits: number of qubits of the circuit
+    :param num_ancillas: number of ancillas of the circuit
+    :param total: gate counts of the whole circuit
+    :param blocks: resources of every distinct block, keyed by block name and
+        size
+    """
+
+    num_qubits: int
+    num_ancillas: int
+    total: GateCounts
+    blocks: dict[str, BlockResources]
+
+    def to_dict(self) -> dict:
+        r"""
+        Returns the report as a JSON-serializable dictionary
+        """
+        return {
+            "num_qubits": self.num_qubits,
+            "num_ancillas": self.num_ancillas,
+            **self.total.to_dict(),
+            "blocks": {key: block.to_dict() for key, block in self.blocks.items()},
+        }
+
+
+@dataclass
+class _Node:
+    r"""
+    Memoized counts of a gate definition together with the multiplicities of
+    the blocks it contains
+    """
+
+    counts: GateCounts
+    blocks: Counter
+    composite: bool = False
+    key: Optional[str] = None
+
+
+class _Estimator:
+    r"""
+    Walks a gate hierarchy, counting every gate definition once
+    """
+
+    def __init__(self) -> None:
+        self.nodes: dict[int, tuple[Instruction, _Node]] = {}
+        self.blocks: dict[str, BlockResources] = {}
+
+    def _register(
+        self, operation: Instruction, node: _Node, ancillas: tuple[bool, ...]
+    ) -> None:
+        r"""
+        Marks :code:`node` as a block. Blocks are keyed by name and size,
+        distinct blocks sharing both get a numbered suffix.
+        """
+        name: str = operation.label or operation.name
+        key: str = f"{name}[{operation.num_qubits}]"
+        suffix: int = 1
+        while key in self.blocks and self.blocks[key].counts != node.counts:
+            suffix += 1
+            key = f"{name}[{operation.num_qubits}]#{suffix}"
+
+        node.key = key
+        if key not in self.blocks:
+            self.blocks[key] = BlockResources(
+                name, operation.num_qubits, sum(ancillas), 0, node.counts
+            )
+
+    def walk_circuit(
+        self, circuit: QuantumCircuit, ancillas: tuple[bool, ...]
+    ) -> _Node:
+        r"""
+        Counts the gates of a circuit whose qubits are ancillas according to
+        :code:`ancillas`
+        """
+        counts = GateCounts()
+        blocks: Counter = Counter()
+        times: list[int] = [0] * circuit.num_qubits
+
+        for instruction in circuit.data:
+            qargs = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+            node = self.walk(
+                instruction.operation, tuple(ancillas[q] for q in qargs)
+            )
+            counts.controls.update(node.counts.controls)
+            counts.other.update(node.counts.other)
+            if node.counts.depth and qargs:
+                end = max(times[q] for q in qargs) + node.counts.depth
+                for q in qargs:
+                    times[q] = end
+
+            if node.key is not None:
+                blocks[node.key] += 1
+            for key, count in node.blocks.items():
+                blocks[key] += count
+
+        counts.depth = max(times, default=0)
+        return _Node(counts, blocks)
+
+    def walk(
+        self,
+        operation: Instruction,
+        ancillas: tuple[bool, ...],
+        register: bool = True,
+    ) -> _Node:
+        r"""
+        Counts the gates of an operation whose qubits are ancillas according
+        to :code:`ancillas`. Composite operations are recorded as blocks
+        unless :code:`register` is set to :code:`False`.
+        """
+        if id(operation) in self.nodes:
+            return self.nodes[id(operation)][1]
+
+        node: _Node = self._count(operation, ancillas)
+        if register:
+            if node.composite:
+                self._register(operation, node, ancillas)
+            # keep a reference to the operation so that its id is not reused
+            self.nodes[id(operation)] = (operation, node)
+
+        return node
+
+    def _count(self, operation: Instruction, ancillas: tuple[bool, ...]) -> _Node:
+        r"""
+        Counts the gates of a single operation
+        """
+        if isinstance(operation, ControlledGate):
+            num_ctrl: int = operation.num_ctrl_qubits
+            base: _Node = self.walk(operation.base_gate, ancillas[num_ctrl:])
+            counts = GateCounts(
+                Counter({k + num_ctrl: n for k, n in base.counts.controls.items()}),
+                Counter({f"c{num_ctrl}-{k}": n for k, n in base.counts.other.items()}),
+            )
+            # open controls are conjugated with X gates
+            open_controls: int = num_ctrl - bin(operation.ctrl_state).count("1")
+            if open_controls:
+                counts.controls[0] += 2 * open_controls
+            # every gate of the base gate acts on the control qubits
+            counts.depth = counts.size
+            return _Node(counts, Counter(), operation.base_gate.name != "x")
+
+        if operation.name == "x":
+            return _Node(GateCounts(Counter({0: 1}), Counter(), 1), Counter())
+
+        if operation.name in _IGNORED:
+            return _Node(GateCounts(), Counter())
+
+        if operation.name in _LEAVES or operation.definition is None:
+            return _Node(
+                GateCounts(Counter(), Counter({operation.name: 1}), 1), Counter()
+            )
+
+        definition: QuantumCircuit = operation.definition
+        if (
+            len(definition.data) == 1
+            and list(definition.data[0].qubits) == list(definition.qubits)
+        ):
+            # the circuits of this package wrap their gates in a gate of the
+            # same size, count them as a single block
+            inner: _Node = self.walk(
+                definition.data[0].operation, ancillas, register=False
+            )
+            return _Node(inner.counts, inner.blocks, True)
+
+        node: _Node = self.walk_circuit(definition, ancillas)
+        node.composite = operation.name not in ("swap", "dcx")
+        return node
+
+
+def estimate_resources(circuit: QuantumCircuit) -> ResourceReport:
+    r"""
+    Estimates the resources needed by a circuit without decomposing it. Every
+    distinct gate definition is counted once and its counts are multiplied by
+    the number of times it is used, so reusing the same gate objects (e.g.
+    through :data:`~attacks.utils.cache.gate_cache`) keeps the estimation
+    fast even for large oracles. See the module comments for the counting
+    conventions.
+
+    :param circuit: circuit to estimate
+    """
+    ancilla_qubits = set(circuit.ancillas)
+    ancillas = tuple(qubit in ancilla_qubits for qubit in circuit.qubits)
+
+    estimator = _Estimator()
+    root: _Node = estimator.walk_circuit(circuit, ancillas)
+
+    blocks: dict[str, BlockResources] = {}
+    for key, count in root.blocks.items():
+        block: BlockResources = estimator.blocks[key]
+        block.count = count
+        blocks[key] = block
+
+    return ResourceReport(
+        circuit.num_qubits, circuit.num_ancillas, root.counts, blocks
+    )
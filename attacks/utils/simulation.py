@@ -0,0 +1,197 @@
+# Bit-parallel simulation of classical reversible circuits:
+# All oracles in this package only permute computational basis states: after
+# decomposition they consist solely of X, CX and multi-controlled X gates. A
+# circuit of this kind can be simulated on many basis states at once by
+# storing, for every qubit, the value it takes on each input as one bit of a
+# uint64 word ("lane"). A (multi-)controlled X then becomes a handful of bitwise
+# operations on whole words.
+#
+# Circuits are flattened once: every gate definition is expanded recursively
+# (memoized per definition) and controlled composite gates are handled by
+# pushing their controls down to the X gates of their base gate, so Qiskit
+# never has to synthesize a controlled definition.
+r"""
+Fast simulation of classical reversible circuits
+"""
+from typing import Union
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.circuit import ControlledGate, Instruction
+
+
+_IGNORED = ("barrier", "id", "delay")
+
+
+class ReversibleSimulator:
+    r"""
+    Simulator for circuits consisting only of (multi-)controlled :math:`X`
+    gates, such as the circuits in :mod:`attacks.arithmetic`,
+    :mod:`attacks.memory` and the marking oracles of :mod:`attacks.grover`.
+    The circuit is flattened into a list of Toffoli-level gates once and can
+    then be evaluated on arbitrarily many computational basis states at once,
+    using one bit of a :code:`uint64` word per input.
+
+    :param circuit: circuit to simulate. A :code:`ValueError` is raised if it
+        contains a gate that is not a classical reversible gate.
+    """
+
+    def __init__(self, circuit: QuantumCircuit) -> None:
+        self.circuit: QuantumCircuit = circuit
+        self.num_qubits: int = circuit.num_qubits
+        self._definitions: dict[int, tuple] = {}
+        self.gates: list[tuple[int, tuple[int, ...], tuple[int, ...]]] = (
+            self._flatten(circuit)
+        )
+        self._definitions.clear()
+
+    def _flatten(self, circuit: QuantumCircuit) -> list[tuple]:
+        r"""
+        Returns the gates of :code:`circuit` as a list of
+        :code:`(target, controls, negated_controls)` tuples of qubit indices
+        """
+        gates: list[tuple] = []
+        for instruction in circuit.data:
+            if instruction.clbits:
+                raise ValueError(
+                    f"Gate {instruction.operation.name} acts on classical bits"
+                )
+
+            qargs = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+            for target, controls, negated in self._local_gates(
+                instruction.operation
+            ):
+                gates.append(
+                    (
+                        qargs[target],
+                        tuple(qargs[i] for i in controls),
+                        tuple(qargs[i] for i in negated),
+                    )
+                )
+
+        return gates
+
+    def _local_gates(self, operation: Instruction) -> list[tuple]:
+        r"""
+        Returns the flattened gates of :code:`operation` with qubit indices
+        relative to the operation. Results are memoized per gate definition.
+        """
+        key = id(operation)
+        if key in self._definitions:
+            return self._definitions[key][1]
+
+        if isinstance(operation, ControlledGate):
+            num_ctrl: int = operation.num_ctrl_qubits
+            controls = tuple(
+                i for i in range(num_ctrl) if (operation.ctrl_state >> i) & 1
+            )
+            negated = tuple(
+                i for i in range(num_ctrl) if not (operation.ctrl_state >> i) & 1
+            )
+            gates = [
+                (
+                    target + num_ctrl,
+                    tuple(i + num_ctrl for i in base_controls) + controls,
+                    tuple(i + num_ctrl for i in base_negated) + negated,
+                )
+                for target, base_controls, base_negated in self._local_gates(
+                    operation.base_gate
+                )
+            ]
+        elif operation.name == "x":
+            gates = [(0, (), ())]
+        elif operation.name in _IGNORED:
+            gates = []
+        elif operation.definition is not None:
+            gates = self._flatten(operation.definition)
+        else:
+            raise ValueError(
+                f"Gate {operation.name} is not a classical reversible gate"
+            )
+
+        # keep a reference to the operation so that its id is not reused
+        self._definitions[key] = (operation, gates)
+        return gates
+
+    def _register(self, register: Union[str, QuantumRegister]) -> list[int]:
+        r"""
+        Returns the qubit indices of a register given by name or by reference
+        """
+        if isinstance(register, str):
+            matches = [reg for reg in self.circuit.qregs if reg.name == register]
+            if not matches:
+                raise KeyError(f"No register named {register}")
+            register = matches[0]
+
+        return [self.circuit.find_bit(qubit).index for qubit in register]
+
+    def run_bits(self, bits: np.ndarray) -> np.ndarray:
+        r"""
+        Simulates the circuit on a batch of computational basis states.
+
+        :param bits: boolean array of shape :code:`(num_inputs, num_qubits)`
+            where column :code:`i` holds the value of qubit :code:`i`
+        :return: boolean array of the same shape with the output states
+        """
+        bits = np.asarray(bits, dtype=bool)
+        num_inputs: int = bits.shape[0]
+        num_words: int = max(1, -(-num_inputs // 64))
+
+        padded = np.zeros((self.num_qubits, num_words * 64), dtype=bool)
+        padded[:, :num_inputs] = bits.T
+        state = np.packbits(padded, axis=1, bitorder="little").view("<u8")
+        state = np.ascontiguousarray(state)
+
+        mask = np.empty(num_words, dtype=np.uint64)
+        for target, controls, negated in self.gates:
+            if controls:
+                np.copyto(mask, state[controls[0]])
+                for qubit in controls[1:]:
+                    np.bitwise_and(mask, state[qubit], out=mask)
+            else:
+                mask.fill(np.iinfo(np.uint64).max)
+            for qubit in negated:
+                np.bitwise_and(mask, ~state[qubit], out=mask)
+            np.bitwise_xor(state[target], mask, out=state[target])
+
+        unpacked = np.unpackbits(state.view(np.uint8), axis=1, bitorder="little")
+        return unpacked[:, :num_inputs].T.astype(bool)
+
+    def run(
+        self, inputs: dict[Union[str, QuantumRegister], np.ndarray]
+    ) -> dict[str, np.ndarray]:
+        r"""
+        Simulates the circuit on a batch of computational basis states given
+        register by register. Registers not in :code:`inputs` start in
+        :math:`|0\rangle`.
+
+        :param inputs: maps registers (or register names) to arrays of
+            unsigned integers, one entry per input state. Qubit :code:`j` of
+            a register holds bit :code:`j` of the integer.
+        :return: dictionary mapping every register name to an array of
+            :code:`uint64` values, one entry per input state
+        """
+        columns = {
+            key: np.atleast_1d(np.asarray(values, dtype=np.uint64))
+            for key, values in inputs.items()
+        }
+        num_inputs: int = max((len(values) for values in columns.values()), default=1)
+
+        bits = np.zeros((num_inputs, self.num_qubits), dtype=bool)
+        for key, values in columns.items():
+            for j, index in enumerate(self._register(key)):
+                bits[:, index] = (values >> np.uint64(j)) & np.uint64(1)
+
+        outputs = self.run_bits(bits)
+
+        results: dict[str, np.ndarray] = {}
+        for register in self.circuit.qregs:
+            if len(register) > 64:
+                raise ValueError(
+                    f"Register {register.name} is too wide to be read as an integer"
+                )
+            values = np.zeros(num_inputs, dtype=np.uint64)
+            for j, index in enumerate(self._register(register)):
+                values |= outputs[:, index].astype(np.uint64) << np.uint64(j)
+            results[register.name] = values
+
+        return results
@@ -0,0 +1,331 @@
+# Benchmark suite:
+# Every benchmark is a function of a grid point (dimension, bits, number of
+# address qubits, list size) returning the object it built, and is run twice:
+# once timed with time.perf_counter and once under tracemalloc for the peak
+# Python memory (tracemalloc slows allocation heavy code down, so it would
+# distort the timings). gate_cache is cleared before both runs, so every
+# construction is measured cold. Circuits are then summarized with a few
+# metrics (qubits, gate counts, depth), so regressions of both the
+# construction time and the circuits themselves are visible between versions.
+#
+# The operations are:
+#    * construct/<circuit>: building qRAM, Norm2, Compare, SignedAdder and the
+#      marking and phase oracles of ReductionOracle
+#    * decompose/<circuit>: unrolling DECOMPOSE_REPS levels of the gate
+#      hierarchy
+#    * transpile/<circuit>: transpiling to BASIS_GATES
+#    * simulate/<circuit>: matrix product state simulation with SHOTS shots
+#
+# Results are written as JSON and can be compared against a baseline file:
+#    python -m benchmarks.suite --output new.json --baseline old.json
+r"""
+Benchmarks of circuit construction, transpilation and simulation
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional
+import numpy as np
+import qiskit
+from qiskit import QuantumCircuit, execute, transpile
+from qiskit_aer import AerSimulator
+from attacks.arithmetic.operations import Compare, SignedAdder
+from attacks.arithmetic.vectors import Norm2
+from attacks.grover.oracles import ReductionOracle
+from attacks.memory.qram import qRAM
+from attacks.utils.cache import gate_cache
+from attacks.utils.quantum import encode_signed_int
+from attacks.utils.resources import estimate_resources
+
+
+BASIS_GATES: list[str] = ["cx", "u"]
+DECOMPOSE_REPS: int = 3
+SHOTS: int = 1024
+
+
+@dataclass(frozen=True)
+class GridPoint:
+    r"""
+    Parameters of one benchmark run
+
+    :param dimension: dimension of the vectors
+    :param bits: number of bits of each vector component
+    :param num_address_qubits: number of address qubits of the oracles
+    :param list_size: number of vectors stored in the qRAM
+    """
+
+    dimension: int
+    bits: int
+    num_address_qubits: int
+    list_size: int
+
+
+DEFAULT_GRID: list[GridPoint] = [
+    GridPoint(2, 4, 2, 4),
+    GridPoint(2, 5, 2, 4),
+    GridPoint(3, 4, 2, 4),
+    GridPoint(2, 4, 3, 8),
+]
+QUICK_GRID: list[GridPoint] = [GridPoint(2, 4, 2, 4)]
+
+
+@dataclass
+class BenchmarkResult:
+    r"""
+    Result of one benchmark at one grid point
+
+    :param name: name of the benchmark
+    :param params: the grid point
+    :param seconds: wall clock time
+    :param peak_memory: peak memory allocated by Python (bytes), or
+        :code:`None` if it was not measured
+    :param metrics: metrics of the built object, e.g. gate counts
+    """
+
+    name: str
+    params: dict[str, int]
+    seconds: float
+    peak_memory: Optional[int]
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+
+def _vectors(point: GridPoint, seed: int = 0) -> list[list[int]]:
+    r"""
+    Returns :code:`point.list_size` random vectors fitting the grid point,
+    with differences that fit as well
+    """
+    bound: int = 1 << (point.bits - 2)
+    rng = np.random.default_rng(seed)
+    shape: tuple[int, int] = (point.list_size, point.dimension)
+    return rng.integers(-bound + 1, bound, shape).tolist()
+
+
+def _oracle(point: GridPoint) -> ReductionOracle:
+    return ReductionOracle(point.num_address_qubits, point.dimension, point.bits)
+
+
+def _norm_width(point: GridPoint) -> int:
+    # width of the comparisons of the oracles
+    return 2 * (point.bits - 1) + point.dimension + 1
+
+
+def _simulate_qram(point: GridPoint) -> dict[str, int]:
+    qram: qRAM = qRAM(_vectors(point), point.bits)
+    circuit: QuantumCircuit = QuantumCircuit(*qram.qregs)
+    circuit.h(qram.address_register)
+    circuit.append(qram, circuit.qubits)
+    circuit.measure_all()
+    simulator = AerSimulator(method="matrix_product_state")
+    return execute(circuit, simulator, shots=SHOTS).result().get_counts()
+
+
+def _simulate_oracle(point: GridPoint) -> dict[str, int]:
+    oracle: QuantumCircuit = _oracle(point)._marking_oracle()
+    v, p = _vectors(point)[:2]
+    circuit: QuantumCircuit = QuantumCircuit(*oracle.qregs)
+    # the components are located by name, the oracles order their registers
+    # differently
+    for name, vector in (("v", v), ("p", p)):
+        for i, value in enumerate(vector):
+            offsets = oracle.register_layout[f"{name}_{i}"].offsets
+            circuit.append(
+                encode_signed_int(value, point.bits),
+                [circuit.qubits[offset] for offset in offsets],
+            )
+    circuit.append(oracle, circuit.qubits)
+    circuit.measure_all()
+    simulator = AerSimulator(method="matrix_product_state")
+    return execute(circuit, simulator, shots=SHOTS).result().get_counts()
+
+
+CONSTRUCTIONS: dict[str, Callable[[GridPoint], QuantumCircuit]] = {
+    "qRAM": lambda point: qRAM(_vectors(point), point.bits),
+    "Norm2": lambda point: Norm2(point.dimension, point.bits),
+    "Compare": lambda point: Compare(_norm_width(point), ">"),
+    "SignedAdder": lambda point: SignedAdder(point.bits),
+    "marking_oracle": lambda point: _oracle(point)._marking_oracle(),
+    "phase_oracle": lambda point: _oracle(point).phase_oracle(),
+}
+
+BENCHMARKS: dict[str, Callable[[GridPoint], Any]] = {
+    **{f"construct/{name}": build for name, build in CONSTRUCTIONS.items()},
+    **{
+        f"decompose/{name}": (
+            lambda point, build=build: build(point).decompose(reps=DECOMPOSE_REPS)
+        )
+        for name, build in CONSTRUCTIONS.items()
+        if name in ("Norm2", "marking_oracle")
+    },
+    **{
+        f"transpile/{name}": (
+            lambda point, build=build: transpile(
+                build(point), basis_gates=BASIS_GATES, optimization_level=0
+            )
+        )
+        for name, build in CONSTRUCTIONS.items()
+        if name in ("Norm2", "marking_oracle")
+    },
+    "simulate/qRAM": _simulate_qram,
+    "simulate/marking_oracle": _simulate_oracle,
+}
+
+
+def _metrics(name: str, value: Any) -> dict[str, Any]:
+    r"""
+    Returns the metrics of the object built by a benchmark
+    """
+    if not isinstance(value, QuantumCircuit):
+        return {"outcomes": len(value)}
+    metrics: dict[str, Any] = {"num_qubits": value.num_qubits}
+    if name.startswith("construct/"):
+        total = estimate_resources(value).total
+        metrics.update(toffoli_count=total.toffoli_count, depth=total.depth)
+    else:
+        metrics.update(
+            size=value.size(),
+            depth=value.depth(),
+            count_ops=dict(value.count_ops()),
+        )
+    return metrics
+
+
+def run_benchmark(
+    name: str, point: GridPoint, memory: bool = True
+) -> BenchmarkResult:
+    r"""
+    Runs one benchmark at one grid point
+
+    :param name: name of the benchmark, a key of :code:`BENCHMARKS`
+    :param point: the grid point
+    :param memory: whether to measure the peak memory as well
+    """
+    benchmark: Callable[[GridPoint], Any] = BENCHMARKS[name]
+    gate_cache.clear()
+    start: float = time.perf_counter()
+    value: Any = benchmark(point)
+    seconds: float = time.perf_counter() - start
+
+    peak_memory: Optional[int] = None
+    if memory:
+        gate_cache.clear()
+        tracemalloc.start()
+        benchmark(point)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name, asdict(point), seconds, peak_memory, _metrics(name, value)
+    )
+
+
+def run_suite(
+    grid: Optional[list[GridPoint]] = None,
+    names: Optional[list[str]] = None,
+    memory: bool = True,
+) -> dict[str, Any]:
+    r"""
+    Runs the benchmarks on every grid point and returns the JSON report
+
+    :param grid: grid points, defaults to :code:`DEFAULT_GRID`
+    :param names: benchmarks to run, defaults to all of them
+    :param memory: whether to measure the peak memory as well
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    names = list(BENCHMARKS) if names is None else names
+    results: list[BenchmarkResult] = [
+        run_benchmark(name, point, memory) for point in grid for name in names
+    ]
+    return {"environment": _environment(), "results": [asdict(r) for r in results]}
+
+
+def _environment() -> dict[str, Optional[str]]:
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "qiskit": qiskit.__qiskit_version__["qiskit-terra"],
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    report: dict[str, Any],
+    tolerance: float = 0.2,
+    min_seconds: float = 0.05,
+) -> list[str]:
+    r"""
+    Compares a report with a baseline report and returns a description of
+    every benchmark that got slower by more than :code:`tolerance` (relative)
+    or whose circuit metrics changed
+
+    :param baseline: the baseline report
+    :param report: the new report
+    :param tolerance: allowed relative increase of the time
+    :param min_seconds: times below this are too noisy to be compared
+    """
+
+    def key(result: dict[str, Any]) -> tuple:
+        return result["name"], tuple(sorted(result["params"].items()))
+
+    previous: dict[tuple, dict[str, Any]] = {
+        key(result): result for result in baseline["results"]
+    }
+    changes: list[str] = []
+    for result in report["results"]:
+        old: Optional[dict[str, Any]] = previous.get(key(result))
+        if old is None:
+            continue
+        label: str = f"{result['name']} {result['params']}"
+        if result["seconds"] > max((1 + tolerance) * old["seconds"], min_seconds):
+            changes.append(
+                f"{label}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s"
+            )
+        for metric, value in result["metrics"].items():
+            if metric in old["metrics"] and old["metrics"][metric] != value:
+                changes.append(
+                    f"{label}: {metric} {old['metrics'][metric]} -> {value}"
+                )
+    return changes
+
+
+def main(args: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--output", default="benchmarks.json")
+    parser.add_argument("--quick", action="store_true", help="run on QUICK_GRID")
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the memory measurements"
+    )
+    parser.add_argument("--baseline", help="report to compare the results with")
+    parsed = parser.parse_args(args)
+
+    report: dict[str, Any] = run_suite(
+        QUICK_GRID if parsed.quick else DEFAULT_GRID,
+        parsed.only,
+        memory=not parsed.no_memory,
+    )
+    with open(parsed.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for result in report["results"]:
+        print(f"{result['name']:32} {result['params']} {result['seconds']:8.3f}s")
+    if parsed.baseline:
+        with open(parsed.baseline, encoding="utf-8") as file:
+            changes: list[str] = compare(json.load(file), report)
+        print("\n".join(changes) if changes else "No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import numpy as np
+from qiskit import QuantumCircuit, ClassicalRegister, execute
+from qiskit_aer import AerSimulator
+from attacks.arithmetic.adders import (
+    CarryLookaheadAdder,
+    DRAPER,
+    LOOKAHEAD,
+    RIPPLE,
+    VEDRAL,
+)
+from attacks.arithmetic.operations import SignedAdder
+from attacks.arithmetic.vectors import Norm2
+from attacks.utils.classical import from_bit_patterns, to_bit_patterns
+from attacks.utils.quantum import encode_signed_int
+from attacks.utils.resources import estimate_resources
+from attacks.utils.simulation import ReversibleSimulator
+
+
+def test_CarryLookaheadAdder():
+    for num_bits in range(1, 7):
+        a, b = np.divmod(np.arange(1 << (2 * num_bits)), 1 << num_bits)
+        result = ReversibleSimulator(CarryLookaheadAdder(num_bits)).run(
+            {"a": a, "b": b}
+        )
+
+        assert np.array_equal(result["a"], a)
+        assert np.array_equal(result["b"], (a + b) % (1 << num_bits))
+        assert np.array_equal(result["cout"], (a + b) >> num_bits)
+        assert not np.any(result["carries"]) and not np.any(result["helper"])
+
+        control = np.arange(len(a)) % 2
+        result = ReversibleSimulator(LOOKAHEAD.controlled(num_bits)).run(
+            {"control": control, "a": a, "b": b}
+        )
+        assert np.array_equal(
+            result["b"], np.where(control, (a + b) % (1 << num_bits), b)
+        )
+        assert np.array_equal(result["cout"], control & ((a + b) >> num_bits))
+        assert not np.any(result["fanout"])
+
+    lookahead = estimate_resources(LOOKAHEAD.circuit(32)).total
+    ripple = estimate_resources(RIPPLE.circuit(32)).total
+    assert 2 * lookahead.depth < ripple.depth
+
+
+def test_adder_backends():
+    rng = np.random.default_rng(2)
+    values = rng.integers(-7, 8, size=(64, 3))
+    for adder in (VEDRAL, LOOKAHEAD):
+        result = ReversibleSimulator(SignedAdder(5, adder=adder)).run(
+            {
+                "num1": to_bit_patterns(values[:, 0], 5),
+                "num2": to_bit_patterns(values[:, 1], 5),
+            }
+        )
+        assert np.array_equal(
+            from_bit_patterns(result["num2"], 5), values[:, 0] + values[:, 1]
+        )
+
+        for use_squarer in (False, True):
+            norm_calc = Norm2(3, 4, use_squarer=use_squarer, adder=adder)
+            inputs = {}
+            for i in range(3):
+                inputs[f"val_{i}"] = np.abs(values[:, i]) & 7
+                inputs[f"sgn_{i}"] = (values[:, i] < 0).astype(int)
+            result = ReversibleSimulator(norm_calc).run(inputs)
+            assert np.array_equal(
+                result["norm"], np.sum((np.abs(values) & 7) ** 2, axis=1)
+            )
+
+    # the QFT adder is not a classical reversible circuit
+    signed_adder = SignedAdder(4, adder=DRAPER)
+    # 4 + 4 qubits for the summands, the carry and 7 helpers of the incrementer
+    assert signed_adder.num_qubits == 16
+    simulator = AerSimulator(method="matrix_product_state")
+    for num_1, num_2 in [(-3, 2), (5, -7), (1, 4)]:
+        circuit = QuantumCircuit(signed_adder.num_qubits)
+        circuit.append(encode_signed_int(num_1, 4), circuit.qubits[0:4])
+        circuit.append(encode_signed_int(num_2, 4), circuit.qubits[4:8])
+        circuit.append(signed_adder, circuit.qubits)
+
+        result_reg = ClassicalRegister(4)
+        circuit.add_register(result_reg)
+        circuit.measure(circuit.qubits[4:8], result_reg)
+        result = execute(circuit, simulator, shots=16).result().get_counts()
+
+        expected = abs(num_1 + num_2) + 8 * (num_1 + num_2 < 0)
+        assert result == {bin(expected)[2:].zfill(4): 16}
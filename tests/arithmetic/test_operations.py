@@ -1,8 +1,14 @@
+import numpy as np
 import pytest
 from qiskit import QuantumCircuit, ClassicalRegister, execute
+from qiskit.circuit.library import HRSCumulativeMultiplier
 from qiskit_aer import AerSimulator
-from attacks.utils.quantum import encode_signed_int
-from attacks.arithmetic.operations import SignedAdder, Compare
+from attacks.utils.classical import from_bit_patterns, to_bit_patterns
+from attacks.utils.quantum import encode_signed_int, parallel_controlled_incr
+from attacks.utils.resources import estimate_resources
+from attacks.utils.simulation import ReversibleSimulator
+from attacks.arithmetic.adders import LOOKAHEAD, RIPPLE, VEDRAL
+from attacks.arithmetic.operations import SignedAdder, Compare, Square
 
 
 def test_SignedAdder():
@@ -30,6 +36,33 @@ def test_SignedAdder():
         assert len(result) == 1 and value == num_1 + num_2
 
 
+def test_SignedAdder_parallel_incr():
+    # the end-around carry is added with the log-depth incrementer on the
+    # helper qubits of every adder backend
+    rng = np.random.default_rng(13)
+    for adder in (RIPPLE, VEDRAL, LOOKAHEAD):
+        for bits in (4, 9):
+            num_1, num_2 = rng.integers(
+                -(1 << (bits - 2)) + 1, 1 << (bits - 2), (2, 256)
+            )
+            signed_adder = SignedAdder(bits, adder=adder)
+            assert len(signed_adder.qregs[-1]) == max(
+                adder.num_ancillas(bits),
+                parallel_controlled_incr(bits).num_ancillas,
+            )
+            result = ReversibleSimulator(signed_adder).run(
+                {
+                    "num1": to_bit_patterns(num_1, bits),
+                    "num2": to_bit_patterns(num_2, bits),
+                }
+            )
+
+            assert np.array_equal(
+                from_bit_patterns(result["num2"], bits), num_1 + num_2
+            )
+            assert not np.any(result["helper"])
+
+
 def test_Compare():
     test_vals = [-5, -2, 0, 1, 4]
     simulator = AerSimulator(method="matrix_product_state")
@@ -54,3 +87,51 @@ def test_Compare():
 
     with pytest.raises(ValueError):
         comparator = Compare(5, cmp="!=")
+
+
+def test_Compare_carry():
+    bits = 4
+    values = np.arange(-(1 << (bits - 1)) + 1, 1 << (bits - 1))
+    num_1, num_2 = (x.ravel() for x in np.meshgrid(values, values))
+    mask = (1 << (bits - 1)) - 1
+
+    for encoding in ["sign-magnitude", "twos-complement"]:
+        patterns_1 = to_bit_patterns(num_1, bits, encoding)
+        patterns_2 = to_bit_patterns(num_2, bits, encoding)
+        inputs = {
+            "val_1": patterns_1 & mask,
+            "sgn1": patterns_1 >> (bits - 1),
+            "val_2": patterns_2 & mask,
+            "sgn2": patterns_2 >> (bits - 1),
+        }
+        for cmp in ["==", ">", "<", ">=", "<="]:
+            comparator = Compare(bits, cmp=cmp, encoding=encoding, mode="carry")
+            result = ReversibleSimulator(comparator).run(inputs)
+
+            expected = eval(f"num_1 {cmp} num_2")
+            assert np.array_equal(result["result"], expected)
+            for name, value in inputs.items():
+                assert np.array_equal(result[name], value)
+            assert not np.any(result["carry_in"])
+
+    carry = estimate_resources(Compare(8, mode="carry")).total
+    difference = estimate_resources(Compare(8)).total
+    assert 2 * carry.toffoli_count < difference.toffoli_count
+
+    with pytest.raises(ValueError):
+        Compare(5, mode="borrow")
+
+
+def test_Square():
+    for num_bits in range(1, 7):
+        values = np.arange(1 << num_bits)
+        result = ReversibleSimulator(Square(num_bits)).run({"x": values})
+
+        assert np.array_equal(result["out"], values**2)
+        assert np.array_equal(result["x"], values)
+        assert not np.any(result["helper"])
+
+    square = estimate_resources(Square(6)).total
+    multiplier = estimate_resources(HRSCumulativeMultiplier(6)).total
+    assert square.toffoli_count < multiplier.toffoli_count
+    assert square.depth < multiplier.depth
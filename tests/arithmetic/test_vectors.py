@@ -1,7 +1,12 @@
+import numpy as np
+import pytest
 from qiskit import QuantumCircuit, ClassicalRegister, execute
 from qiskit_aer import AerSimulator
 from attacks.arithmetic.vectors import Norm2
+from attacks.utils.classical import to_bit_patterns
 from attacks.utils.quantum import encode_signed_int
+from attacks.utils.resources import estimate_resources
+from attacks.utils.simulation import ReversibleSimulator
 
 
 def test_Norm2():
@@ -30,3 +35,46 @@ def test_Norm2():
 
     norm = sum([v**2 for v in vec])
     assert result == {bin(norm)[2::].zfill(result_bits): 1024}
+
+
+def test_Norm2_squarer():
+    rng = np.random.default_rng(1)
+    vectors = rng.integers(-15, 16, size=(200, 3))
+
+    norm_calc = Norm2(3, 5, use_squarer=True)
+    inputs = {}
+    for i in range(3):
+        patterns = to_bit_patterns(vectors[:, i], 5)
+        inputs[f"val_{i}"] = patterns & 15
+        inputs[f"sgn_{i}"] = patterns >> np.uint64(4)
+
+    result = ReversibleSimulator(norm_calc).run(inputs)
+    assert np.array_equal(result["norm"], np.sum(vectors**2, axis=1))
+
+    multiplier = estimate_resources(Norm2(3, 5))
+    squarer = estimate_resources(norm_calc)
+    assert squarer.num_qubits < multiplier.num_qubits
+    assert squarer.total.toffoli_count < multiplier.total.toffoli_count
+
+
+def test_Norm2_norm_bits():
+    rng = np.random.default_rng(2)
+    vectors = rng.integers(-15, 16, size=(200, 3))
+    vectors = vectors[np.sum(vectors**2, axis=1) < 1 << 8]
+
+    for encoding in ["sign-magnitude", "twos-complement"]:
+        norm_calc = Norm2(3, 5, encoding=encoding, norm_bits=8)
+        assert len(norm_calc.result_register) == 8
+
+        inputs = {}
+        for i in range(3):
+            patterns = to_bit_patterns(vectors[:, i], 5, encoding)
+            inputs[f"val_{i}"] = patterns & 15
+            inputs[f"sgn_{i}"] = patterns >> np.uint64(4)
+
+        result = ReversibleSimulator(norm_calc).run(inputs)
+        assert np.array_equal(result["norm"], np.sum(vectors**2, axis=1))
+        assert norm_calc.num_qubits < Norm2(3, 5, encoding=encoding).num_qubits
+
+    with pytest.raises(ValueError):
+        Norm2(3, 5, norm_bits=12)
@@ -0,0 +1,46 @@
+import json
+from benchmarks.suite import (
+    BENCHMARKS,
+    GridPoint,
+    _oracle,
+    _vectors,
+    compare,
+    main,
+    run_suite,
+)
+
+
+def test_run_suite(tmp_path):
+    names = ["construct/Norm2", "construct/SignedAdder", "simulate/qRAM"]
+    report = run_suite([GridPoint(2, 3, 1, 2)], names)
+    assert [result["name"] for result in report["results"]] == names
+    for result in report["results"]:
+        assert result["seconds"] > 0 and result["peak_memory"] > 0
+    assert report["results"][0]["metrics"]["num_qubits"] > 0
+    assert report["results"][2]["metrics"]["outcomes"] == 2
+    assert json.loads(json.dumps(report)) == report
+
+    assert compare(report, report) == []
+    slower = json.loads(json.dumps(report))
+    slower["results"][0]["seconds"] = 10.0
+    slower["results"][1]["metrics"]["toffoli_count"] += 1
+    changes = compare(report, slower)
+    assert len(changes) == 2
+    assert "construct/Norm2" in changes[0] and "toffoli_count" in changes[1]
+
+    output = tmp_path / "report.json"
+    main(["--quick", "--no-memory", "--only", "construct/qRAM", "-o", str(output)])
+    saved = json.loads(output.read_text())
+    assert saved["results"][0]["peak_memory"] is None
+    assert set(BENCHMARKS) >= {"transpile/marking_oracle", "decompose/Norm2"}
+
+
+def test_simulate_oracle():
+    # v and p are encoded into the registers of the same name
+    point = GridPoint(2, 3, 1, 2)
+    counts = BENCHMARKS["simulate/marking_oracle"](point)
+    layout = _oracle(point)._marking_oracle().register_layout
+    values = layout.decode(counts, names=["v_0", "v_1", "p_0", "p_1"])
+    v, p = _vectors(point)[:2]
+    assert [int(values[f"v_{i}"][0]) for i in range(2)] == v
+    assert [int(values[f"p_{i}"][0]) for i in range(2)] == p
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from attacks.grover.emulation import GroverEmulator, SearchOutcome, reduction_marks
+
+
+def test_reduction_marks():
+    rng = np.random.default_rng(0)
+    vectors = rng.integers(-7, 8, size=(50, 3))
+    p = rng.integers(-7, 8, size=3)
+    for first in (True, False):
+        marks = reduction_marks(vectors, p, first)
+        products = 2 * (vectors @ p)
+        norms = np.sum(vectors**2, axis=1)
+        if first:
+            assert np.array_equal(marks, (norms <= p @ p) & (norms < products))
+        else:
+            assert np.array_equal(marks, (norms > p @ p) & (p @ p <= products))
+        # the zero vector stored beyond the list is never marked
+        assert not reduction_marks([[0, 0, 0]], p, first)[0]
+
+
+def test_GroverEmulator():
+    marked = np.zeros(6, dtype=bool)
+    marked[[1, 4]] = True
+    emulator = GroverEmulator(marked, seed=0)
+    assert emulator.num_states == 8 and emulator.num_marked == 2
+
+    # compare with the state vector of Grover's algorithm
+    oracle = np.diag(np.where(np.arange(8) < 6, 1 - 2 * np.pad(marked, (0, 2)), 1))
+    uniform = np.full(8, 1 / np.sqrt(8))
+    diffusion = 2 * np.outer(uniform, uniform) - np.eye(8)
+    state = uniform
+    for k in range(6):
+        probability = np.sum(state[[1, 4]] ** 2)
+        assert emulator.success_probability(k) == pytest.approx(probability)
+        state = diffusion @ oracle @ state
+    assert emulator.optimal_iterations() == 1
+    assert emulator.success_probability(1) == pytest.approx(1)
+
+    addresses = emulator.measure(0, shots=80000)
+    frequencies = np.bincount(addresses, minlength=8) / len(addresses)
+    assert frequencies == pytest.approx(np.full(8, 1 / 8), abs=0.01)
+    assert set(emulator.measure(1, shots=100).tolist()) <= {1, 4}
+
+    large = GroverEmulator(np.arange(10**6) == 123456, seed=1)
+    assert large.num_address_qubits == 20
+    outcome = large.search()
+    assert outcome.address == 123456
+    assert outcome.queries <= np.ceil(9 * 2**10)
+    assert large.search([large.optimal_iterations()]).queries == 804
+
+    empty = GroverEmulator(np.zeros(100, dtype=bool), seed=2)
+    assert empty.optimal_iterations() == 0
+    outcome = empty.search()
+    assert not outcome.found and 0 < outcome.queries <= 9 * 16
+    assert empty.search([3, 3], max_queries=4) == SearchOutcome(None, 3, 1)
+    # a round without iterations still measures and checks an address
+    assert empty.search([0, 0, 2]) == SearchOutcome(None, 4, 3)
+
+    # the expected number of queries of BBHT is at most 9/4 sqrt(N/M)
+    for num_marked in (1, 4, 64):
+        emulator = GroverEmulator(np.arange(1024) < num_marked, seed=3)
+        queries = [emulator.search().queries for _ in range(500)]
+        assert np.mean(queries) <= 9 / 4 * np.sqrt(1024 / num_marked)
+
+    with pytest.raises(ValueError):
+        GroverEmulator(marked, num_address_qubits=2)
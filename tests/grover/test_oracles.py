@@ -1,6 +1,11 @@
+import itertools
+import numpy as np
+import pytest
 from qiskit import QuantumCircuit, execute
 from qiskit_aer import AerSimulator
+from attacks.utils.classical import to_bit_patterns
 from attacks.utils.quantum import encode_vector
+from attacks.utils.simulation import ReversibleSimulator
 from attacks.grover.oracles import ReductionOracle
 
 
@@ -21,7 +26,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "10000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000110010000100": 1024
+        "1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000110010000100": 1024
     }
 
     circuit = QuantumCircuit(*second_oracle.qregs)
@@ -33,7 +38,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000110010000100": 1024
+        "0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000110010000100": 1024
     }
 
     # The same holds for (1, 2) and (-1, 2)
@@ -46,7 +51,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "10000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001010010010000100": 1024
+        "1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001010010010000100": 1024
     }
 
     circuit = QuantumCircuit(*second_oracle.qregs)
@@ -58,7 +63,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001010010010000100": 1024
+        "0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001010010010000100": 1024
     }
 
     # (-1, 2) and (0, 2) satisfy the conditions for the second oracle but not
@@ -72,7 +77,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "10000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000010100100": 1024
+        "1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000010100100": 1024
     }
 
     circuit = QuantumCircuit(*first_oracle.qregs)
@@ -84,7 +89,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000010100100": 1024
+        "0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000010100100": 1024
     }
 
     # (1, 3) and (-1, 1) satisfy the conditions for the second oracle but not
@@ -98,7 +103,7 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "10000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000110010011000100": 1024
+        "1000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000110010011000100": 1024
     }
 
     circuit = QuantumCircuit(*first_oracle.qregs)
@@ -110,5 +115,127 @@ def test_ReductionOracle():
     result = execute(circuit, simulator, shots=1024).result().get_counts()
 
     assert result == {
-        "00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000110010011000100": 1024
+        "0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000110010011000100": 1024
     }
+
+
+def test_combined_oracle():
+    oracle = ReductionOracle(2, 2, 4)
+
+    values = range(-3, 4)
+    combos = np.array(list(itertools.product(values, repeat=4)))
+    v, p = combos[:, :2], combos[:, 2:]
+
+    inputs = {}
+    for i in range(2):
+        inputs[f"v_{i}"] = to_bit_patterns(v[:, i], 4)
+        inputs[f"p_{i}"] = to_bit_patterns(p[:, i], 4)
+
+    v_norm = np.sum(v**2, axis=1)
+    p_norm = np.sum(p**2, axis=1)
+    diff_norm = np.sum((p - v) ** 2, axis=1)
+    first = (v_norm <= p_norm) & (diff_norm < p_norm)
+    second = (v_norm > p_norm) & (diff_norm <= v_norm)
+
+    result = ReversibleSimulator(oracle._combined_marking_oracle("both")).run(inputs)
+    assert np.array_equal(result["first_result"], first)
+    assert np.array_equal(result["second_result"], second)
+    for name, value in result.items():
+        if name in inputs:
+            assert np.array_equal(value, inputs[name])
+        elif not name.endswith("result"):
+            assert not np.any(value)
+
+    for mark, expected in [
+        ("first", first),
+        ("second", second),
+        ("either", first | second),
+    ]:
+        circuit = oracle._combined_marking_oracle(mark)
+        result = ReversibleSimulator(circuit).run(inputs)
+        assert np.array_equal(result["final_result"], expected)
+        assert circuit.qregs[-1].name == "final_result"
+
+    with pytest.raises(ValueError):
+        oracle.combined_phase_oracle("both")
+
+    # the carry comparator leaves ||v|| unchanged, so it needs no copy of it
+    carry_oracle = ReductionOracle(2, 2, 4, comparator="carry")
+    carry = carry_oracle._combined_marking_oracle("both")
+    assert r"\|v\|_copy" not in [reg.name for reg in carry.qregs]
+    result = ReversibleSimulator(carry).run(inputs)
+    assert np.array_equal(result["first_result"], first)
+    assert np.array_equal(result["second_result"], second)
+
+
+def test_min_width_oracle():
+    values = range(-3, 4)
+    combos = np.array(list(itertools.product(values, repeat=4)))
+    v, p = combos[:, :2], combos[:, 2:]
+
+    inputs = {}
+    for i in range(2):
+        inputs[f"v_{i}"] = to_bit_patterns(v[:, i], 4)
+        inputs[f"p_{i}"] = to_bit_patterns(p[:, i], 4)
+
+    v_norm = np.sum(v**2, axis=1)
+    p_norm = np.sum(p**2, axis=1)
+    diff_norm = np.sum((p - v) ** 2, axis=1)
+
+    for first, expected in [
+        (True, (v_norm <= p_norm) & (diff_norm < p_norm)),
+        (False, (v_norm > p_norm) & (diff_norm <= v_norm)),
+    ]:
+        oracle = ReductionOracle(2, 2, 4)._marking_oracle(first, min_width=True)
+        assert oracle.num_qubits < 100
+        assert oracle.qregs[-1].name == "final_result"
+
+        result = ReversibleSimulator(oracle).run(inputs)
+        assert np.array_equal(result["final_result"], expected)
+        for name, value in result.items():
+            if name in inputs:
+                assert np.array_equal(value, inputs[name])
+            elif name != "final_result":
+                assert not np.any(value)
+
+
+def test_twos_complement_oracle():
+    encoding = "twos-complement"
+    oracle = ReductionOracle(2, 2, 4, encoding=encoding)
+
+    values = range(-7, 8)
+    combos = np.array(list(itertools.product(values, repeat=4)))
+    v, p = combos[:, :2], combos[:, 2:]
+    fits = np.all(np.abs(p - v) < 8, axis=1)
+    v, p = v[fits], p[fits]
+
+    inputs = {}
+    for i in range(2):
+        inputs[f"v_{i}"] = to_bit_patterns(v[:, i], 4, encoding)
+        inputs[f"p_{i}"] = to_bit_patterns(p[:, i], 4, encoding)
+
+    v_norm = np.sum(v**2, axis=1)
+    p_norm = np.sum(p**2, axis=1)
+    diff_norm = np.sum((p - v) ** 2, axis=1)
+    first = (v_norm <= p_norm) & (diff_norm < p_norm)
+    second = (v_norm > p_norm) & (diff_norm <= v_norm)
+
+    for circuit, results in [
+        (oracle._marking_oracle(True), {"final_result": first}),
+        (oracle._marking_oracle(False, min_width=True), {"final_result": second}),
+        (
+            oracle._combined_marking_oracle("both"),
+            {"first_result": first, "second_result": second},
+        ),
+    ]:
+        result = ReversibleSimulator(circuit).run(inputs)
+        for name, value in result.items():
+            if name in results:
+                assert np.array_equal(value, results[name])
+            elif name in inputs:
+                assert np.array_equal(value, inputs[name])
+            else:
+                assert not np.any(value)
+
+    with pytest.raises(ValueError):
+        ReductionOracle(2, 2, 4, encoding="ones-complement")
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from attacks.utils.classical import to_bit_patterns
+from attacks.utils.simulation import ReversibleSimulator
+from attacks.grover.oracles import ReductionOracle
+from attacks.grover.planning import plan_widths, signed_bits, unsigned_bits
+
+
+def test_bits():
+    assert signed_bits([0]) == 2
+    assert signed_bits([3, -1]) == 3
+    assert signed_bits([-4, 2]) == 4
+    assert unsigned_bits([0]) == 1
+    assert unsigned_bits([5, 8]) == 4
+
+
+def test_plan_widths():
+    vectors = np.array([[1, 2], [3, -1], [0, 2]])
+    p = np.array([2, 1])
+    plan = plan_widths(vectors, p)
+
+    assert plan.component_bits == 3
+    assert plan.difference_bits == 3
+    assert plan.norm_bits == 4
+    assert plan.num_address_qubits == 2
+
+    qram = plan.qram(vectors)
+    assert len(qram.memory_register[0]) == plan.bits
+    assert len(qram.address_register) == plan.num_address_qubits
+
+    oracle = plan.oracle()
+    v_norm = np.sum(vectors**2, axis=1)
+    p_norm = np.sum(p**2)
+    diff_norm = np.sum((p - vectors) ** 2, axis=1)
+    inputs = {}
+    for i in range(2):
+        inputs[f"v_{i}"] = to_bit_patterns(vectors[:, i], plan.bits)
+        inputs[f"p_{i}"] = to_bit_patterns(np.full(len(vectors), p[i]), plan.bits)
+
+    for first, expected in [
+        (True, (v_norm <= p_norm) & (diff_norm < p_norm)),
+        (False, (v_norm > p_norm) & (diff_norm <= v_norm)),
+    ]:
+        for min_width in [False, True]:
+            circuit = oracle._marking_oracle(first, min_width=min_width)
+            result = ReversibleSimulator(circuit).run(inputs)
+            assert np.array_equal(result["final_result"], expected)
+
+    default = ReductionOracle(
+        plan.num_address_qubits, 2, plan.bits, comparator="carry"
+    )
+    assert (
+        oracle._marking_oracle().num_qubits
+        < default._marking_oracle().num_qubits
+    )
+
+    with pytest.raises(ValueError):
+        plan_widths(vectors, [1, 2, 3])
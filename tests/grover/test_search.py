@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from qiskit import ClassicalRegister, execute
+from qiskit_aer import AerSimulator
+from attacks.grover.search import GroverGaussReduce
+
+
+def test_GroverGaussReduce():
+    vectors = np.array([[1, 2], [3, -1], [0, 2], [-2, -1]])
+    p = np.array([2, 1])
+    v_norm = np.sum(vectors**2, axis=1)
+    p_norm = np.sum(p**2)
+    diff_norm = np.sum((p - vectors) ** 2, axis=1)
+    simulator = AerSimulator(method="matrix_product_state")
+
+    for first, expected in [
+        (True, (v_norm <= p_norm) & (diff_norm < p_norm)),
+        (False, (v_norm > p_norm) & (diff_norm <= v_norm)),
+    ]:
+        search = GroverGaussReduce(vectors, p, first=first, min_width=True)
+        problem = search.problem
+        assert problem.objective_qubits == search.objective_qubits
+        assert len(search.objective_qubits) == 2 + 4 * search.bits
+
+        # measuring the prepared state yields every (i, L[i], p) once
+        circuit = search.state_preparation.copy()
+        result_reg = ClassicalRegister(len(search.objective_qubits))
+        circuit.add_register(result_reg)
+        circuit.measure(search.objective_qubits, result_reg)
+        counts = execute(circuit, simulator, shots=256).result().get_counts()
+        assert len(counts) == len(vectors)
+
+        addresses, decoded, decoded_p = search.decode(counts)
+        assert np.array_equal(decoded, vectors[addresses])
+        assert np.all(decoded_p == p)
+
+        checked = search.check_counts(counts)
+        for bitstring, address in zip(counts, addresses):
+            assert checked[bitstring] == expected[address]
+            assert problem.is_good_state(bitstring) == expected[address]
+            assert problem.post_processing(bitstring) == vectors[address].tolist()
+
+    with pytest.raises(ValueError):
+        GroverGaussReduce(vectors, p, bits=2)
@@ -1,6 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
 from qiskit import QuantumCircuit, ClassicalRegister, execute
 from qiskit_aer import AerSimulator
-from attacks.memory.qram import qRAM
+from attacks.memory import qram as qram_module
+from attacks.memory.qram import BucketqRAM, qRAM, MutableqRAM
+from attacks.sieve.hashing import HashTables
+from attacks.utils.classical import to_bit_patterns
+from attacks.utils.resources import estimate_resources
+from attacks.utils.simulation import ReversibleSimulator
 
 
 def test_qRAM():
@@ -34,3 +42,137 @@ def test_qRAM():
             expected_res = '0' + expected_res
 
         assert result == {expected_res: 1024}
+
+
+def test_qRAM_unary():
+    rng = np.random.default_rng(0)
+    for n_values in (1, 2, 3, 5, 8):
+        test_list = rng.integers(-7, 8, size=(n_values, 2)).tolist()
+        mcx_qram = qRAM(test_list, bits=4)
+        unary_qram = qRAM(test_list, bits=4, mode="unary")
+
+        addresses = np.arange(1 << len(mcx_qram.address_register))
+        expected = ReversibleSimulator(mcx_qram).run({"addr": addresses})
+        result = ReversibleSimulator(unary_qram).run({"addr": addresses})
+        for name, value in expected.items():
+            assert np.array_equal(result[name], value)
+        assert not np.any(result.get("unary", 0))
+
+        for qram in (mcx_qram, unary_qram):
+            report = estimate_resources(qram)
+            assert qram.toffoli_count == report.total.toffoli_count
+
+    assert unary_qram.toffoli_count < mcx_qram.toffoli_count
+
+    with pytest.raises(ValueError):
+        qRAM(test_list, bits=4, mode="qrom")
+
+    encoding = "twos-complement"
+    for mode in ("mcx", "unary"):
+        qram = qRAM(test_list, bits=4, mode=mode, encoding=encoding)
+        result = ReversibleSimulator(qram).run({"addr": np.arange(len(test_list))})
+        for i in range(2):
+            expected = to_bit_patterns([value[i] for value in test_list], 4, encoding)
+            assert np.array_equal(result[f"v_{i}"], expected)
+
+
+def test_qRAM_parallel(monkeypatch):
+    monkeypatch.setattr(qram_module, "PARALLEL_CHUNK_SIZE", 3)
+    test_list = np.random.default_rng(2).integers(-7, 8, size=(10, 2)).tolist()
+    serial = qRAM(test_list, bits=4)
+    with ProcessPoolExecutor(2) as executor:
+        parallel = qRAM(test_list, bits=4, executor=executor)
+
+    serial_data = serial.data[0].operation.definition.data
+    parallel_data = parallel.data[0].operation.definition.data
+    assert len(serial_data) == len(parallel_data)
+    for expected, instruction in zip(serial_data, parallel_data):
+        assert instruction.operation.name == expected.operation.name
+        assert instruction.qubits == expected.qubits
+        assert instruction.operation.definition == expected.operation.definition
+    assert parallel.toffoli_count == serial.toffoli_count
+
+
+def test_BucketqRAM():
+    rng = np.random.default_rng(3)
+    vectors = rng.integers(-7, 8, size=(40, 3))
+    tables = HashTables(3, k=3, t=2, rng=rng)
+    for i, code in enumerate(tables.hash(vectors)):
+        tables.insert(i, code)
+
+    p = vectors[5]
+    qram = BucketqRAM.from_tables(vectors, tables, p, bits=4)
+    assert tables.lookups == 0
+    assert 5 in qram.indices and len(qram.indices) < len(vectors)
+    assert len(qram.address_register) == int(np.ceil(np.log2(len(qram.indices))))
+
+    addresses = np.arange(1 << len(qram.address_register))
+    result = ReversibleSimulator(qram).run({"addr": addresses})
+    indices = qram.list_indices(addresses)
+    assert np.array_equal(indices[: len(qram.indices)], qram.indices)
+    assert np.all(indices[len(qram.indices) :] == -1)
+    for i in range(3):
+        expected = to_bit_patterns(vectors[qram.indices, i], 4)
+        assert np.array_equal(result[f"v_{i}"][: len(qram.indices)], expected)
+
+    # the symmetric sieve also loads the buckets of -p
+    antipodal = BucketqRAM.from_tables(vectors, tables, p, bits=4, antipodal=True)
+    assert set(antipodal.indices) == set(qram.indices) | set(tables.collisions(-p))
+
+
+def test_MutableqRAM():
+    rng = np.random.default_rng(1)
+    qram = MutableqRAM([], bits=4, dimension=2)
+
+    for step in range(40):
+        operation = rng.integers(3) if len(qram) else 0
+        value = rng.integers(-7, 8, size=2).tolist()
+        if operation == 0:
+            assert qram.append(value) == len(qram) - 1
+        elif operation == 1:
+            address = int(rng.integers(len(qram)))
+            untouched = [inst.operation for inst in qram.circuit.data]
+            qram.replace(address, value)
+            for j, inst in enumerate(qram.circuit.data):
+                assert (inst.operation is untouched[j]) == (j != address)
+        else:
+            qram.delete(int(rng.integers(len(qram))))
+
+        num_addr_qubits = int(np.ceil(np.log2(max(2, len(qram)))))
+        assert len(qram.address_register) in (num_addr_qubits, num_addr_qubits + 1)
+        if step % 5:
+            continue
+
+        addresses = np.arange(1 << len(qram.address_register))
+        simulator = ReversibleSimulator(qram.circuit)
+        result = simulator.run({"addr": addresses})
+        for i in range(2):
+            expected = [vec[i] for vec in qram.values]
+            expected += [0] * (len(addresses) - len(expected))
+            assert np.array_equal(result[f"v_{i}"], to_bit_patterns(expected, 4))
+
+        inverse = ReversibleSimulator(qram.inverse()).run(result)
+        assert not np.any(inverse["v_0"]) and not np.any(inverse["v_1"])
+        assert qram.toffoli_count == estimate_resources(qram.circuit).total.toffoli_count
+
+    with pytest.raises(IndexError):
+        qram.replace(len(qram), [0, 0])
+
+    # appends and deletes alternating around a power of two reuse the segments
+    qram = MutableqRAM(rng.integers(-7, 8, size=(8, 2)).tolist(), bits=4)
+    for _ in range(3):
+        qram.append([1, 1])
+        untouched = [inst.operation for inst in qram.circuit.data]
+        qram.delete(len(qram) - 1)
+        assert len(qram.address_register) == 4
+        assert all(
+            inst.operation is operation
+            for inst, operation in zip(qram.circuit.data, untouched)
+        )
+    for _ in range(3):
+        qram.delete(0)
+    assert len(qram.address_register) == 4
+    qram.delete(0)
+    assert len(qram.address_register) == 2
+    with pytest.raises(IndexError):
+        MutableqRAM([], bits=4)
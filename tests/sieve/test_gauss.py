@@ -0,0 +1,49 @@
+import itertools
+import numpy as np
+import pytest
+from attacks.sieve.gauss import GaussSieve
+
+
+def brute_force_shortest(basis, radius):
+    coefficients = np.array(
+        list(itertools.product(range(-radius, radius + 1), repeat=len(basis)))
+    )
+    vectors = coefficients[np.any(coefficients, axis=1)] @ basis
+    return np.min(np.sum(vectors**2, axis=1))
+
+
+def test_GaussSieve():
+    rng = np.random.default_rng(1)
+    basis = rng.integers(-20, 21, size=(4, 4))
+
+    for symmetric in (False, True):
+        sieve = GaussSieve(basis, max_collisions=100, symmetric=symmetric, seed=0)
+        shortest = sieve.run()
+
+        assert shortest @ shortest == brute_force_shortest(basis, 6)
+        assert np.array_equal(sieve.norms, np.sum(sieve.vectors**2, axis=1))
+        assert sieve.info()["collisions"] == 100
+
+        # the list is pairwise reduced
+        products = 2 * sieve.vectors @ sieve.vectors.T
+        if symmetric:
+            products = np.abs(products)
+        norms = np.broadcast_to(sieve.norms[:, None], products.shape)
+        shorter = norms < norms.T
+        assert np.all(products[shorter] <= norms[shorter])
+
+
+def test_gauss_reduce():
+    sieve = GaussSieve(np.eye(2, dtype=int), max_collisions=1)
+    sieve._insert(np.array([3, 0]), 9)
+    sieve._insert(np.array([0, 5]), 25)
+
+    # (3, 2) is reduced to (0, 2) by (3, 0) and then reduces (0, 5)
+    assert list(sieve.gauss_reduce([3, 2])) == [0, 2]
+    assert sieve.vectors.tolist() == [[3, 0]]
+    assert [list(v) for v in sieve.stack] == [[0, 3]]
+
+    assert not sieve.gauss_reduce([3, 0]).any()
+
+    with pytest.raises(ValueError):
+        GaussSieve([[1, 2], [2, 4]])
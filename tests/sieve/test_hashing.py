@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from attacks.sieve.hashing import HashSieve, HashTables
+
+
+def test_HashTables():
+    tables = HashTables(3, k=4, t=2, rng=np.random.default_rng(0))
+    vectors = np.array([[1, 2, 3], [-1, -2, -3], [2, 4, 6]])
+
+    codes = tables.hash(vectors)
+    assert codes.shape == (3, 2)
+    assert np.array_equal(tables.hash(vectors[1]), codes[1])
+    # parallel vectors share all their buckets
+    assert np.array_equal(codes[0], codes[2])
+
+    for i, code in enumerate(codes):
+        tables.insert(i, code)
+    assert list(tables.lookup([10, 20, 30])) == [0, 2]
+    assert tables.lookups == 1 and tables.candidates == 2
+    # the antiparallel vector only collides with -p
+    assert list(tables.lookup([10, 20, 30], antipodal=True)) == [0, 1, 2]
+
+    # remove position 0 and move the vector at position 2 there
+    tables.remove(np.array([0]), np.array([0]), np.array([2]))
+    assert list(tables.lookup([1, 2, 3])) == [0]
+    assert list(tables.lookup([-1, -2, -3])) == [1]
+
+    # a symmetric sieve finds the vector pointing opposite to p
+    sieve = HashSieve(np.eye(3, dtype=int), k=4, t=2, symmetric=True, seed=0)
+    sieve._insert(np.array([-3, 0, 0]), 9)
+    assert list(sieve.gauss_reduce([4, 1, 0])) == [1, 1, 0]
+
+    with pytest.raises(ValueError):
+        HashTables(3, k=0, t=2, rng=np.random.default_rng(0))
+
+
+def test_HashSieve():
+    rng = np.random.default_rng(1)
+    basis = np.eye(12, dtype=int) + np.triu(rng.integers(-2, 3, size=(12, 12)), 1)
+
+    sieve = HashSieve(basis, k=3, t=4, max_collisions=50, symmetric=True, seed=0)
+    shortest = sieve.run()
+
+    assert shortest @ shortest == 1
+    info = sieve.info()
+    assert info["candidates"] == info["inner_products"]
+    assert info["candidates"] < info["lookups"] * info["list_size"]
+
+    # the bucket index matches the list
+    codes = sieve.tables.hash(sieve.vectors)
+    assert np.array_equal(sieve.tables.codes[: sieve.size], codes)
+    for table in sieve.tables.buckets:
+        indices = sorted(index for bucket in table.values() for index in bucket)
+        assert indices == list(range(sieve.size))
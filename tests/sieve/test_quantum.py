@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from attacks.sieve.quantum import QuantumGaussSieve, QuantumHashSieve
+from .test_gauss import brute_force_shortest
+
+
+def test_QuantumGaussSieve():
+    rng = np.random.default_rng(1)
+    basis = rng.integers(-20, 21, size=(4, 4))
+
+    sieve = QuantumGaussSieve(basis, max_collisions=100, retries=2, seed=0)
+    shortest = sieve.run()
+    info = sieve.info()
+
+    assert shortest @ shortest == brute_force_shortest(basis, 6)
+    assert info["collisions"] == 100 and info["queries"] > 0
+    assert sum(sieve.iteration_queries) == info["queries"]
+    assert sum(sieve.queries_by_width.values()) == info["queries"]
+    assert sieve.quantum_cost(lambda width: 2**width) >= info["queries"]
+    assert sum(sieve.qram_sizes.values()) <= info["searches"]
+    assert info["failed_searches"] >= info["missed_searches"]
+    assert info["searches"] <= info["rounds"] <= info["queries"]
+
+
+def test_gauss_reduce():
+    sieve = QuantumGaussSieve(np.eye(2, dtype=int), max_collisions=1, seed=0)
+    sieve._insert(np.array([3, 0]), 9)
+    sieve._insert(np.array([0, 5]), 25)
+
+    # (3, 2) is reduced to (0, 2) by (3, 0) and then reduces (0, 5)
+    assert list(sieve.gauss_reduce([3, 2])) == [0, 2]
+    assert sieve.vectors.tolist() == [[3, 0]]
+    assert [list(v) for v in sieve.stack] == [[0, 3]]
+    assert sieve.qram_sizes == {2: 3, 1: 1}
+
+    with pytest.raises(ValueError):
+        QuantumGaussSieve(np.eye(2, dtype=int), symmetric=True)
+
+
+def test_QuantumHashSieve():
+    rng = np.random.default_rng(1)
+    basis = np.eye(12, dtype=int) + np.triu(rng.integers(-2, 3, size=(12, 12)), 1)
+
+    sieve = QuantumHashSieve(basis, k=3, t=4, max_collisions=50, retries=1, seed=0)
+    shortest = sieve.run()
+    info = sieve.info()
+
+    assert shortest @ shortest == 1
+    # every qRAM holds the candidates of one lookup
+    assert info["lookups"] >= sum(sieve.qram_sizes.values()) > 0
+    assert info["candidates"] >= sum(
+        size * count for size, count in sieve.qram_sizes.items()
+    )
+    assert sieve.qram_toffolis > 0
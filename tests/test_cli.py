@@ -0,0 +1,45 @@
+import csv
+import json
+from dataclasses import fields
+from attacks.cli import SweepConfig, main, parse_range, run_configuration
+
+
+def test_parse_range():
+    assert parse_range("3") == [3]
+    assert parse_range("2..4") == [2, 3, 4]
+    assert parse_range("2..8:2,16") == [2, 4, 6, 8, 16]
+
+
+def test_sweep(tmp_path):
+    output = tmp_path / "sweep.csv"
+    args = ["sweep", "--dimension", "1..2", "--bits", "3", "--list-size", "4"]
+    assert main([*args, "-j", "2", "-o", str(output)]) == 0
+    with open(output, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert sorted(row["dimension"] for row in rows) == ["1", "2"]
+    for row in rows:
+        assert int(row["toffoli"]) > 0 and int(row["qram_toffoli"]) > 0
+
+    # the recorded configurations are skipped when a sweep is resumed
+    assert main([*args, "--bits", "3,4", "-j", "1", "-o", str(output)]) == 0
+    with open(output, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 4
+    assert len({(row["dimension"], row["bits"]) for row in rows}) == 4
+
+    # a row cut off before its results is computed again
+    lines = output.read_text().splitlines()
+    cut = ",".join(lines[-1].split(",")[: len(fields(SweepConfig)) + 2])
+    output.write_text("\n".join([*lines[:-1], cut]))
+    assert main([*args, "--bits", "3,4", "-j", "1", "-o", str(output)]) == 0
+    with open(output, newline="") as file:
+        rows = [row for row in csv.DictReader(file) if row["seconds"]]
+    assert len(rows) == 4
+    assert len({(row["dimension"], row["bits"]) for row in rows}) == 4
+
+    output = tmp_path / "sweep.jsonl"
+    output.write_text(json.dumps(run_configuration(SweepConfig(1, 3, 4))) + '\n{"dim')
+    assert main([*args, "--qram-mode", "none", "-j", "1", "-o", str(output)]) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()[2:]]
+    assert [row["dimension"] for row in rows] == [1, 2]
+    assert rows[0]["qram_toffoli"] is None
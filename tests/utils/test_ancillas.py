@@ -0,0 +1,27 @@
+import pytest
+from qiskit import QuantumCircuit
+from attacks.utils.ancillas import AncillaAllocator
+
+
+def test_AncillaAllocator():
+    circuit = QuantumCircuit(2)
+    allocator = AncillaAllocator(circuit)
+
+    first = allocator.lease(3)
+    second = allocator.lease(2)
+    assert circuit.num_qubits == 7 and circuit.num_ancillas == 5
+    assert allocator.num_leased == 5
+
+    allocator.release(first)
+    # released ancillas are reused, in circuit order
+    assert allocator.lease(2) == first[:2]
+    third = allocator.lease(4)
+    assert third[0] == first[2]
+    assert allocator.num_qubits == circuit.num_ancillas == 8
+    assert len(allocator.registers) == 3
+
+    with pytest.raises(ValueError):
+        allocator.release(circuit.qubits[:1])
+    allocator.release(second)
+    with pytest.raises(ValueError):
+        allocator.release(second)
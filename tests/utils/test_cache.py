@@ -0,0 +1,39 @@
+import pytest
+from qiskit.circuit.library import CDKMRippleCarryAdder
+from attacks.utils.cache import GateCache, gate_cache
+from attacks.utils.quantum import controlled_X
+from attacks.arithmetic.operations import SignedAdder
+
+
+def test_GateCache():
+    cache = GateCache(maxsize=2)
+
+    first = cache.gate(controlled_X, 3)
+    assert cache.gate(controlled_X, 3) is first
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+    inverse = cache.inverse(controlled_X, 3)
+    assert cache.inverse(controlled_X, 3) is inverse
+    assert inverse.name == first.inverse().name
+
+    # circuits are converted to gates only once
+    adder = cache.gate(CDKMRippleCarryAdder, 4, kind="half")
+    assert adder.num_qubits == 10
+    assert cache.gate(CDKMRippleCarryAdder, 4, kind="half") is adder
+    assert len(cache) == 2
+
+    # the least recently used entries have been evicted
+    assert cache.gate(controlled_X, 3) is not first
+
+    cache.clear()
+    assert cache.info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 2}
+
+    with pytest.raises(ValueError):
+        GateCache(maxsize=0)
+
+
+def test_gate_cache_shared():
+    SignedAdder(5)
+    misses = gate_cache.misses
+    SignedAdder(5)
+    assert gate_cache.misses == misses
@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from attacks.utils.disk_cache import DiskCache
+from attacks.memory.qram import qRAM
+from attacks.grover.oracles import ReductionOracle
+from attacks.utils.resources import estimate_resources
+
+
+def _load_qram(directory):
+    cache = DiskCache(directory)
+    return cache.circuit(qRAM, [[1, 2], [3, -1]], 4).toffoli_count
+
+
+def test_DiskCache(tmp_path):
+    cache = DiskCache(tmp_path)
+    values = [[1, 2], [3, -1], [0, 2]]
+    built = cache.circuit(qRAM, values, 4, mode="unary")
+    loaded = DiskCache(tmp_path).circuit(qRAM, values, 4, mode="unary")
+    assert cache.info()["misses"] == 1
+    assert isinstance(loaded, qRAM)
+    assert loaded.toffoli_count == built.toffoli_count
+    assert loaded.num_ancillas == built.num_ancillas
+    assert loaded.register_layout["v_1"] == built.register_layout["v_1"]
+
+    # the list data, the arguments and the instance of bound methods are part
+    # of the key
+    assert cache.key(qRAM, (values, 4)) != cache.key(qRAM, ([[1, 2]], 4))
+    assert cache.key(qRAM, (values, 4)) != cache.key(qRAM, (values, 5))
+    assert cache.key(ReductionOracle(2, 2, 4).phase_oracle) == cache.key(
+        ReductionOracle(2, 2, 4).phase_oracle
+    )
+    assert cache.key(ReductionOracle(2, 2, 4).phase_oracle) != cache.key(
+        ReductionOracle(2, 2, 5).phase_oracle
+    )
+
+    options = {"basis_gates": ["cx", "u"], "optimization_level": 0}
+    transpiled = cache.transpiled(qRAM, values, 4, transpile_options=options)
+    assert set(transpiled.count_ops()) <= {"cx", "u"}
+    assert cache.info()["misses"] == 3
+    cache.transpiled(qRAM, values, 4, transpile_options=options)
+    assert cache.info()["hits"] == 1
+    assert cache.info()["entries"] == 3
+
+    # unreadable entries are rebuilt
+    cache._path(cache.key(qRAM, (values, 4))).write_bytes(b"corrupt")
+    assert cache.circuit(qRAM, values, 4).toffoli_count == qRAM(values, 4).toffoli_count
+
+    # a circuit that cannot be written leaves no temporary file behind
+    with pytest.raises(AttributeError):
+        cache._store("unpicklable", lambda: None)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    cache.clear()
+    assert cache.info()["entries"] == 0
+
+    with pytest.raises(ValueError):
+        DiskCache(tmp_path, max_bytes=0)
+
+
+def test_DiskCache_oracle(tmp_path):
+    oracle = DiskCache(tmp_path).circuit(ReductionOracle(2, 2, 4).phase_oracle)
+    loaded = DiskCache(tmp_path).circuit(ReductionOracle(2, 2, 4).phase_oracle)
+    assert loaded.register_layout["v_0"] == oracle.register_layout["v_0"]
+    assert (
+        estimate_resources(loaded).total.toffoli_count
+        == estimate_resources(oracle).total.toffoli_count
+    )
+
+
+def test_DiskCache_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1)
+    cache.circuit(qRAM, [[1], [0]], 4)
+    cache.circuit(qRAM, [[2], [0]], 4)
+    assert cache.info()["entries"] == 0
+
+    DiskCache(tmp_path / "size").circuit(qRAM, [[1], [0]], 4)
+    size = sum(path.stat().st_size for path in (tmp_path / "size").iterdir())
+    cache = DiskCache(tmp_path / "lru", max_bytes=5 * size // 2)
+    for value in range(3):
+        cache.circuit(qRAM, [[value], [0]], 4)
+    assert cache.info()["entries"] == 2
+    cache.circuit(qRAM, [[2], [0]], 4)
+    assert cache.info()["hits"] == 1
+
+
+def test_DiskCache_processes(tmp_path):
+    with ProcessPoolExecutor(2) as pool:
+        counts = list(pool.map(_load_qram, [str(tmp_path)] * 4))
+    assert len(set(counts)) == 1
+    assert len(list(tmp_path.glob("*.pickle"))) == 1
+    assert not list(tmp_path.glob("*.tmp"))
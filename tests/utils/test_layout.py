@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit, execute
+from qiskit_aer import AerSimulator
+from attacks.arithmetic.operations import Compare
+from attacks.arithmetic.vectors import Norm2
+from attacks.grover.oracles import ReductionOracle
+from attacks.memory.qram import qRAM
+from attacks.utils.classical import to_bit_patterns
+from attacks.utils.quantum import encode_vector
+
+
+def test_decode():
+    values = [[1, -2], [3, 0], [-3, 1]]
+    qram = qRAM(values, 3)
+    layout = qram.register_layout
+    assert layout["v_1"].offsets == (5, 6, 7)
+    assert layout["v_1"].encoding == "sign-magnitude"
+    assert layout["addr"].encoding is None
+
+    simulator = AerSimulator(method="matrix_product_state")
+    circuit = QuantumCircuit(*qram.qregs)
+    circuit.h(qram.address_register)
+    circuit.append(qram, circuit.qubits)
+    circuit.measure_all()
+    result = execute(circuit, simulator, shots=256, memory=True).result()
+
+    counts = result.get_counts()
+    decoded, shots = layout.decode_counts(counts)
+    assert shots.sum() == 256
+    expected = np.array(values + [[0, 0]])[decoded["addr"]]
+    assert np.array_equal(decoded["v_0"], expected[:, 0])
+    assert np.array_equal(decoded["v_1"], expected[:, 1])
+
+    memory = layout.decode(result.get_memory(), names=["addr", "v_0"])
+    assert len(memory["addr"]) == 256
+    assert set(memory) == {"addr", "v_0"}
+    assert np.array_equal(memory["v_0"], np.array([1, 3, -3, 0])[memory["addr"]])
+
+    # fields of signed numbers spread over a magnitude and a sign register
+    rng = np.random.default_rng(17)
+    for circuit, fields in [
+        (Norm2(2, 4, encoding="twos-complement"), ["x_0", "x_1"]),
+        (Compare(4, mode="carry"), ["a", "b"]),
+    ]:
+        layout = circuit.register_layout
+        numbers = rng.integers(-7, 8, size=(len(fields), 100))
+        characters = np.full((100, circuit.num_qubits), ord("0"), dtype=np.uint8)
+        for name, number in zip(fields, numbers):
+            field = layout[name]
+            patterns = to_bit_patterns(number, field.width, field.encoding)
+            for bit, offset in enumerate(field.offsets):
+                set_bits = (patterns >> np.uint64(bit)) & np.uint64(1)
+                characters[:, circuit.num_qubits - 1 - offset] += set_bits.astype(
+                    np.uint8
+                )
+        bitstrings = [row.tobytes().decode() for row in characters]
+
+        decoded = layout.decode(bitstrings)
+        for name, number in zip(fields, numbers):
+            assert np.array_equal(decoded[name], number)
+
+
+def test_oracle_layout():
+    oracle = ReductionOracle(2, 2, 4)._marking_oracle(min_width=True)
+    layout = oracle.register_layout
+
+    circuit = QuantumCircuit(*oracle.qregs)
+    circuit.append(encode_vector([1, 2], 4), [*oracle.qregs[1], *oracle.qregs[2]])
+    circuit.append(encode_vector([3, 4], 4), [*oracle.qregs[3], *oracle.qregs[4]])
+    circuit.append(oracle, circuit.qubits)
+    circuit.measure_all()
+
+    simulator = AerSimulator(method="matrix_product_state")
+    counts = execute(circuit, simulator, shots=64).result().get_counts()
+    decoded, shots = layout.decode_counts(counts)
+
+    assert shots.tolist() == [64]
+    assert decoded["v_0"].tolist() == [1] and decoded["v_1"].tolist() == [2]
+    assert decoded["p_0"].tolist() == [3] and decoded["p_1"].tolist() == [4]
+    assert decoded["final_result"].tolist() == [1]
+
+    with pytest.raises(KeyError):
+        layout.decode(["01"], qubits=[0, 1], names=["v_0"])
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from attacks.utils import profiling
+from attacks.utils.cache import GateCache
+from attacks.utils.profiling import profile
+from attacks.arithmetic.operations import SignedAdder
+
+
+def test_profile(tmp_path):
+    cache = GateCache()
+    with profile(memory=True) as profiler:
+        adder = SignedAdder(4)
+        cache.gate(SignedAdder, 4)
+        cache.inverse(SignedAdder, 4)
+    assert profiling._active.profiler is None
+
+    node = profiler.root.children["SignedAdder"]
+    assert node.calls == 2
+    assert node.num_qubits == adder.num_qubits
+    assert node.size == 1
+    assert node.allocated is not None
+    assert 0 <= node.self_seconds <= node.seconds <= profiler.root.seconds
+    assert {"to_gate(SignedAdder)", "inverse(SignedAdder)"} <= set(
+        profiler.root.children
+    )
+
+    tree = json.loads(json.dumps(profiler.to_dict()))
+    assert tree["name"] == "root"
+    assert "SignedAdder" in [child["name"] for child in tree["children"]]
+
+    folded = profiler.folded().splitlines()
+    assert "SignedAdder" in [line.rsplit(" ", 1)[0] for line in folded]
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in folded)
+
+    profiler.write(str(tmp_path / "profile.folded"))
+    assert (tmp_path / "profile.folded").read_text().splitlines() == folded
+    profiler.write(str(tmp_path / "profile.json"))
+    assert json.loads((tmp_path / "profile.json").read_text())["name"] == "root"
+
+
+def test_profile_inactive():
+    # nothing is recorded outside of profile()
+    with profile() as profiler:
+        pass
+    SignedAdder(4)
+    assert profiler.root.children == {}
+    assert profiling.is_profiled(SignedAdder)
+
+
+def test_profile_environment(tmp_path):
+    output = tmp_path / "profile.json"
+    command = [
+        sys.executable,
+        "-c",
+        "from attacks.arithmetic.operations import SignedAdder; SignedAdder(4)",
+    ]
+    env = {**os.environ, "ATTACKS_PROFILE": str(output)}
+    env.pop("ATTACKS_PROFILE_PID", None)
+    root = Path(__file__).parents[2]
+    subprocess.run(command, cwd=root, env=env, check=True)
+    tree = json.loads(output.read_text())
+    assert "SignedAdder" in [child["name"] for child in tree["children"]]
+
+    # processes started by the profiled one do not overwrite its profile
+    output.unlink()
+    env["ATTACKS_PROFILE_PID"] = "1"
+    subprocess.run(command, cwd=root, env=env, check=True)
+    assert not output.exists()
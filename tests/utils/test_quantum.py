@@ -1,7 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pytest
 from qiskit import QuantumCircuit, ClassicalRegister, execute
+from qiskit.quantum_info import Operator
 from qiskit_aer import AerSimulator
-from attacks.utils.quantum import controlled_incr, encode_signed_int
+from attacks.utils.quantum import (
+    controlled_incr,
+    encode_signed_int,
+    parallel_controlled_incr,
+    transpile_blocks,
+)
+from attacks.utils.resources import estimate_resources
+from attacks.utils.simulation import ReversibleSimulator
 
 
 def test_controlled_incr():
@@ -32,6 +42,29 @@ def test_controlled_incr():
     assert result == {"0010": 1024}
 
 
+def test_parallel_controlled_incr():
+    for num_qubits in range(1, 8):
+        circuit = parallel_controlled_incr(num_qubits)
+        inputs = np.arange(1 << (num_qubits + 1), dtype=np.uint64)
+        control, target = inputs & np.uint64(1), inputs >> np.uint64(1)
+        result = ReversibleSimulator(circuit).run(
+            {"control": control, "target": target}
+        )
+
+        assert np.array_equal(result["target"], (target + control) % (1 << num_qubits))
+        if num_qubits > 1:
+            assert not np.any(result["helper"])
+
+    # linear size and logarithmic depth
+    parallel = estimate_resources(parallel_controlled_incr(10)).total
+    cascade = QuantumCircuit(11)
+    cascade.append(controlled_incr(10), cascade.qubits)
+    assert parallel.toffoli_count < estimate_resources(cascade).total.toffoli_count
+    assert parallel.toffoli_count <= 6 * 10
+    wide = estimate_resources(parallel_controlled_incr(20)).total
+    assert wide.depth < 2 * parallel.depth
+
+
 def test_encode_signed_int():
     circuit = QuantumCircuit(5)
     circuit.append(encode_signed_int(7, 5), *circuit.qregs)
@@ -50,6 +83,31 @@ def test_encode_signed_int():
 
     assert result == {"10010": 1024}
 
+    circuit = QuantumCircuit(5)
+    circuit.append(encode_signed_int(-2, 5, "twos-complement"), *circuit.qregs)
+    circuit.measure_all()
+
+    result = execute(circuit, simulator, shots=1024).result().get_counts()
+
+    assert result == {"11110": 1024}
+
     circuit = QuantumCircuit(5)
     with pytest.raises(ValueError):
         circuit.append(encode_signed_int(256, 5), *circuit.qregs)
+
+
+def test_transpile_blocks():
+    incr = parallel_controlled_incr(3).to_gate()
+    circuit = QuantumCircuit(incr.num_qubits)
+    circuit.h(range(4))
+    circuit.append(incr, circuit.qubits)
+    circuit.append(incr, circuit.qubits)
+    circuit.append(incr.inverse(), circuit.qubits)
+
+    options = {"basis_gates": ["cx", "u"], "optimization_level": 1}
+    transpiled = transpile_blocks(circuit, **options)
+    assert set(transpiled.count_ops()) <= {"cx", "u"}
+    assert Operator(transpiled).equiv(Operator(circuit))
+
+    with ProcessPoolExecutor(2) as executor:
+        assert transpile_blocks(circuit, executor, **options) == transpiled
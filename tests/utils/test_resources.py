@@ -0,0 +1,55 @@
+from collections import Counter
+from qiskit import QuantumCircuit
+from attacks.utils.resources import estimate_resources, toffoli_cost
+from attacks.utils.simulation import ReversibleSimulator
+from attacks.arithmetic.operations import SignedAdder
+from attacks.grover.oracles import ReductionOracle
+
+
+def flat_histogram(circuit):
+    gates = ReversibleSimulator(circuit).gates
+    return Counter(len(controls) + len(negated) for _, controls, negated in gates)
+
+
+def test_estimate_resources():
+    inner = QuantumCircuit(4, name="inner")
+    inner.x(0)
+    inner.cx(0, 1)
+    inner.mcx([0, 1, 2], 3)
+    gate = inner.to_gate()
+
+    circuit = QuantumCircuit(5)
+    circuit.append(gate, [0, 1, 2, 3])
+    circuit.append(gate, [1, 2, 3, 4])
+    circuit.append(gate.control(1), [4, 0, 1, 2, 3])
+    circuit.h(0)
+
+    report = estimate_resources(circuit)
+
+    assert report.total.controls == Counter({0: 2, 1: 3, 2: 1, 3: 2, 4: 1})
+    assert report.total.other == Counter({"h": 1})
+    assert report.total.toffoli_count == 1 + 2 * toffoli_cost(3) + toffoli_cost(4)
+    assert report.total.t_count == 7 * report.total.toffoli_count
+    assert report.blocks["inner[4]"].count == 2
+    assert report.blocks["cinner[5]"].count == 1
+    # the two uncontrolled blocks overlap on two qubits and the controlled
+    # block shares its control with every gate
+    assert report.total.depth == 3 + 3 + 3 + 1
+
+
+def test_ReductionOracle_resources():
+    adder = SignedAdder(5)
+    report = estimate_resources(adder)
+    assert report.total.controls == flat_histogram(adder)
+    # the carry and the helpers of the end-around carry incrementer
+    assert report.num_ancillas == 10
+
+    oracle = ReductionOracle(2, 2, 4)._marking_oracle()
+    report = estimate_resources(oracle)
+
+    assert report.num_qubits == oracle.num_qubits
+    assert report.num_ancillas == oracle.num_ancillas
+    assert report.total.controls == flat_histogram(oracle)
+    assert report.blocks["NormCalc[36]"].count == 3
+    assert report.blocks["NormCalc_dg[36]"].count == 3
+    assert report.blocks["SignedAdder[16]"].count == 2
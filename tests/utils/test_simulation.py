@@ -0,0 +1,174 @@
+import itertools
+import numpy as np
+from attacks.utils.classical import to_bit_patterns, from_bit_patterns
+from attacks.utils.simulation import ReversibleSimulator
+from attacks.arithmetic.operations import SignedAdder, SignedSubtractor, Compare
+from attacks.arithmetic.vectors import Norm2
+from attacks.memory.qram import qRAM
+from attacks.grover.oracles import ReductionOracle
+
+
+def test_bit_patterns():
+    values = np.array([-7, -2, 0, 3, 7])
+    patterns = to_bit_patterns(values, 4)
+
+    assert list(patterns) == [15, 10, 0, 3, 7]
+    assert list(from_bit_patterns(patterns, 4)) == list(values)
+
+    patterns = to_bit_patterns(values, 4, encoding="twos-complement")
+    assert list(patterns) == [9, 14, 0, 3, 7]
+    assert list(from_bit_patterns(patterns, 4, "twos-complement")) == list(values)
+
+
+def test_SignedAdder():
+    values = np.arange(-15, 16)
+    num_1, num_2 = (arr.ravel() for arr in np.meshgrid(values, values))
+    fits = np.abs(num_1 + num_2) < 16
+    num_1, num_2 = num_1[fits], num_2[fits]
+
+    simulator = ReversibleSimulator(SignedAdder(5))
+    result = simulator.run(
+        {"num1": to_bit_patterns(num_1, 5), "num2": to_bit_patterns(num_2, 5)}
+    )
+
+    assert np.array_equal(from_bit_patterns(result["num2"], 5), num_1 + num_2)
+    assert np.array_equal(from_bit_patterns(result["num1"], 5), num_1)
+    assert not np.any(result["helper"])
+
+
+def test_Compare():
+    values = np.arange(-7, 8)
+    num_1, num_2 = (arr.ravel() for arr in np.meshgrid(values, values))
+
+    for cmp, expected in [
+        ("==", num_1 == num_2),
+        (">", num_1 > num_2),
+        ("<", num_1 < num_2),
+        (">=", num_1 >= num_2),
+        ("<=", num_1 <= num_2),
+    ]:
+        simulator = ReversibleSimulator(Compare(5, cmp=cmp))
+        patterns_1 = to_bit_patterns(num_1, 5)
+        patterns_2 = to_bit_patterns(num_2, 5)
+        result = simulator.run(
+            {
+                "val_1": patterns_1 & 15,
+                "sgn1": patterns_1 >> np.uint64(4),
+                "val_2": patterns_2 & 15,
+                "sgn2": patterns_2 >> np.uint64(4),
+            }
+        )
+
+        assert np.array_equal(result["result"], expected)
+
+
+
+def test_twos_complement():
+    encoding = "twos-complement"
+    values = np.arange(-15, 16)
+    num_1, num_2 = (arr.ravel() for arr in np.meshgrid(values, values))
+    for circuit, fits, expected in [
+        (SignedAdder(5, encoding=encoding), num_1 + num_2, num_1 + num_2),
+        (SignedSubtractor(5, encoding=encoding), num_1 - num_2, num_1 - num_2),
+    ]:
+        fits = np.abs(fits) < 16
+        result = ReversibleSimulator(circuit).run(
+            {
+                "num1": to_bit_patterns(num_1[fits], 5, encoding),
+                "num2": to_bit_patterns(num_2[fits], 5, encoding),
+            }
+        )
+        assert np.array_equal(
+            from_bit_patterns(result["num2"], 5, encoding), expected[fits]
+        )
+        assert not np.any(result["helper"])
+
+    # a plain addition, without sign conversions and end-around carry
+    assert SignedAdder(5, encoding=encoding).decompose().count_ops() == {
+        "CDKMRippleCarryAdder": 1
+    }
+
+    values = np.arange(-7, 8)
+    num_1, num_2 = (arr.ravel() for arr in np.meshgrid(values, values))
+    patterns_1 = to_bit_patterns(num_1, 5, encoding)
+    patterns_2 = to_bit_patterns(num_2, 5, encoding)
+    for cmp in ("==", ">", "<", ">=", "<="):
+        result = ReversibleSimulator(Compare(5, cmp, encoding=encoding)).run(
+            {
+                "val_1": patterns_1 & 15,
+                "sgn1": patterns_1 >> 4,
+                "val_2": patterns_2 & 15,
+                "sgn2": patterns_2 >> 4,
+            }
+        )
+        assert np.array_equal(result["result"], eval(f"num_1 {cmp} num_2"))
+
+    for use_squarer in (False, True):
+        norm_calc = Norm2(2, 5, use_squarer=use_squarer, encoding=encoding)
+        result = ReversibleSimulator(norm_calc).run(
+            {
+                "val_0": patterns_1 & 15,
+                "sgn_0": patterns_1 >> 4,
+                "val_1": patterns_2 & 15,
+                "sgn_1": patterns_2 >> 4,
+            }
+        )
+        assert np.array_equal(result["norm"], num_1**2 + num_2**2)
+
+
+def test_Norm2():
+    rng = np.random.default_rng(0)
+    vectors = rng.integers(-15, 16, size=(200, 3))
+
+    norm_calc = Norm2(3, 5)
+    inputs = {}
+    for i in range(3):
+        patterns = to_bit_patterns(vectors[:, i], 5)
+        inputs[f"val_{i}"] = patterns & 15
+        inputs[f"sgn_{i}"] = patterns >> np.uint64(4)
+
+    result = ReversibleSimulator(norm_calc).run(inputs)
+
+    assert np.array_equal(result["norm"], np.sum(vectors**2, axis=1))
+
+
+def test_qRAM():
+    test_list = [[-1, 3], [2, 0], [3, -7]]
+    qram = qRAM(test_list, bits=4)
+
+    result = ReversibleSimulator(qram).run({"addr": np.arange(4)})
+
+    for i in range(2):
+        expected = to_bit_patterns([vec[i] for vec in test_list] + [0], 4)
+        assert np.array_equal(result[f"v_{i}"], expected)
+
+
+def test_ReductionOracle():
+    first_oracle = ReductionOracle(2, 2, 4)._marking_oracle()
+    second_oracle = ReductionOracle(2, 2, 4)._marking_oracle(first=False)
+
+    values = range(-3, 4)
+    combos = np.array(list(itertools.product(values, repeat=4)))
+    v, p = combos[:, :2], combos[:, 2:]
+
+    inputs = {}
+    for i in range(2):
+        inputs[f"v_{i}"] = to_bit_patterns(v[:, i], 4)
+        inputs[f"p_{i}"] = to_bit_patterns(p[:, i], 4)
+
+    v_norm = np.sum(v**2, axis=1)
+    p_norm = np.sum(p**2, axis=1)
+    diff_norm = np.sum((p - v) ** 2, axis=1)
+
+    result = ReversibleSimulator(first_oracle).run(inputs)
+    expected = (v_norm <= p_norm) & (diff_norm < p_norm)
+    assert np.array_equal(result["final_result"], expected)
+    for name, value in result.items():
+        if name in inputs:
+            assert np.array_equal(value, inputs[name])
+        elif name != "final_result":
+            assert not np.any(value)
+
+    result = ReversibleSimulator(second_oracle).run(inputs)
+    expected = (v_norm > p_norm) & (diff_norm <= v_norm)
+    assert np.array_equal(result["final_result"], expected)